@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,6 +91,88 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # shared by every worker on the host, stands in for memcached / redis
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SHARED_CACHE_DIR', '/tmp/kostzy-cache'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# token -> user lookups of CachedTokenAuthentication; the default shares
+# them between workers through the bounded 'shared' alias, a per process
+# core.cache.LRUCache only suits a single worker since logout and password
+# changes are not seen by the other workers' copies
+TOKEN_CACHE = {
+    'BACKEND': 'core.cache.SharedCache',
+    'OPTIONS': {'alias': 'shared', 'timeout': 300},
+}
+
+# anonymous feed and community list responses, versions are bumped on
+# writes; an LRUCache only sees the bumps of its own worker process so
+# multi-worker deployments should switch to core.cache.SharedCache
+RESPONSE_CACHE = {
+    'BACKEND': 'core.cache.LRUCache',
+    'OPTIONS': {'max_entries': 1000, 'timeout': 60},
+}
+
+# mobile clients may send and accept application/msgpack next to JSON
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'core.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'core.parsers.MessagePackParser',
+    ],
+}
+
+
+# Response compression
+# only these content types are compressed, images and other media that are
+# compressed already are sent as they are; so are bodies shorter than
+# COMPRESSION_MIN_LENGTH bytes, which would not get any smaller
+
+COMPRESSION_MIN_LENGTH = 500
+COMPRESSION_CONTENT_TYPES = [
+    'text/',
+    'application/json',
+    'application/msgpack',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+]
+
+
+# Metrics
+# /metrics is served to staff users and to requests from these addresses,
+# comma separated in METRICS_ALLOWED_IPS; behind a proxy REMOTE_ADDR is the
+# proxy's, so keep the endpoint off the public route there
+
+METRICS_ALLOWED_IPS = os.environ.get(
+    'METRICS_ALLOWED_IPS',
+    '127.0.0.1'
+).split(',')
+
+# every worker writes its counters to a file here, at most every
+# METRICS_FLUSH_SECONDS, and /metrics serves the sum of the files; the
+# directory is emptied on deploy (a new container starts with an empty
+# /tmp) but not when a single worker restarts
+METRICS_DIR = os.environ.get('METRICS_DIR', '/tmp/kostzy-metrics')
+METRICS_FLUSH_SECONDS = 5
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -132,3 +216,20 @@ MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
 AUTH_USER_MODEL = 'core.User'
+
+
+# Map clustering
+# zoom levels whose feed clusters are kept in the precomputed tile summary,
+# run `manage.py rebuild_map_tiles` after changing it
+
+MAP_TILE_ZOOMS = []
+
+
+# Background jobs
+# seconds a claimed job stays locked to its worker before others may retry
+# it, and the exponential backoff between failed attempts
+
+JOB_VISIBILITY_TIMEOUT = 300
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 30
+JOB_RETRY_BACKOFF_MAX = 3600
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        """ connect signal receivers and register job tasks """
+        from core import signals, tasks  # noqa: F401
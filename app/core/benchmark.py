@@ -0,0 +1,276 @@
+import json
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core import models
+from kostzy import sync
+
+
+ROUTE_MODULES = ('kostzy.urls', 'userauth.urls')
+MODES = ('anonymous', 'authenticated')
+
+# most queries a GET on each route may run for a page of results,
+# including the token lookup of authenticated requests
+QUERY_BUDGETS = {
+    'kostzy:tag-list': 2,
+    'kostzy:feed-list': 5,
+    'kostzy:feed-detail': 5,
+    'kostzy:feed-export': 5,
+    'kostzy:like-list': 2,
+    'kostzy:comment-list': 3,
+    'kostzy:comment-export': 3,
+    'kostzy:community-list': 3,
+    'kostzy:community-export': 3,
+    'kostzy:community-detail': 2,
+    'kostzy:communitydiscussion-list': 4,
+    'kostzy:discussioncomment-list': 2,
+    'kostzy:discussionlike-list': 2,
+    'kostzy:map-cluster-list': 3,
+    'kostzy:sync-list': 10,
+    'userauth:profile': 3,
+}
+
+# routes that answer anonymous requests with 401, only measured signed in
+LOGIN_ROUTES = {
+    'kostzy:like-list',
+    'kostzy:discussionlike-list',
+    'kostzy:sync-list',
+    'userauth:profile',
+}
+# admin only routes, measured with the token of a staff user
+STAFF_ROUTES = {
+    'kostzy:feed-export',
+    'kostzy:comment-export',
+    'kostzy:community-export',
+}
+STAFF_EMAIL = 'benchmark-staff@kostzy.local'
+
+# an LRUCache that keeps nothing, so anonymous lists run their queries
+# instead of being answered from the response cache after the warmup
+UNCACHED_RESPONSES = {
+    'BACKEND': 'core.cache.LRUCache',
+    'OPTIONS': {'max_entries': 0},
+}
+
+
+def _patterns(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _patterns(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}', pattern
+
+
+def get_routes():
+    """ names of the GET routes registered in the kostzy and userauth urls """
+    routes = []
+    for module_name in ROUTE_MODULES:
+        module = import_module(module_name)
+        for name, pattern in _patterns(module.urlpatterns, module.app_name):
+            if 'format' in pattern.pattern.regex.groupindex \
+                    or name.endswith('api-root') or name in routes:
+                continue
+
+            callback = pattern.callback
+            actions = getattr(callback, 'actions', None)
+            if actions is not None:
+                is_get = 'get' in actions
+            else:
+                is_get = hasattr(getattr(callback, 'cls', None), 'get')
+            if is_get:
+                routes.append(name)
+
+    return routes
+
+
+def sample_requests():
+    """ reverse args and query params per route, from existing rows """
+    feed = models.Feed.objects.order_by('-comment_count', 'id').first()
+    community = models.Community.objects.order_by('id').first()
+    discussion = models.CommunityDiscussion.objects \
+        .order_by('-comment_count', 'id').first()
+
+    samples = {
+        'kostzy:tag-list': ([], {}),
+        'kostzy:feed-list': ([], {}),
+        'kostzy:feed-export': ([], {}),
+        'kostzy:like-list': ([], {}),
+        'kostzy:community-list': ([], {}),
+        'kostzy:community-export': ([], {}),
+        'kostzy:discussionlike-list': ([], {}),
+        'kostzy:map-cluster-list': ([], {
+            'bbox': '-8.0,105.0,-5.5,108.0',
+            'zoom': 8
+        }),
+        'kostzy:sync-list': ([], {'since': sync.encode_token({
+            kind.name: (timezone.now() - timedelta(days=1), 0)
+            for kind in sync.KINDS
+        })}),
+        'userauth:profile': ([], {}),
+    }
+    if feed is not None:
+        samples['kostzy:feed-detail'] = ([feed.id], {})
+        samples['kostzy:comment-list'] = ([], {'feed': feed.id})
+        samples['kostzy:comment-export'] = ([], {'feed': feed.id})
+    if community is not None:
+        samples['kostzy:community-detail'] = ([community.id], {})
+        samples['kostzy:communitydiscussion-list'] = (
+            [],
+            {'community': community.id}
+        )
+    if discussion is not None:
+        samples['kostzy:discussioncomment-list'] = (
+            [],
+            {'discussion': discussion.id}
+        )
+
+    return samples
+
+
+def authenticated_client(user=None):
+    """ client sending the token of user, the most active one by default """
+    if user is None:
+        user = models.User.objects.order_by('-exp', 'id').first()
+    token, _ = Token.objects.get_or_create(user=user)
+
+    return Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+
+def staff_client():
+    """ client sending the token of the benchmark staff user """
+    user, created = models.User.objects.get_or_create(
+        email=STAFF_EMAIL,
+        defaults={'name': 'Benchmark', 'is_staff': True}
+    )
+    if created:
+        user.set_unusable_password()
+        user.save()
+
+    return authenticated_client(user)
+
+
+def route_clients(name, clients):
+    """ (mode, client) pairs a route is measured with """
+    if name in STAFF_ROUTES:
+        return [('authenticated', clients['staff'])]
+    if name in LOGIN_ROUTES:
+        return [('authenticated', clients['authenticated'])]
+
+    return [(mode, clients[mode]) for mode in MODES]
+
+
+def percentile(values, percent):
+    """ nearest rank percentile of a non empty list """
+    ordered = sorted(values)
+    rank = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def measure(client, url, params, iterations=20, warmup=2):
+    """ latency, throughput and query count of GET url """
+    for _ in range(warmup):
+        client.get(url, params)
+
+    latencies = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = client.get(url, params)
+            # streamed bodies are produced, and queried, as they are read
+            content = b''.join(response.streaming_content) \
+                if response.streaming else response.content
+            latencies.append(time.perf_counter() - start)
+        queries.append(len(captured))
+
+    total = sum(latencies)
+    return {
+        'status': response.status_code,
+        'bytes': len(content),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput_rps': iterations / total if total else 0.0,
+        'queries': max(queries),
+    }
+
+
+def run(routes=None, modes=MODES, iterations=20, warmup=2):
+    """
+    benchmark every route in the modes it serves, return the report;
+    the response cache is off so the queries of every request count
+    """
+    samples = sample_requests()
+    clients = {
+        'anonymous': Client(),
+        'authenticated': authenticated_client(),
+        'staff': staff_client(),
+    }
+    report = {'iterations': iterations, 'results': {}, 'skipped': []}
+    with override_settings(RESPONSE_CACHE=UNCACHED_RESPONSES):
+        for name in routes or get_routes():
+            if name not in samples:
+                report['skipped'].append(name)
+                continue
+
+            args, params = samples[name]
+            url = reverse(name, args=args)
+            for mode, client in route_clients(name, clients):
+                if mode not in modes:
+                    continue
+
+                result = measure(client, url, params, iterations, warmup)
+                result['budget'] = QUERY_BUDGETS.get(name)
+                report['results'][f'{name} {mode}'] = result
+
+    return report
+
+
+def compare(report, baseline, threshold=0.2):
+    """ regressions of report against a baseline report """
+    regressions = []
+    for key, result in report['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            continue
+
+        if result['queries'] > before['queries']:
+            regressions.append(
+                f'{key}: queries {before["queries"]} -> {result["queries"]}'
+            )
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if result[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f'{key}: {metric} {before[metric]:.1f} -> '
+                    f'{result[metric]:.1f}'
+                )
+
+    return regressions
+
+
+def over_budget(report):
+    """ results running more queries than their budget """
+    return [
+        f'{key}: {result["queries"]} queries, budget {result["budget"]}'
+        for key, result in report['results'].items()
+        if result['budget'] is not None
+        and result['queries'] > result['budget']
+    ]
+
+
+def dump(report, path):
+    with open(path, 'w') as out:
+        json.dump(report, out, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as source:
+        return json.load(source)
@@ -0,0 +1,19 @@
+def bulk_create(model, objs, batch_size=None):
+    """
+    insert objs in batches and make sure they carry their ids
+
+    backends that cannot return ids from bulk inserts get them read back,
+    which is only safe while no other writer inserts rows of the model,
+    as under SQLite's database wide write lock
+    """
+    if not objs:
+        return objs
+
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    if objs[0].pk is None:
+        ids = model.objects.order_by('-pk') \
+            .values_list('pk', flat=True)[:len(objs)]
+        for obj, pk in zip(objs, reversed(list(ids))):
+            obj.pk = pk
+
+    return objs
@@ -0,0 +1,165 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class LRUCache:
+    """
+    bounded in-process cache, the least recently used entry is evicted
+    once max_entries is reached and entries expire after timeout seconds
+
+    entries live in one worker process only, use SharedCache when several
+    workers must see each other's writes and deletes
+    """
+
+    def __init__(self, max_entries=1000, timeout=300):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                return default
+
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCache:
+    """
+    cache stored in a Django cache alias, the file based alias in settings
+    stands in for memcached / redis so gunicorn workers on one host share
+    entries
+    """
+
+    def __init__(self, alias='shared', timeout=300, key_prefix=''):
+        self.alias = alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get(self, key, default=None):
+        return self.backend.get(self.key_prefix + key, default)
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+
+        self.backend.set(self.key_prefix + key, value, timeout)
+
+    def delete(self, key):
+        self.backend.delete(self.key_prefix + key)
+
+    def clear(self):
+        self.backend.clear()
+
+
+_instances = {}
+
+
+def get_cache(setting_name):
+    """
+    cache configured by a settings dict like
+    {'BACKEND': 'core.cache.LRUCache', 'OPTIONS': {'max_entries': 100}}
+    """
+    if setting_name not in _instances:
+        config = getattr(settings, setting_name)
+        backend = import_string(config['BACKEND'])
+        _instances[setting_name] = backend(**config.get('OPTIONS', {}))
+
+    return _instances[setting_name]
+
+
+def reset_caches(**kwargs):
+    """ rebuild configured caches when their settings are overridden """
+    _instances.pop(kwargs['setting'], None)
+
+
+setting_changed.connect(reset_caches)
+
+
+def version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(cache, namespace):
+    """ current version token of a namespace of cache entries """
+    version = cache.get(version_key(namespace))
+    if version is None:
+        version = bump_version(cache, namespace)
+
+    return version
+
+
+def bump_version(cache, namespace):
+    """
+    orphan every entry keyed on the current version of a namespace, a new
+    random token never collides with one handed out before
+    """
+    version = uuid.uuid4().hex
+    cache.set(version_key(namespace), version)
+    return version
+
+
+# cached responses showing rows of each model, by model label
+RESPONSE_NAMESPACES = {
+    'core.Feed': ('feeds',),
+    'core.Feed_tags': ('feeds',),
+    'core.FeedImage': ('feeds',),
+    'core.Like': ('feeds',),
+    'core.Comment': ('feeds',),
+    'core.Tag': ('feeds',),
+    'core.User': ('feeds',),
+    'core.Community': ('communities',),
+}
+
+
+def bump_response_versions(*namespaces):
+    """
+    invalidate cached responses of the namespaces right away and again
+    once the transaction commits, so a response computed from the old rows
+    while the transaction was open is not kept under the new version
+    """
+    def bump():
+        cache = get_cache('RESPONSE_CACHE')
+        for namespace in namespaces:
+            bump_version(cache, namespace)
+
+    bump()
+    transaction.on_commit(bump)
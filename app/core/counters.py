@@ -0,0 +1,97 @@
+from collections import namedtuple
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, \
+                             Value
+from django.db.models.functions import Coalesce
+
+from core import models
+from core.cache import RESPONSE_NAMESPACES, bump_response_versions
+
+
+Counter = namedtuple('Counter', ['source', 'field', 'target', 'column'])
+
+COUNTERS = (
+    Counter(models.Like, 'feed', models.Feed, 'like_count'),
+    Counter(models.Comment, 'feed', models.Feed, 'comment_count'),
+    Counter(
+        models.DiscussionLike,
+        'discussion',
+        models.CommunityDiscussion,
+        'like_count'
+    ),
+    Counter(
+        models.DiscussionComment,
+        'discussion',
+        models.CommunityDiscussion,
+        'comment_count'
+    ),
+)
+
+
+def counters_for(source):
+    """ counters kept up to date by rows of the source model """
+    return [counter for counter in COUNTERS if counter.source is source]
+
+
+def count_subquery(model, field, **filters):
+    """ correlated COUNT(*) of `model` rows pointing to the outer row """
+    rows = model.objects.filter(**{field: OuterRef('pk')}, **filters) \
+        .order_by() \
+        .values(field) \
+        .annotate(total=Count('*')) \
+        .values('total')
+
+    return Coalesce(
+        Subquery(rows, output_field=IntegerField()),
+        Value(0)
+    )
+
+
+def increment(counter, pk, delta):
+    """ atomically add delta to the stored count of target row pk """
+    counter.target.objects.filter(pk=pk).update(
+        **{counter.column: F(counter.column) + delta}
+    )
+
+
+def reconcile(counter, batch_size=1000):
+    """
+    recount the stored counts in batches of target rows and rewrite the
+    drifted ones, return the number of rows fixed
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            counter.target.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', counter.column)[:batch_size]
+        )
+        if not rows:
+            if fixed:
+                bump_response_versions(*RESPONSE_NAMESPACES.get(
+                    counter.target._meta.label,
+                    ()
+                ))
+            return fixed
+
+        last_pk = rows[-1][0]
+        actual = dict(
+            counter.source.objects
+            .filter(**{f'{counter.field}__in': [pk for pk, _ in rows]})
+            .order_by()
+            .values(counter.field)
+            .annotate(total=Count('*'))
+            .values_list(counter.field, 'total')
+        )
+        drifted = [
+            pk for pk, stored in rows if stored != actual.get(pk, 0)
+        ]
+        if drifted:
+            # recount inside the UPDATE so concurrent writes are not lost
+            fixed += counter.target.objects.filter(pk__in=drifted).update(
+                **{counter.column: count_subquery(
+                    counter.source,
+                    counter.field
+                )}
+            )
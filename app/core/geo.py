@@ -0,0 +1,109 @@
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, \
+                                       Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0
+
+# feeds are bucketed into a fixed grid of CELL_DEGREES wide cells, the
+# cell number grows west to east then south to north so the cells of one
+# grid row form a contiguous range of the indexed column
+CELL_DEGREES = 0.1
+COLUMNS = int(round(360 / CELL_DEGREES))
+ROWS = int(round(180 / CELL_DEGREES))
+
+
+def cell_row(lat):
+    """ grid row of a latitude """
+    return min(int(math.floor((float(lat) + 90) / CELL_DEGREES)), ROWS - 1)
+
+
+def cell_column(long):
+    """ grid column of a longitude """
+    column = int(math.floor((float(long) + 180) / CELL_DEGREES))
+    return min(column, COLUMNS - 1)
+
+
+def cell_for(lat, long):
+    """ grid cell number of a coordinate """
+    if lat is None or long is None:
+        return None
+
+    return cell_row(lat) * COLUMNS + cell_column(long)
+
+
+def bounding_box(lat, long, radius_km):
+    """ (south, west, north, east) box holding a circle around a point """
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south = max(lat - lat_delta, -90.0)
+    north = min(lat + lat_delta, 90.0)
+
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    if cos_lat < 1e-6:
+        return south, -180.0, north, 180.0
+
+    long_delta = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if long_delta >= 180:
+        return south, -180.0, north, 180.0
+
+    return south, long - long_delta, north, long + long_delta
+
+
+def longitude_spans(west, east):
+    """ split a west..east span crossing the antimeridian in two """
+    if west < -180:
+        return [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return [(west, 180.0), (-180.0, east - 360)]
+
+    return [(west, east)]
+
+
+def cell_ranges(south, west, north, east):
+    """ (first, last) cell number ranges covering a bounding box """
+    ranges = []
+    for row in range(cell_row(south), cell_row(north) + 1):
+        for span_west, span_east in longitude_spans(west, east):
+            ranges.append((
+                row * COLUMNS + cell_column(span_west),
+                row * COLUMNS + cell_column(span_east),
+            ))
+
+    return ranges
+
+
+def haversine_km(lat, long, lat_field='lat', long_field='long'):
+    """ SQL expression of the distance in km from a point to a row """
+    row_lat = Radians(Cast(F(lat_field), FloatField()))
+    row_long = Radians(Cast(F(long_field), FloatField()))
+    half_dlat = (row_lat - _float(math.radians(lat))) / _float(2)
+    half_dlong = (row_long - _float(math.radians(long))) / _float(2)
+
+    a = Power(Sin(half_dlat), 2) + \
+        _float(math.cos(math.radians(lat))) * Cos(row_lat) * \
+        Power(Sin(half_dlong), 2)
+
+    return _float(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), _float(1)))
+
+
+def _float(value):
+    return Value(float(value), output_field=FloatField())
+
+
+def tile_degrees(zoom):
+    """
+    width in degrees of a cluster tile at a map zoom level, a quarter of
+    a 256px web map tile so a screen holds a few hundred clusters
+    """
+    return 360.0 / 2 ** (zoom + 2)
+
+
+def tile_of(lat, long, zoom):
+    """ (tile_x, tile_y) of a coordinate at a zoom level """
+    size = tile_degrees(zoom)
+    return (
+        int(math.floor((float(long) + 180) / size)),
+        int(math.floor((float(lat) + 90) / size)),
+    )
@@ -0,0 +1,73 @@
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from core import jobs
+
+
+# (field, longest side in px, jpeg quality) of every variant
+VARIANTS = (
+    ('thumbnail', 200, 70),
+    ('medium', 800, 80),
+    ('full', 1600, 85),
+)
+
+
+def create_variants(instance):
+    """ write resized, recompressed jpeg variants of instance.image """
+    with instance.image.open('rb') as source:
+        original = Image.open(source)
+        original.load()
+
+    original = ImageOps.exif_transpose(original)
+    if original.mode != 'RGB':
+        original = original.convert('RGB')
+
+    for field, size, quality in VARIANTS:
+        variant = original.copy()
+        variant.thumbnail((size, size), Image.LANCZOS)
+        output = BytesIO()
+        variant.save(
+            output,
+            'JPEG',
+            quality=quality,
+            optimize=True,
+            progressive=True
+        )
+        getattr(instance, field).save(
+            f'{field}.jpg',
+            ContentFile(output.getvalue()),
+            save=False
+        )
+
+    instance.save(update_fields=[field for field, _, _ in VARIANTS])
+
+
+def process(model_label, pk):
+    """ create the variants of one stored image row """
+    model = apps.get_model(model_label)
+    try:
+        instance = model.objects.get(pk=pk)
+    except model.DoesNotExist:
+        return
+
+    if instance.image:
+        create_variants(instance)
+
+
+def process_later(instance):
+    """ queue a job creating the variants once the upload commits """
+    jobs.enqueue(
+        'images.process',
+        {'model_label': instance._meta.label, 'pk': instance.pk}
+    )
+
+
+def process_many_later(instances):
+    """ queue the variant jobs of many stored images at once """
+    jobs.enqueue_many('images.process', [
+        {'model_label': instance._meta.label, 'pk': instance.pk}
+        for instance in instances
+    ])
@@ -0,0 +1,160 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core import models
+
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(name):
+    """ register a function as the handler of jobs called name """
+    def register(func):
+        _tasks[name] = func
+        return func
+
+    return register
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def enqueue(name, payload=None, run_at=None, max_attempts=None):
+    """
+    queue a job, the row is written in the current transaction so the job
+    only becomes visible to workers once the caller commits
+    """
+    if name not in _tasks:
+        raise KeyError(f'Unknown task {name}')
+
+    return models.Job.objects.create(
+        task=name,
+        payload=json.dumps(payload or {}),
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+    )
+
+
+def enqueue_many(name, payloads, max_attempts=None):
+    """ queue one job per payload with a single insert """
+    if name not in _tasks:
+        raise KeyError(f'Unknown task {name}')
+
+    now = timezone.now()
+    return models.Job.objects.bulk_create([
+        models.Job(
+            task=name,
+            payload=json.dumps(payload),
+            run_at=now,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+        )
+        for payload in payloads
+    ])
+
+
+def backoff(attempts):
+    """ seconds to wait before retrying a job that failed attempts times """
+    base = settings.JOB_RETRY_BACKOFF
+    return min(base * 2 ** (attempts - 1), settings.JOB_RETRY_BACKOFF_MAX)
+
+
+def claim(limit=1, visibility_timeout=None):
+    """
+    lock up to limit due jobs for this worker
+
+    rows are selected with FOR UPDATE SKIP LOCKED so concurrent workers
+    never claim the same job, running jobs whose lease expired (the worker
+    died or hung) are claimed again
+    """
+    if visibility_timeout is None:
+        visibility_timeout = settings.JOB_VISIBILITY_TIMEOUT
+
+    now = timezone.now()
+    due = Q(status=models.Job.QUEUED, run_at__lte=now) \
+        | Q(status=models.Job.RUNNING, locked_until__lt=now)
+    with transaction.atomic():
+        jobs = list(
+            models.Job.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('run_at', 'id')[:limit]
+        )
+        expired = [job.pk for job in jobs if job.attempts >= job.max_attempts]
+        if expired:
+            models.Job.objects.filter(pk__in=expired).update(
+                status=models.Job.FAILED,
+                locked_until=None,
+                last_error='Visibility timeout expired on the last attempt'
+            )
+
+        jobs = [job for job in jobs if job.pk not in expired]
+        locked_until = now + timedelta(seconds=visibility_timeout)
+        models.Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=models.Job.RUNNING,
+            locked_until=locked_until,
+            attempts=F('attempts') + 1
+        )
+
+    for job in jobs:
+        job.status = models.Job.RUNNING
+        job.locked_until = locked_until
+        job.attempts += 1
+
+    return jobs
+
+
+def _finish(job, **fields):
+    """ update a claimed job unless another worker took over its lease """
+    return models.Job.objects.filter(
+        pk=job.pk,
+        status=models.Job.RUNNING,
+        locked_until=job.locked_until
+    ).update(**fields)
+
+
+def run(job):
+    """ run a claimed job, schedule a retry with backoff when it fails """
+    try:
+        get_task(job.task)(**json.loads(job.payload))
+    except Exception:
+        logger.exception('Job %s (%s) failed', job.pk, job.task)
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            _finish(
+                job,
+                status=models.Job.FAILED,
+                locked_until=None,
+                last_error=error
+            )
+        else:
+            _finish(
+                job,
+                status=models.Job.QUEUED,
+                locked_until=None,
+                run_at=timezone.now() + timedelta(
+                    seconds=backoff(job.attempts)
+                ),
+                last_error=error
+            )
+        return False
+
+    _finish(job, status=models.Job.DONE, locked_until=None)
+    return True
+
+
+def work(visibility_timeout=None):
+    """ claim and run one job, return False when none was due """
+    jobs = claim(1, visibility_timeout)
+    for job in jobs:
+        run(job)
+
+    return bool(jobs)
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark the read endpoints """
+    help = ('Measure latency, throughput and queries of every GET route, '
+            'run it against a dataset from seed_data')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--route',
+            action='append',
+            dest='routes',
+            help='route name to benchmark, e.g. kostzy:feed-list'
+        )
+        parser.add_argument(
+            '--mode',
+            action='append',
+            dest='modes',
+            choices=benchmark.MODES
+        )
+        parser.add_argument('--output', help='path of the JSON report')
+        parser.add_argument(
+            '--baseline',
+            help='JSON report to compare against'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='allowed latency increase over the baseline'
+        )
+
+    def handle(self, *args, **options):
+        report = benchmark.run(
+            routes=options['routes'],
+            modes=options['modes'] or benchmark.MODES,
+            iterations=options['iterations'],
+            warmup=options['warmup']
+        )
+
+        for key, result in sorted(report['results'].items()):
+            self.stdout.write(
+                f'{key:50} {result["status"]} '
+                f'p50 {result["p50_ms"]:8.1f}ms '
+                f'p95 {result["p95_ms"]:8.1f}ms '
+                f'p99 {result["p99_ms"]:8.1f}ms '
+                f'{result["throughput_rps"]:8.1f} req/s '
+                f'{result["queries"]} queries'
+            )
+        for name in report['skipped']:
+            self.stdout.write(f'{name}: skipped, no sample rows')
+
+        if options['output']:
+            benchmark.dump(report, options['output'])
+
+        problems = benchmark.over_budget(report)
+        if options['baseline']:
+            problems += benchmark.compare(
+                report,
+                benchmark.load(options['baseline']),
+                options['threshold']
+            )
+        if problems:
+            raise CommandError('\n'.join(['Regressions found:'] + problems))
+
+        self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core import tiles
+
+
+class Command(BaseCommand):
+    """ Django command to recompute the precomputed feed map tiles """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'zooms',
+            nargs='*',
+            type=int,
+            help='zoom levels to rebuild, defaults to MAP_TILE_ZOOMS'
+        )
+
+    def handle(self, *args, **options):
+        for zoom in options['zooms'] or tiles.summary_zooms():
+            count = tiles.rebuild(zoom)
+            self.stdout.write(f'zoom {zoom}: {count} tiles')
+
+        self.stdout.write(self.style.SUCCESS('Map tiles rebuilt'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    """ Django command to fix drifted like / comment counters """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='number of rows recounted per query'
+        )
+
+    def handle(self, *args, **options):
+        for counter in counters.COUNTERS:
+            fixed = counters.reconcile(
+                counter,
+                batch_size=options['batch_size']
+            )
+            self.stdout.write(
+                f'{counter.target.__name__}.{counter.column}: '
+                f'{fixed} rows fixed'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Counters reconciled'))
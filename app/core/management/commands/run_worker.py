@@ -0,0 +1,83 @@
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    """ Django command to run queued background jobs """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='number of jobs run at the same time'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='seconds to wait when no job is due'
+        )
+        parser.add_argument(
+            '--visibility-timeout',
+            type=int,
+            default=settings.JOB_VISIBILITY_TIMEOUT,
+            help='seconds a claimed job is locked before others may retry it'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='exit once no job is due instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+        concurrency = max(options['concurrency'], 1)
+        threads = [
+            threading.Thread(
+                target=self.loop,
+                args=(options,),
+                name=f'worker-{i}',
+                daemon=True
+            )
+            for i in range(concurrency - 1)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            # the main thread is one of the workers
+            self.loop(options)
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping, waiting for running jobs...')
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{self.processed} jobs processed')
+        )
+
+    def loop(self, options):
+        """ claim and run jobs until stopped """
+        try:
+            while not self.stop.is_set():
+                if jobs.work(options['visibility_timeout']):
+                    with self.lock:
+                        self.processed += 1
+                elif options['once']:
+                    break
+                else:
+                    self.stop.wait(options['poll_interval'])
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
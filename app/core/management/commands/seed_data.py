@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+
+from core.seed import Seeder
+
+
+class Command(BaseCommand):
+    """ Django command to generate a reproducible load testing dataset """
+    help = ('Bulk generate users, feeds, likes, comments, communities and '
+            'discussions, run it against an empty database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--feeds', type=int, default=10000)
+        parser.add_argument('--communities', type=int, default=50)
+        parser.add_argument('--discussions', type=int, default=2000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='random seed, the same seed gives the same dataset'
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.5,
+            help='power law shape of likes, comments and community sizes'
+        )
+        parser.add_argument(
+            '--image-ratio',
+            type=float,
+            default=0.3,
+            help='share of feeds with images'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='length of the period the dates are spread over'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            users=options['users'],
+            feeds=options['feeds'],
+            communities=options['communities'],
+            discussions=options['discussions'],
+            seed=options['seed'],
+            alpha=options['alpha'],
+            image_ratio=options['image_ratio'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout
+        )
+        created = seeder.run()
+
+        for name, count in created.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS('Dataset seeded'))
@@ -0,0 +1,229 @@
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """ cumulative bucket counts plus sum and count of observations """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        """ prometheus sample lines of the histogram """
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            le = _labels(labels + (('le', bound),))
+            yield f'{name}_bucket{le} {cumulative}'
+        yield f'{name}_sum{_labels(labels)} {_number(self.sum)}'
+        yield f'{name}_count{_labels(labels)} {self.count}'
+
+    def dump(self):
+        return {'counts': self.counts, 'sum': self.sum, 'count': self.count}
+
+    def merge(self, state):
+        self.counts = [a + b for a, b in zip(self.counts, state['counts'])]
+        self.sum += state['sum']
+        self.count += state['count']
+
+
+class RouteMetrics:
+    """ request, latency and database metrics of one route """
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = 0.0
+
+    def dump(self):
+        return {
+            'requests': self.requests,
+            'latency': self.latency.dump(),
+            'queries': self.queries.dump(),
+            'db_seconds': self.db_seconds,
+        }
+
+    def merge(self, state):
+        for status, count in state['requests'].items():
+            self.requests[int(status)] += count
+        self.latency.merge(state['latency'])
+        self.queries.merge(state['queries'])
+        self.db_seconds += state['db_seconds']
+
+
+class Registry:
+    """
+    metrics keyed by (route, method)
+
+    every gunicorn worker counts its own requests and writes them to a
+    file of its own in settings.METRICS_DIR, at most every
+    METRICS_FLUSH_SECONDS and before it renders; render() sums the files
+    of every worker, so whichever worker a scrape reaches serves the
+    totals of all of them; files of exited workers are kept so the
+    totals never go down; without a METRICS_DIR each process only serves
+    its own counters
+    """
+
+    def __init__(self):
+        self._routes = defaultdict(RouteMetrics)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+        self._flushed = 0.0
+
+    def observe(self, route, method, status, seconds, queries, db_seconds):
+        """ record one finished request """
+        with self._lock:
+            self._check_process()
+            metrics = self._routes[(route, method)]
+            metrics.requests[status] += 1
+            metrics.latency.observe(seconds)
+            metrics.queries.observe(queries)
+            metrics.db_seconds += db_seconds
+            if time.monotonic() - self._flushed \
+                    >= settings.METRICS_FLUSH_SECONDS:
+                self._flush()
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+            if self._path is not None and os.path.exists(self._path):
+                os.remove(self._path)
+
+    def _check_process(self):
+        """ start from zero in a forked child, under a file of its own """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._path = None
+            self._routes.clear()
+
+    def _flush(self):
+        """ write the counters of this process to its file """
+        directory = settings.METRICS_DIR
+        self._flushed = time.monotonic()
+        if not directory:
+            return
+
+        if self._path is None or os.path.dirname(self._path) != directory:
+            os.makedirs(directory, exist_ok=True)
+            name = f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+            self._path = os.path.join(directory, name)
+
+        state = [
+            [route, method, metrics.dump()]
+            for (route, method), metrics in self._routes.items()
+        ]
+        partial = self._path + '.tmp'
+        with open(partial, 'w') as file:
+            json.dump(state, file)
+        os.replace(partial, self._path)
+
+    def _collect(self):
+        """ metrics of every worker's file, or of this process only """
+        directory = settings.METRICS_DIR
+        if not directory:
+            return self._routes
+
+        routes = defaultdict(RouteMetrics)
+        for name in os.listdir(directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as file:
+                    state = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for route, method, metrics in state:
+                routes[(route, method)].merge(metrics)
+
+        return routes
+
+    def render(self):
+        """ prometheus text exposition of every route """
+        with self._lock:
+            self._check_process()
+            self._flush()
+            routes = sorted(self._collect().items())
+            lines = [
+                '# HELP http_requests_total Requests by route and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (route, method), metrics in routes:
+                for status, count in sorted(metrics.requests.items()):
+                    labels = (
+                        ('route', route),
+                        ('method', method),
+                        ('status', status)
+                    )
+                    lines.append(f'http_requests_total{_labels(labels)} '
+                                 f'{count}')
+
+            lines += [
+                '# HELP http_request_duration_seconds Request latency.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (route, method), metrics in routes:
+                lines += metrics.latency.lines(
+                    'http_request_duration_seconds',
+                    (('route', route), ('method', method))
+                )
+
+            lines += [
+                '# HELP db_queries_per_request Database queries per request.',
+                '# TYPE db_queries_per_request histogram',
+            ]
+            for (route, method), metrics in routes:
+                lines += metrics.queries.lines(
+                    'db_queries_per_request',
+                    (('route', route), ('method', method))
+                )
+
+            lines += [
+                '# HELP db_query_duration_seconds_total Database time.',
+                '# TYPE db_query_duration_seconds_total counter',
+            ]
+            for (route, method), metrics in routes:
+                labels = _labels((('route', route), ('method', method)))
+                lines.append(f'db_query_duration_seconds_total{labels} '
+                             f'{_number(metrics.db_seconds)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs):
+    escaped = (
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value):
+    return repr(float(value))
+
+
+registry = Registry()
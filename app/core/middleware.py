@@ -0,0 +1,252 @@
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from core import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class QueryCounter:
+    """ database execute wrapper counting queries and their time """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def counting(counter):
+    """ context installing counter on every database connection """
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(counter))
+
+    return stack
+
+
+class MetricsMiddleware:
+    """
+    record latency and database usage of every request per route
+
+    streamed bodies run their queries while they are read, after the view
+    returned, so those are observed once the stream is exhausted or closed
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with counting(counter):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self.observe_stream(
+                response.streaming_content,
+                request,
+                response,
+                counter,
+                start
+            )
+        else:
+            self.observe(request, response, counter, start)
+
+        return response
+
+    def observe_stream(self, content, request, response, counter, start):
+        try:
+            with counting(counter):
+                yield from content
+        finally:
+            self.observe(request, response, counter, start)
+
+    def observe(self, request, response, counter, start):
+        match = getattr(request, 'resolver_match', None)
+        metrics.registry.observe(
+            route=match.view_name if match else 'unresolved',
+            method=request.method,
+            status=response.status_code,
+            seconds=time.perf_counter() - start,
+            queries=counter.count,
+            db_seconds=counter.seconds
+        )
+
+
+class GzipEncoder:
+    """ incremental gzip stream """
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + 15)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        """ everything compressed so far, without ending the stream """
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    """ incremental brotli stream, needs the optional brotli package """
+    name = 'br'
+
+    def __init__(self, quality=5):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def available_encoders():
+    """ supported encoders by name, the preferred one first """
+    encoders = {}
+    if brotli is not None:
+        encoders[BrotliEncoder.name] = BrotliEncoder
+    encoders[GzipEncoder.name] = GzipEncoder
+
+    return encoders
+
+
+def accepted_encodings(header):
+    """ q value of every coding in an Accept-Encoding header """
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+
+    return accepted
+
+
+def negotiate(header):
+    """ encoder class the client accepts with the highest q, or None """
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for name, encoder in available_encoders().items():
+        q = accepted.get(name, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoder, q
+
+    return best
+
+
+def compressible(response):
+    """ whether the content type is worth compressing """
+    content_type = response.get('Content-Type', '').lower()
+    return any(
+        content_type.startswith(prefix)
+        for prefix in settings.COMPRESSION_CONTENT_TYPES
+    )
+
+
+def weaken_etag(response):
+    """
+    a strong ETag becomes weak, the encoded bytes differ from the
+    identity ones; ConditionalGetMixin compares ETags weakly
+    """
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+def compress_stream(chunks, encoder):
+    """ compress chunks, flushing after each so none waits for the next """
+    for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+
+    yield encoder.finish()
+
+
+class CompressionMiddleware:
+    """
+    compress responses with the best encoding the client accepts, brotli
+    when the brotli package is installed and gzip otherwise
+
+    only COMPRESSION_CONTENT_TYPES are compressed, so images and other
+    media that are compressed already pass through; bodies shorter than
+    COMPRESSION_MIN_LENGTH are sent as they are and streaming responses
+    are compressed chunk by chunk
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        encoder_class = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if response.status_code == 304:
+            # a 304 has no body to compress but must carry the ETag the
+            # compressed response would
+            if encoder_class is not None:
+                weaken_etag(response)
+            return response
+
+        if response.has_header('Content-Encoding') \
+                or 'no-transform' in response.get('Cache-Control', '') \
+                or not compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if encoder_class is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content,
+                encoder_class()
+            )
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+                return response
+
+            encoder = encoder_class()
+            content = encoder.compress(response.content) + encoder.finish()
+            if len(content) >= len(response.content):
+                return response
+
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        weaken_etag(response)
+        response['Content-Encoding'] = encoder_class.name
+
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.14 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_tag_color'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['feed', '-date', '-id'], name='comment_feed_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='communitydiscussion',
+            index=models.Index(fields=['community', '-date', '-id'], name='discussion_comm_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discussioncomment',
+            index=models.Index(fields=['discussion', '-date', '-id'], name='disc_comment_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feed',
+            index=models.Index(fields=['-date', '-id'], name='feed_date_id_idx'),
+        ),
+    ]
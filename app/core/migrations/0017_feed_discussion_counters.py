@@ -0,0 +1,63 @@
+# Generated by Django 3.0.14 on 2026-10-18 06:46
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}) \
+        .order_by() \
+        .values(field) \
+        .annotate(total=Count('*')) \
+        .values('total')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def backfill_counters(apps, schema_editor):
+    Feed = apps.get_model('core', 'Feed')
+    Like = apps.get_model('core', 'Like')
+    Comment = apps.get_model('core', 'Comment')
+    Discussion = apps.get_model('core', 'CommunityDiscussion')
+    DiscussionLike = apps.get_model('core', 'DiscussionLike')
+    DiscussionComment = apps.get_model('core', 'DiscussionComment')
+
+    Feed.objects.update(
+        like_count=count_of(Like, 'feed'),
+        comment_count=count_of(Comment, 'feed'),
+    )
+    Discussion.objects.update(
+        like_count=count_of(DiscussionLike, 'discussion'),
+        comment_count=count_of(DiscussionComment, 'discussion'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='communitydiscussion',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='communitydiscussion',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='feed',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
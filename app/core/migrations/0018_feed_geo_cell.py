@@ -0,0 +1,33 @@
+# Generated by Django 3.0.14 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+from core import geo
+
+
+def backfill_geo_cell(apps, schema_editor):
+    Feed = apps.get_model('core', 'Feed')
+    batch = []
+    for feed in Feed.objects.only('id', 'lat', 'long').iterator():
+        feed.geo_cell = geo.cell_for(feed.lat, feed.long)
+        batch.append(feed)
+        if len(batch) == 1000:
+            Feed.objects.bulk_update(batch, ['geo_cell'])
+            batch = []
+    Feed.objects.bulk_update(batch, ['geo_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_feed_discussion_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feed',
+            name='geo_cell',
+            field=models.IntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_geo_cell, migrations.RunPython.noop),
+    ]
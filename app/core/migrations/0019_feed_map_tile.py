@@ -0,0 +1,29 @@
+# Generated by Django 3.0.14 on 2026-10-18 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_feed_geo_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedMapTile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.IntegerField()),
+                ('tile_x', models.IntegerField()),
+                ('tile_y', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('long_sum', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='feedmaptile',
+            constraint=models.UniqueConstraint(fields=('zoom', 'tile_y', 'tile_x'), name='unique_feed_map_tile'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.0.14 on 2026-10-18 06:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def dedupe_members(apps, schema_editor):
+    """ keep one membership per user and community, a joined one first """
+    Member = apps.get_model('core', 'CommunityMember')
+    duplicates = Member.objects.values('user_id', 'community_id') \
+        .annotate(total=Count('id')) \
+        .filter(total__gt=1)
+
+    for pair in duplicates.iterator():
+        rows = Member.objects.filter(
+            user_id=pair['user_id'],
+            community_id=pair['community_id']
+        ).order_by('-is_joined', 'id')
+        keep = rows.values_list('id', flat=True)[0]
+        rows.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_feed_map_tile'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_members, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='communitymember',
+            index=models.Index(fields=['user', 'is_joined', 'community'], name='member_user_joined_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='communitymember',
+            constraint=models.UniqueConstraint(fields=('user', 'community'), name='unique_community_member'),
+        ),
+    ]
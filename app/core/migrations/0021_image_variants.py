@@ -0,0 +1,44 @@
+# Generated by Django 3.0.14 on 2026-10-18 06:55
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_community_member_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discussionimage',
+            name='full',
+            field=models.ImageField(null=True, upload_to=core.models.image_path),
+        ),
+        migrations.AddField(
+            model_name='discussionimage',
+            name='medium',
+            field=models.ImageField(null=True, upload_to=core.models.image_path),
+        ),
+        migrations.AddField(
+            model_name='discussionimage',
+            name='thumbnail',
+            field=models.ImageField(null=True, upload_to=core.models.image_path),
+        ),
+        migrations.AddField(
+            model_name='feedimage',
+            name='full',
+            field=models.ImageField(null=True, upload_to=core.models.image_path),
+        ),
+        migrations.AddField(
+            model_name='feedimage',
+            name='medium',
+            field=models.ImageField(null=True, upload_to=core.models.image_path),
+        ),
+        migrations.AddField(
+            model_name='feedimage',
+            name='thumbnail',
+            field=models.ImageField(null=True, upload_to=core.models.image_path),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.0.14 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.IntegerField()),
+                ('parent_id', models.IntegerField(null=True)),
+                ('user_id', models.IntegerField(null=True)),
+                ('date', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['date', 'id'], name='comment_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='communitydiscussion',
+            index=models.Index(fields=['date', 'id'], name='discussion_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discussionlike',
+            index=models.Index(fields=['date', 'id'], name='disc_like_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['date', 'id'], name='like_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['date', 'id'], name='tombstone_date_id_idx'),
+        ),
+    ]
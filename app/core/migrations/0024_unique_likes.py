@@ -0,0 +1,86 @@
+# Generated by Django 3.0.14 on 2026-10-18 07:06
+
+from django.db import migrations, models, transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, \
+                             Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+BATCH_SIZE = 1000
+
+
+def count_of(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}) \
+        .order_by() \
+        .values(field) \
+        .annotate(total=Count('*')) \
+        .values('total')
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+def dedupe(apps, like_name, target_name, field):
+    """
+    delete every like but the first of a user on the same target, one
+    committed batch at a time, leaving tombstones for delta sync and
+    recounting the touched targets
+    """
+    Like = apps.get_model('core', like_name)
+    Target = apps.get_model('core', target_name)
+    Tombstone = apps.get_model('core', 'Tombstone')
+
+    earlier = Like.objects.filter(
+        user_id=OuterRef('user_id'),
+        **{f'{field}_id': OuterRef(f'{field}_id'), 'id__lt': OuterRef('id')}
+    )
+    duplicates = Like.objects.annotate(has_earlier=Exists(earlier)) \
+        .filter(has_earlier=True) \
+        .order_by('id')
+
+    while True:
+        with transaction.atomic():
+            rows = list(
+                duplicates.values_list('id', 'user_id', f'{field}_id')
+                [:BATCH_SIZE]
+            )
+            if not rows:
+                return
+
+            Tombstone.objects.bulk_create([
+                Tombstone(
+                    model=f'core.{like_name}',
+                    object_id=pk,
+                    parent_id=target_id,
+                    user_id=user_id
+                )
+                for pk, user_id, target_id in rows
+            ])
+            Like.objects.filter(id__in=[pk for pk, _, _ in rows]).delete()
+            Target.objects.filter(
+                id__in={target_id for _, _, target_id in rows}
+            ).update(like_count=count_of(Like, field))
+
+
+def dedupe_likes(apps, schema_editor):
+    dedupe(apps, 'Like', 'Feed', 'feed')
+    dedupe(apps, 'DiscussionLike', 'CommunityDiscussion', 'discussion')
+
+
+class Migration(migrations.Migration):
+    # every dedupe batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('core', '0023_delta_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='discussionlike',
+            constraint=models.UniqueConstraint(fields=('user', 'discussion'), name='unique_discussion_like'),
+        ),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('user', 'feed'), name='unique_feed_like'),
+        ),
+    ]
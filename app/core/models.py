@@ -2,10 +2,13 @@ import uuid
 import os
 
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, \
                                         PermissionsMixin
 from django.conf import settings
 
+from core import geo
+
 
 def image_path(instance, filename):
     """ generate filepath for images """
@@ -51,6 +54,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     image = models.ImageField(null=True, upload_to=image_path)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
+    # changes ETags of the responses embedding the user
+    updated = models.DateTimeField(auto_now=True)
 
     objects = UserManager()
 
@@ -61,6 +66,7 @@ class Tag(models.Model):
     """ tag model """
     name = models.CharField(max_length=255)
     color = models.CharField(max_length=255, blank=True)
+    updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -96,8 +102,21 @@ class Feed(models.Model):
         decimal_places=2
     )
     location_name = models.CharField(max_length=255, blank=True)
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+    geo_cell = models.IntegerField(null=True, db_index=True, editable=False)
     date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date', '-id'], name='feed_date_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """ keep the grid cell in step with the coordinate """
+        self.geo_cell = geo.cell_for(self.lat, self.long)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.feed
 
@@ -110,6 +129,9 @@ class FeedImage(models.Model):
         on_delete=models.CASCADE
     )
     image = models.ImageField(null=True, upload_to=image_path)
+    thumbnail = models.ImageField(null=True, upload_to=image_path)
+    medium = models.ImageField(null=True, upload_to=image_path)
+    full = models.ImageField(null=True, upload_to=image_path)
 
 
 class Like(models.Model):
@@ -121,6 +143,17 @@ class Like(models.Model):
     feed = models.ForeignKey(Feed, on_delete=models.CASCADE)
     date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='like_date_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'feed'],
+                name='unique_feed_like'
+            ),
+        ]
+
     def __str__(self):
         return self.feed.feed
 
@@ -135,6 +168,15 @@ class Comment(models.Model):
     comment = models.CharField(max_length=255)
     date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['feed', '-date', '-id'],
+                name='comment_feed_date_id_idx'
+            ),
+            models.Index(fields=['date', 'id'], name='comment_date_id_idx'),
+        ]
+
     def __str__(self):
         return self.comment
 
@@ -162,6 +204,20 @@ class CommunityMember(models.Model):
     community = models.ForeignKey(Community, on_delete=models.CASCADE)
     is_joined = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'community'],
+                name='unique_community_member'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'is_joined', 'community'],
+                name='member_user_joined_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.community.name
 
@@ -174,8 +230,22 @@ class CommunityDiscussion(models.Model):
     )
     community = models.ForeignKey(Community, on_delete=models.CASCADE)
     text = models.CharField(max_length=255)
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
     date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['community', '-date', '-id'],
+                name='discussion_comm_date_id_idx'
+            ),
+            models.Index(
+                fields=['date', 'id'],
+                name='discussion_date_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -188,6 +258,9 @@ class DiscussionImage(models.Model):
         on_delete=models.CASCADE
     )
     image = models.ImageField(null=True, upload_to=image_path)
+    thumbnail = models.ImageField(null=True, upload_to=image_path)
+    medium = models.ImageField(null=True, upload_to=image_path)
+    full = models.ImageField(null=True, upload_to=image_path)
 
 
 class DiscussionComment(models.Model):
@@ -202,6 +275,14 @@ class DiscussionComment(models.Model):
     comment = models.CharField(max_length=255)
     date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['discussion', '-date', '-id'],
+                name='disc_comment_date_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.comment
 
@@ -217,5 +298,96 @@ class DiscussionLike(models.Model):
     )
     date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['date', 'id'],
+                name='disc_like_date_id_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'discussion'],
+                name='unique_discussion_like'
+            ),
+        ]
+
     def __str__(self):
         return self.user.name
+
+
+class FeedMapTile(models.Model):
+    """ precomputed feed count and coordinate sums of a map tile """
+    zoom = models.IntegerField()
+    tile_x = models.IntegerField()
+    tile_y = models.IntegerField()
+    count = models.IntegerField(default=0)
+    lat_sum = models.FloatField(default=0)
+    long_sum = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['zoom', 'tile_y', 'tile_x'],
+                name='unique_feed_map_tile'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.zoom}/{self.tile_x}/{self.tile_y}'
+
+
+class Job(models.Model):
+    """ background job claimed by run_worker """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    task = models.CharField(max_length=255)
+    payload = models.TextField(default='{}')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='job_status_run_at_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} ({self.status})'
+
+
+class Tombstone(models.Model):
+    """ deleted row reported to clients by the delta sync """
+    model = models.CharField(max_length=100)
+    object_id = models.IntegerField()
+    parent_id = models.IntegerField(null=True)
+    user_id = models.IntegerField(null=True)
+    date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='tombstone_date_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
@@ -0,0 +1,14 @@
+import msgpack
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+
+class MessagePackParser(parsers.BaseParser):
+    """ parses MessagePack request bodies """
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except ValueError as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,32 @@
+import datetime
+import decimal
+
+import msgpack
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.serializers import MESSAGEPACK_FORMAT, epoch
+
+
+def encode(obj):
+    """ MessagePack value of the types msgpack does not know """
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.datetime):
+        return epoch(obj)
+
+    return JSONEncoder().default(obj)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """ renders response data as MessagePack """
+    media_type = 'application/msgpack'
+    format = MESSAGEPACK_FORMAT
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=encode, use_bin_type=True)
@@ -0,0 +1,317 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from core import bulk, geo, models, tiles
+from core.cache import bump_response_versions
+
+
+EMAIL_DOMAIN = 'seed.kostzy.test'
+TAG_NAMES = ('Happy', 'Gloom', 'Food', 'Info', 'Lost', 'Found', 'Event',
+             'Promo', 'Help', 'Question', 'Rent', 'Sale')
+TAG_COLORS = ('#F25F5C', '#FFE066', '#247BA0', '#70C1B3', '#50514F')
+CATEGORY_NAMES = ('Information', 'Food', 'Events', 'Lost and Found',
+                  'Marketplace', 'Help')
+# (lat, long) of the cities feeds and communities gather around
+CITIES = ((-6.20, 106.82), (-6.91, 107.61), (-7.25, 112.75),
+          (-7.80, 110.36), (3.59, 98.67), (-8.65, 115.22))
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+@contextmanager
+def explicit_dates(*model_classes):
+    """ let bulk_create keep the given dates of auto_now fields """
+    fields = [
+        field for model in model_classes for field in model._meta.fields
+        if getattr(field, 'auto_now', False)
+    ]
+    for field in fields:
+        field.auto_now = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now = True
+
+
+class Seeder:
+    """
+    reproducible synthetic dataset, every random draw comes from one
+    generator seeded with `seed`
+
+    likes, comments, discussions and community sizes follow a power law
+    shaped by `alpha`, smaller alphas give heavier tails
+    """
+
+    def __init__(self, users=1000, feeds=10000, communities=50,
+                 discussions=2000, seed=42, alpha=1.5, image_ratio=0.3,
+                 days=365, batch_size=5000, stdout=None):
+        self.counts = {
+            'users': users,
+            'feeds': feeds,
+            'communities': communities,
+            'discussions': discussions,
+        }
+        self.rng = random.Random(seed)
+        self.alpha = alpha
+        self.image_ratio = image_ratio
+        self.days = days
+        self.batch_size = batch_size
+        self.stdout = stdout
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def power_law(self, limit):
+        """ power law distributed count between 0 and limit """
+        return min(int(self.rng.paretovariate(self.alpha)) - 1, limit)
+
+    def skewed_choice(self, items):
+        """ pick an item, the first ones far more often than the last """
+        return items[int(len(items) * self.rng.random() ** 3)]
+
+    def random_date(self, after=None):
+        """ date in the seeded period, optionally after another date """
+        start = after or START_DATE
+        end = START_DATE + timedelta(days=self.days)
+        span = max((end - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.random() * span)
+
+    def random_point(self):
+        """ coordinate scattered around one of the cities """
+        lat, long = self.rng.choice(CITIES)
+        return (
+            round(lat + self.rng.gauss(0, 0.15), 2),
+            round(long + self.rng.gauss(0, 0.15), 2),
+        )
+
+    def bulk_create(self, model, objs):
+        """ insert objs in batches and make sure they carry their ids """
+        return bulk.bulk_create(model, objs, self.batch_size)
+
+    def run(self):
+        """ create the whole dataset, return the number of rows per model """
+        self.created = {}
+        with explicit_dates(models.Feed, models.Like, models.Comment,
+                            models.CommunityDiscussion,
+                            models.DiscussionLike, models.DiscussionComment):
+            self.seed_lookups()
+            self.seed_users()
+            self.seed_feeds()
+            self.seed_communities()
+            self.seed_discussions()
+
+        for zoom in tiles.summary_zooms():
+            tiles.rebuild(zoom)
+        # bulk inserts send no signals
+        bump_response_versions('feeds', 'communities')
+
+        return self.created
+
+    def count(self, model, amount):
+        name = model.__name__
+        self.created[name] = self.created.get(name, 0) + amount
+
+    def seed_lookups(self):
+        self.tag_ids = [
+            models.Tag.objects.get_or_create(
+                name=name,
+                defaults={'color': self.rng.choice(TAG_COLORS)}
+            )[0].id
+            for name in TAG_NAMES
+        ]
+        self.category_ids = [
+            models.Category.objects.get_or_create(name=name)[0].id
+            for name in CATEGORY_NAMES
+        ]
+
+    def seed_users(self):
+        password = make_password('password123')
+        users = [
+            models.User(
+                email=f'user{i}@{EMAIL_DOMAIN}',
+                name=f'Seed User {i}',
+                password=password,
+                exp=self.power_law(5000),
+                age=self.rng.randint(17, 35)
+            )
+            for i in range(self.counts['users'])
+        ]
+        with transaction.atomic():
+            self.user_ids = [
+                user.pk for user in self.bulk_create(models.User, users)
+            ]
+        self.count(models.User, len(users))
+        self.log(f'{len(users)} users')
+
+    def seed_feeds(self):
+        total = self.counts['feeds']
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            with transaction.atomic():
+                self.seed_feed_batch(size)
+            self.log(f'{start + size} / {total} feeds')
+
+    def seed_feed_batch(self, size):
+        user_count = len(self.user_ids)
+        feeds = []
+        for _ in range(size):
+            lat, long = self.random_point()
+            feeds.append(models.Feed(
+                user_id=self.skewed_choice(self.user_ids),
+                feed=f'Seed feed {self.rng.getrandbits(32):08x}',
+                lat=lat,
+                long=long,
+                category_id=self.rng.choice(self.category_ids),
+                geo_cell=geo.cell_for(lat, long),
+                like_count=self.power_law(user_count),
+                comment_count=self.power_law(user_count),
+                date=self.random_date()
+            ))
+        self.bulk_create(models.Feed, feeds)
+
+        Through = models.Feed.tags.through
+        feed_tags = [
+            Through(feed_id=feed.pk, tag_id=tag_id)
+            for feed in feeds
+            for tag_id in self.rng.sample(
+                self.tag_ids,
+                self.rng.randint(1, 3)
+            )
+        ]
+        images = [
+            models.FeedImage(
+                feed_id=feed.pk,
+                image=f'uploads/images/seed-{feed.pk}-{i}.jpg'
+            )
+            for feed in feeds
+            if self.rng.random() < self.image_ratio
+            for i in range(self.rng.randint(1, 3))
+        ]
+        likes = [
+            models.Like(
+                user_id=user_id,
+                feed_id=feed.pk,
+                date=self.random_date(after=feed.date)
+            )
+            for feed in feeds
+            for user_id in self.rng.sample(self.user_ids, feed.like_count)
+        ]
+        comments = [
+            models.Comment(
+                user_id=self.rng.choice(self.user_ids),
+                feed_id=feed.pk,
+                comment=f'Seed comment {i}',
+                date=self.random_date(after=feed.date)
+            )
+            for feed in feeds
+            for i in range(feed.comment_count)
+        ]
+        self.count(models.Feed, len(feeds))
+        for model, objs in ((Through, feed_tags), (models.FeedImage, images),
+                            (models.Like, likes), (models.Comment, comments)):
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+            self.count(model, len(objs))
+
+    def seed_communities(self):
+        communities = []
+        for i in range(self.counts['communities']):
+            lat, long = self.random_point()
+            communities.append(models.Community(
+                name=f'Seed Community {i}',
+                subtitle=f'Subtitle {i}',
+                description=f'Seeded community {i}',
+                lat=lat,
+                long=long,
+                location=f'Area {i}'
+            ))
+        with transaction.atomic():
+            self.bulk_create(models.Community, communities)
+        self.count(models.Community, len(communities))
+
+        self.members = {}
+        rows = []
+        for community in communities:
+            size = max(self.power_law(len(self.user_ids)), 1)
+            self.members[community.pk] = self.rng.sample(self.user_ids, size)
+            rows += [
+                models.CommunityMember(
+                    user_id=user_id,
+                    community_id=community.pk,
+                    is_joined=self.rng.random() < 0.9
+                )
+                for user_id in self.members[community.pk]
+            ]
+        with transaction.atomic():
+            models.CommunityMember.objects.bulk_create(
+                rows,
+                batch_size=self.batch_size
+            )
+        self.count(models.CommunityMember, len(rows))
+        self.log(f'{len(communities)} communities, {len(rows)} members')
+
+    def seed_discussions(self):
+        community_ids = list(self.members)
+        if not community_ids:
+            return
+
+        total = self.counts['discussions']
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            with transaction.atomic():
+                self.seed_discussion_batch(community_ids, size)
+        self.log(f'{total} discussions')
+
+    def seed_discussion_batch(self, community_ids, size):
+        discussions = []
+        for _ in range(size):
+            community_id = self.skewed_choice(community_ids)
+            members = self.members[community_id]
+            discussions.append(models.CommunityDiscussion(
+                user_id=self.rng.choice(members),
+                community_id=community_id,
+                text=f'Seed discussion {self.rng.getrandbits(32):08x}',
+                like_count=self.power_law(len(members)),
+                comment_count=self.power_law(len(members)),
+                date=self.random_date()
+            ))
+        self.bulk_create(models.CommunityDiscussion, discussions)
+
+        likes = [
+            models.DiscussionLike(
+                user_id=user_id,
+                discussion_id=disc.pk,
+                date=self.random_date(after=disc.date)
+            )
+            for disc in discussions
+            for user_id in self.rng.sample(
+                self.members[disc.community_id],
+                disc.like_count
+            )
+        ]
+        comments = [
+            models.DiscussionComment(
+                user_id=self.rng.choice(self.members[disc.community_id]),
+                discussion_id=disc.pk,
+                comment=f'Seed comment {i}',
+                date=self.random_date(after=disc.date)
+            )
+            for disc in discussions
+            for i in range(disc.comment_count)
+        ]
+        models.DiscussionLike.objects.bulk_create(
+            likes,
+            batch_size=self.batch_size
+        )
+        models.DiscussionComment.objects.bulk_create(
+            comments,
+            batch_size=self.batch_size
+        )
+        self.count(models.CommunityDiscussion, len(discussions))
+        self.count(models.DiscussionLike, len(likes))
+        self.count(models.DiscussionComment, len(comments))
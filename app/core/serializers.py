@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.db import models
+from rest_framework import serializers
+
+
+MESSAGEPACK_FORMAT = 'msgpack'
+
+
+def native_types(context):
+    """
+    whether the response is rendered as MessagePack, which sends decimals
+    as numbers and datetimes as epoch seconds instead of strings
+    """
+    request = context.get('request')
+    renderer = getattr(request, 'accepted_renderer', None)
+    return getattr(renderer, 'format', None) == MESSAGEPACK_FORMAT
+
+
+def epoch(value):
+    """ whole seconds since the epoch of an aware datetime """
+    return int(value.timestamp())
+
+
+class NativeDecimalField(serializers.DecimalField):
+    """ decimal string, or the quantized decimal for MessagePack """
+
+    def to_representation(self, value):
+        if not native_types(self.context):
+            return super().to_representation(value)
+
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+
+        return self.quantize(value)
+
+
+class NativeDateTimeField(serializers.DateTimeField):
+    """ ISO 8601 string, or epoch seconds for MessagePack """
+
+    def to_representation(self, value):
+        if not value or not native_types(self.context):
+            return super().to_representation(value)
+
+        return epoch(self.enforce_timezone(value))
+
+
+class NativeTypesMixin:
+    """
+    model serializer mixin mapping decimal and datetime columns to fields
+    that render native values when the response is MessagePack
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DecimalField: NativeDecimalField,
+        models.DateTimeField: NativeDateTimeField,
+    }
@@ -0,0 +1,83 @@
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from core import counters, models, tiles
+from core.cache import RESPONSE_NAMESPACES, bump_response_versions
+
+
+def count_created(sender, instance, created, **kwargs):
+    """ increment the counters of a new row """
+    if created:
+        for counter in counters.counters_for(sender):
+            pk = getattr(instance, f'{counter.field}_id')
+            counters.increment(counter, pk, 1)
+
+
+def count_deleted(sender, instance, **kwargs):
+    """ decrement the counters of a deleted row """
+    for counter in counters.counters_for(sender):
+        pk = getattr(instance, f'{counter.field}_id')
+        counters.increment(counter, pk, -1)
+
+
+for source in {counter.source for counter in counters.COUNTERS}:
+    post_save.connect(
+        count_created,
+        sender=source,
+        dispatch_uid=f'count_created_{source.__name__}'
+    )
+    post_delete.connect(
+        count_deleted,
+        sender=source,
+        dispatch_uid=f'count_deleted_{source.__name__}'
+    )
+
+
+def feed_created(sender, instance, created, **kwargs):
+    """ add a new feed to the map tile summary """
+    if created:
+        tiles.record_feed(instance, 1)
+
+
+def feed_deleted(sender, instance, **kwargs):
+    """ remove a deleted feed from the map tile summary """
+    tiles.record_feed(instance, -1)
+
+
+post_save.connect(
+    feed_created,
+    sender=models.Feed,
+    dispatch_uid='feed_created_map_tiles'
+)
+post_delete.connect(
+    feed_deleted,
+    sender=models.Feed,
+    dispatch_uid='feed_deleted_map_tiles'
+)
+
+
+def expire_responses(sender, **kwargs):
+    """ bump the cached response versions of a written model """
+    bump_response_versions(*RESPONSE_NAMESPACES[sender._meta.label])
+
+
+for label in RESPONSE_NAMESPACES:
+    source = apps.get_model(label)
+    if source is models.Feed.tags.through:
+        m2m_changed.connect(
+            expire_responses,
+            sender=source,
+            dispatch_uid='expire_responses_feed_tags'
+        )
+        continue
+
+    post_save.connect(
+        expire_responses,
+        sender=source,
+        dispatch_uid=f'expire_responses_save_{label}'
+    )
+    post_delete.connect(
+        expire_responses,
+        sender=source,
+        dispatch_uid=f'expire_responses_delete_{label}'
+    )
@@ -0,0 +1,13 @@
+from core import counters, images
+from core.jobs import task
+
+
+@task('images.process')
+def process_image(model_label, pk):
+    images.process(model_label, pk)
+
+
+@task('counters.reconcile')
+def reconcile_counters(batch_size=1000):
+    for counter in counters.COUNTERS:
+        counters.reconcile(counter, batch_size=batch_size)
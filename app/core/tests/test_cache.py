@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.cache import LRUCache
+
+
+class LRUCacheTests(SimpleTestCase):
+    """ test the in-process LRU cache """
+
+    def test_least_recently_used_evicted(self):
+        """ test the oldest untouched entry is evicted when full """
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    @patch('core.cache.time.monotonic')
+    def test_entries_expire(self, monotonic):
+        """ test entries are dropped after their timeout """
+        monotonic.return_value = 100
+        cache = LRUCache(timeout=10)
+        cache.set('a', 1)
+        cache.set('b', 2, timeout=30)
+
+        monotonic.return_value = 120
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+
+    def test_delete(self):
+        """ test deleting an entry """
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.delete('a')
+        cache.delete('missing')
+
+        self.assertEqual(cache.get('a', 'default'), 'default')
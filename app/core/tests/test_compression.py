@@ -0,0 +1,151 @@
+import gzip
+import json
+import zlib
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import middleware
+from core.models import Category, Feed
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_FEED_EXPORT = reverse('kostzy:feed-export')
+
+
+class NegotiationTests(TestCase):
+    """ test Accept-Encoding negotiation """
+
+    @patch.object(middleware, 'brotli', None)
+    def test_gzip_without_brotli(self):
+        """ test gzip is picked when brotli is not installed """
+        self.assertIs(
+            middleware.negotiate('gzip, deflate, br'),
+            middleware.GzipEncoder
+        )
+
+    @patch.object(middleware, 'brotli', None)
+    def test_refused_encodings(self):
+        """ test q=0 and unknown codings negotiate nothing """
+        self.assertIsNone(middleware.negotiate('gzip;q=0, deflate'))
+        self.assertIsNone(middleware.negotiate(''))
+        self.assertIs(middleware.negotiate('*'), middleware.GzipEncoder)
+
+    @skipIf(middleware.brotli is None, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        """ test brotli wins ties and loses to a higher gzip q """
+        self.assertIs(
+            middleware.negotiate('gzip, br'),
+            middleware.BrotliEncoder
+        )
+        self.assertIs(
+            middleware.negotiate('gzip, br;q=0.5'),
+            middleware.GzipEncoder
+        )
+
+
+@patch.object(middleware, 'brotli', None)
+class CompressionMiddlewareTests(TestCase):
+    """ test compressed responses """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='password123',
+            name='Rais'
+        )
+        category = Category.objects.create(name='Foods')
+        for i in range(10):
+            Feed.objects.create(
+                user=self.user,
+                category=category,
+                feed=f'Hello {i}',
+                lat=10,
+                long=16
+            )
+
+    def test_json_list_gzipped(self):
+        """ test a large JSON list is gzipped with a weak ETag """
+        plain = self.client.get(URL_FEEDS)
+        res = self.client.get(URL_FEEDS, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', res['Vary'])
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertLess(len(res.content), len(plain.content))
+        self.assertEqual(res['Content-Length'], str(len(res.content)))
+        self.assertEqual(res['ETag'], 'W/' + plain['ETag'])
+
+    def test_weak_etag_still_revalidates(self):
+        """ test the weakened ETag answers 304 """
+        res = self.client.get(URL_FEEDS, HTTP_ACCEPT_ENCODING='gzip')
+        again = self.client.get(
+            URL_FEEDS,
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], res['ETag'])
+
+    def test_identity_without_accept_encoding(self):
+        """ test clients that accept no encoding get plain bytes """
+        res = self.client.get(URL_FEEDS)
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', res['Vary'])
+        json.loads(res.content)
+
+    def test_small_response_not_compressed(self):
+        """ test bodies under the threshold are sent as they are """
+        res = self.client.get(
+            reverse('kostzy:tag-list'),
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    def test_streaming_compressed_per_chunk(self):
+        """ test streamed exports are compressed chunk by chunk """
+        admin = get_user_model().objects.create_superuser(
+            email='admin@gmail.com',
+            password='password123'
+        )
+        self.client.force_authenticate(user=admin)
+
+        res = self.client.get(URL_FEED_EXPORT, HTTP_ACCEPT_ENCODING='gzip')
+        chunks = list(res.streaming_content)
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertFalse(res.has_header('Content-Length'))
+        # every chunk but the trailer is flushed on its own
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        first = decompressor.decompress(chunks[0])
+        self.assertEqual(first, b'[')
+        body = first + b''.join(
+            decompressor.decompress(chunk) for chunk in chunks[1:]
+        )
+        self.assertEqual(len(json.loads(body)), 10)
+
+    def test_media_types_skipped(self):
+        """ test content types outside the list pass through """
+        request = RequestFactory().get(
+            '/media/feed.jpg',
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+        response = middleware.CompressionMiddleware(
+            lambda request: HttpResponse(
+                b'\xff\xd8' * 1000,
+                content_type='image/jpeg'
+            )
+        )(request)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from core import models
+
+
+class CounterTests(TestCase):
+    """ test denormalized like / comment counters """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='password123'
+        )
+        category = models.Category.objects.create(name='Foods')
+        self.feed = models.Feed.objects.create(
+            user=self.user,
+            category=category,
+            feed='Hello',
+            lat=10,
+            long=16
+        )
+        community = models.Community.objects.create(
+            name='Sample Kost',
+            lat=10,
+            long=5,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+        self.discussion = models.CommunityDiscussion.objects.create(
+            user=self.user,
+            community=community,
+            text='New Discussion'
+        )
+
+    def test_feed_counters_follow_likes_and_comments(self):
+        """ test feed counters are incremented and decremented """
+        like = models.Like.objects.create(user=self.user, feed=self.feed)
+        models.Comment.objects.create(
+            user=self.user,
+            feed=self.feed,
+            comment='Hi'
+        )
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.like_count, 1)
+        self.assertEqual(self.feed.comment_count, 1)
+
+        like.delete()
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.like_count, 0)
+
+    def test_discussion_counters_follow_likes_and_comments(self):
+        """ test discussion counters are incremented and decremented """
+        models.DiscussionLike.objects.create(
+            user=self.user,
+            discussion=self.discussion
+        )
+        comment = models.DiscussionComment.objects.create(
+            user=self.user,
+            discussion=self.discussion,
+            comment='Hi'
+        )
+        self.discussion.refresh_from_db()
+        self.assertEqual(self.discussion.like_count, 1)
+        self.assertEqual(self.discussion.comment_count, 1)
+
+        comment.delete()
+        self.discussion.refresh_from_db()
+        self.assertEqual(self.discussion.comment_count, 0)
+
+    def test_reconcile_counters_fixes_drift(self):
+        """ test reconcile command rewrites drifted counters """
+        models.Like.objects.create(user=self.user, feed=self.feed)
+        models.Feed.objects.update(like_count=7, comment_count=3)
+        models.CommunityDiscussion.objects.update(like_count=2)
+
+        out = StringIO()
+        call_command('reconcile_counters', batch_size=1, stdout=out)
+
+        self.feed.refresh_from_db()
+        self.discussion.refresh_from_db()
+        self.assertEqual(self.feed.like_count, 1)
+        self.assertEqual(self.feed.comment_count, 0)
+        self.assertEqual(self.discussion.like_count, 0)
+        self.assertIn('Feed.like_count: 1 rows fixed', out.getvalue())
@@ -0,0 +1,82 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from PIL import Image
+
+from core import images, models
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def sample_upload(width=2400, height=1200, mode='RGBA', fmt='PNG'):
+    """ in memory image upload """
+    output = BytesIO()
+    Image.new(mode, (width, height), 'red').save(output, fmt)
+    return SimpleUploadedFile(
+        f'sample.{fmt.lower()}',
+        output.getvalue(),
+        content_type=f'image/{fmt.lower()}'
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantTests(TestCase):
+    """ test resized image variants """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='password123'
+        )
+        category = models.Category.objects.create(name='Foods')
+        self.feed = models.Feed.objects.create(
+            user=user,
+            category=category,
+            feed='Hello',
+            lat=10,
+            long=16
+        )
+
+    def test_process_creates_variants(self):
+        """ test every variant is written as a bounded jpeg """
+        feed_image = models.FeedImage.objects.create(
+            feed=self.feed,
+            image=sample_upload()
+        )
+
+        images.process('core.FeedImage', feed_image.pk)
+
+        feed_image.refresh_from_db()
+        for field, size, _ in images.VARIANTS:
+            with getattr(feed_image, field).open('rb') as variant:
+                image = Image.open(variant)
+                self.assertEqual(image.format, 'JPEG')
+                self.assertEqual(max(image.size), size)
+        self.assertTrue(feed_image.image.name.endswith('.png'))
+
+    def test_small_images_not_upscaled(self):
+        """ test variants never grow past the original size """
+        feed_image = models.FeedImage.objects.create(
+            feed=self.feed,
+            image=sample_upload(300, 100, 'RGB', 'JPEG')
+        )
+
+        images.process('core.FeedImage', feed_image.pk)
+
+        feed_image.refresh_from_db()
+        with feed_image.full.open('rb') as variant:
+            self.assertEqual(Image.open(variant).size, (300, 100))
+
+    def test_process_missing_row(self):
+        """ test rows deleted before processing are skipped """
+        images.process('core.FeedImage', 12345)
@@ -0,0 +1,152 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import images, jobs, models
+
+
+calls = []
+
+
+@jobs.task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@jobs.task('tests.fail')
+def fail():
+    raise ValueError('broken')
+
+
+@override_settings(JOB_RETRY_BACKOFF=10, JOB_RETRY_BACKOFF_MAX=60)
+class JobQueueTests(TestCase):
+    """ test the database backed job queue """
+
+    def setUp(self):
+        calls.clear()
+
+    def run_worker(self, **options):
+        call_command('run_worker', once=True, stdout=StringIO(), **options)
+
+    def run_failing_worker(self):
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.run_worker()
+
+    def test_enqueue_unknown_task(self):
+        """ test queueing an unregistered task fails """
+        with self.assertRaises(KeyError):
+            jobs.enqueue('tests.missing')
+
+    def test_worker_runs_due_jobs(self):
+        """ test queued jobs run with their payload and are marked done """
+        job = jobs.enqueue('tests.record', {'value': 1})
+        jobs.enqueue('tests.record', {'value': 2})
+
+        self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(job.status, models.Job.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(job.locked_until)
+
+    def test_future_jobs_wait(self):
+        """ test jobs scheduled later are not claimed yet """
+        jobs.enqueue(
+            'tests.record',
+            {'value': 1},
+            run_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        self.assertEqual(jobs.claim(), [])
+
+    def test_failed_job_retried_with_backoff(self):
+        """ test a failing job is queued again further in the future """
+        job = jobs.enqueue('tests.fail')
+
+        self.run_failing_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, models.Job.QUEUED)
+        self.assertIn('ValueError', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+
+        models.Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.run_failing_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=15))
+
+    def test_backoff_capped(self):
+        """ test the retry delay doubles up to the maximum """
+        self.assertEqual(
+            [jobs.backoff(n) for n in range(1, 6)],
+            [10, 20, 40, 60, 60]
+        )
+
+    def test_job_fails_after_max_attempts(self):
+        """ test a job stops retrying after its last attempt """
+        job = jobs.enqueue('tests.fail', max_attempts=1)
+
+        self.run_failing_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, models.Job.FAILED)
+
+    def test_expired_lease_reclaimed(self):
+        """ test jobs of a dead worker run again once the lease expires """
+        job = jobs.enqueue('tests.record', {'value': 3})
+        claimed = jobs.claim(visibility_timeout=60)
+        self.assertEqual([j.pk for j in claimed], [job.pk])
+        self.assertEqual(jobs.claim(), [])
+
+        models.Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [3])
+        self.assertEqual(job.status, models.Job.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_worker_cannot_finish(self):
+        """ test a worker whose lease was taken over leaves the job alone """
+        jobs.enqueue('tests.record', {'value': 4})
+        stale = jobs.claim()[0]
+        models.Job.objects.filter(pk=stale.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        current = jobs.claim()[0]
+
+        jobs.run(stale)
+
+        current.refresh_from_db()
+        self.assertEqual(current.status, models.Job.RUNNING)
+
+    def test_image_processing_queued(self):
+        """ test stored images queue their variant job """
+        user = models.User.objects.create_user(
+            email='raisazka@gmail.com',
+            password='password123'
+        )
+        feed = models.Feed.objects.create(
+            user=user,
+            category=models.Category.objects.create(name='Foods'),
+            feed='Hello',
+            lat=10,
+            long=16
+        )
+        feed_image = models.FeedImage.objects.create(feed=feed)
+
+        images.process_later(feed_image)
+
+        job = models.Job.objects.get()
+        self.assertEqual(job.task, 'images.process')
+        self.assertEqual(
+            json.loads(job.payload),
+            {'model_label': 'core.FeedImage', 'pk': feed_image.pk}
+        )
@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.metrics import registry
+from core.models import Category, Feed
+
+
+URL_METRICS = reverse('metrics')
+
+
+class MetricsTests(TestCase):
+    """ test request metrics middleware and endpoint """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(METRICS_DIR=directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.directory = directory
+        registry.clear()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='password123'
+        )
+        category = Category.objects.create(name='Foods')
+        Feed.objects.create(
+            user=self.user,
+            category=category,
+            feed='Hello',
+            lat=10,
+            long=16
+        )
+
+    def test_metrics_recorded_per_route(self):
+        """ test requests are counted with their database queries """
+        self.client.get(reverse('kostzy:feed-list'))
+        self.client.get(reverse('kostzy:feed-list'))
+
+        res = self.client.get(URL_METRICS)
+        body = res.content.decode()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            'http_requests_total{route="kostzy:feed-list",method="GET",'
+            'status="200"} 2',
+            body
+        )
+        self.assertIn(
+            'db_queries_per_request_bucket{route="kostzy:feed-list",'
+            'method="GET",le="5"} 2',
+            body
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{route="kostzy:feed-list",'
+            'method="GET"} 2',
+            body
+        )
+        self.assertIn('db_query_duration_seconds_total{route=', body)
+
+    def test_unresolved_requests(self):
+        """ test requests without a route are grouped together """
+        self.client.get('/missing/')
+
+        body = self.client.get(URL_METRICS).content.decode()
+
+        self.assertIn('route="unresolved"', body)
+
+    def test_streamed_queries_recorded(self):
+        """ test the queries of a streamed body are counted as it is read """
+        admin = get_user_model().objects.create_superuser(
+            email='admin@gmail.com',
+            password='password123'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        res = client.get(reverse('kostzy:feed-export'))
+        self.assertNotIn('kostzy:feed-export', registry.render())
+        b''.join(res.streaming_content)
+        res.close()
+
+        body = registry.render()
+        self.assertIn(
+            'db_queries_per_request_bucket{route="kostzy:feed-export",'
+            'method="GET",le="1"} 0',
+            body
+        )
+        self.assertIn(
+            'http_requests_total{route="kostzy:feed-export",method="GET",'
+            'status="200"} 1',
+            body
+        )
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_metrics_restricted(self):
+        """ test only allowed addresses and staff users read metrics """
+        denied = self.client.get(URL_METRICS)
+        allowed = self.client.get(URL_METRICS, REMOTE_ADDR='10.0.0.5')
+        self.client.force_login(self.user)
+        regular = self.client.get(URL_METRICS)
+        self.user.is_staff = True
+        self.user.save()
+        staff = self.client.get(URL_METRICS)
+
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(allowed.status_code, 200)
+        self.assertEqual(regular.status_code, 403)
+        self.assertEqual(staff.status_code, 200)
+
+    def test_workers_summed(self):
+        """ test every worker's flushed counters are served together """
+        self.client.get(reverse('kostzy:tag-list'))
+        worker = {
+            'requests': {'200': 3},
+            'latency': {'counts': [3] + [0] * 11, 'sum': 0.003, 'count': 3},
+            'queries': {'counts': [3] + [0] * 9, 'sum': 3, 'count': 3},
+            'db_seconds': 0.5,
+        }
+        with open(os.path.join(self.directory, '1-worker.json'), 'w') as f:
+            json.dump([['kostzy:tag-list', 'GET', worker]], f)
+
+        body = registry.render()
+
+        self.assertIn(
+            'http_requests_total{route="kostzy:tag-list",method="GET",'
+            'status="200"} 4',
+            body
+        )
+        self.assertIn(
+            'db_queries_per_request_count{route="kostzy:tag-list",'
+            'method="GET"} 4',
+            body
+        )
+
+    @override_settings(METRICS_FLUSH_SECONDS=3600)
+    def test_render_flushes_own_counters(self):
+        """ test a worker writes its latest counters before serving """
+        registry.render()
+        self.client.get(reverse('kostzy:tag-list'))
+
+        body = registry.render()
+
+        self.assertIn('route="kostzy:tag-list"', body)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
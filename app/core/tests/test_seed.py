@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import models
+from core.seed import Seeder
+
+
+def fingerprint():
+    """ content of the seeded feeds independent of their ids """
+    return list(
+        models.Feed.objects.order_by('date')
+        .values_list('feed', 'lat', 'long', 'like_count', 'comment_count')
+    )
+
+
+class SeedTests(TestCase):
+    """ test the synthetic dataset generator """
+
+    def seed(self, **params):
+        options = {
+            'users': 30,
+            'feeds': 40,
+            'communities': 3,
+            'discussions': 10,
+            'batch_size': 15,
+        }
+        options.update(params)
+        return Seeder(**options).run()
+
+    def test_seed_counts_match_rows(self):
+        """ test stored counters match the generated rows """
+        created = self.seed()
+
+        self.assertEqual(models.Feed.objects.count(), 40)
+        self.assertEqual(created['Like'], models.Like.objects.count())
+        for feed in models.Feed.objects.all():
+            self.assertEqual(feed.like_count, feed.like_set.count())
+            self.assertEqual(feed.comment_count, feed.comment_set.count())
+            self.assertTrue(feed.tags.exists())
+        discussion = models.CommunityDiscussion.objects.first()
+        self.assertEqual(
+            discussion.like_count,
+            discussion.discussionlike_set.count()
+        )
+
+    def test_seed_is_reproducible(self):
+        """ test the same seed gives the same dataset """
+        self.seed(seed=7)
+        first = fingerprint()
+        models.User.objects.all().delete()
+        models.Community.objects.all().delete()
+
+        self.seed(seed=7)
+
+        self.assertEqual(fingerprint(), first)
+
+    def test_seed_data_command(self):
+        """ test the seed command reports the created rows """
+        out = StringIO()
+        call_command(
+            'seed_data',
+            users=5,
+            feeds=5,
+            communities=1,
+            discussions=2,
+            stdout=out
+        )
+
+        self.assertIn('Feed: 5', out.getvalue())
+        self.assertEqual(models.User.objects.count(), 5)
@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast, Floor
+
+from core import geo, models
+
+
+def summary_zooms():
+    """ zoom levels kept in the precomputed tile summary """
+    return getattr(settings, 'MAP_TILE_ZOOMS', [])
+
+
+def record_feed(feed, delta):
+    """ add (delta=1) or remove (delta=-1) a feed from its summary tiles """
+    record_feeds([feed], delta)
+
+
+def record_feeds(feeds, delta):
+    """ add or remove many feeds, writing each touched tile once """
+    for zoom in summary_zooms():
+        changed = defaultdict(lambda: [0, 0.0, 0.0])
+        for feed in feeds:
+            lat, long = float(feed.lat), float(feed.long)
+            sums = changed[geo.tile_of(lat, long, zoom)]
+            sums[0] += delta
+            sums[1] += lat * delta
+            sums[2] += long * delta
+
+        for (tile_x, tile_y), (count, lat_sum, long_sum) in changed.items():
+            _add_to_tile(zoom, tile_x, tile_y, count, lat_sum, long_sum)
+
+
+def _add_to_tile(zoom, tile_x, tile_y, count, lat_sum, long_sum):
+    tiles = models.FeedMapTile.objects.filter(
+        zoom=zoom,
+        tile_x=tile_x,
+        tile_y=tile_y
+    )
+    changes = {
+        'count': F('count') + count,
+        'lat_sum': F('lat_sum') + lat_sum,
+        'long_sum': F('long_sum') + long_sum,
+    }
+    if tiles.update(**changes) or count < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            models.FeedMapTile.objects.create(
+                zoom=zoom,
+                tile_x=tile_x,
+                tile_y=tile_y,
+                count=count,
+                lat_sum=lat_sum,
+                long_sum=long_sum
+            )
+    except IntegrityError:
+        # a concurrent writer created the tile first
+        tiles.update(**changes)
+
+
+def tile_aggregates(queryset, zoom):
+    """ per tile row count and coordinate sums of rows with lat / long """
+    size = geo.tile_degrees(zoom)
+
+    return queryset.order_by() \
+        .annotate(
+            lat_value=Cast('lat', FloatField()),
+            long_value=Cast('long', FloatField()),
+        ) \
+        .annotate(
+            tile_x=Floor((F('long_value') + 180.0) / size),
+            tile_y=Floor((F('lat_value') + 90.0) / size),
+        ) \
+        .values('tile_x', 'tile_y') \
+        .annotate(
+            count=Count('id'),
+            lat_sum=Sum('lat_value'),
+            long_sum=Sum('long_value'),
+        )
+
+
+def rebuild(zoom):
+    """ recompute the summary tiles of a zoom level from the feeds """
+    tiles = [
+        models.FeedMapTile(
+            zoom=zoom,
+            tile_x=int(row['tile_x']),
+            tile_y=int(row['tile_y']),
+            count=row['count'],
+            lat_sum=row['lat_sum'],
+            long_sum=row['long_sum']
+        )
+        for row in tile_aggregates(models.Feed.objects.all(), zoom)
+    ]
+    with transaction.atomic():
+        models.FeedMapTile.objects.filter(zoom=zoom).delete()
+        models.FeedMapTile.objects.bulk_create(tiles, batch_size=1000)
+
+    return len(tiles)
@@ -0,0 +1,19 @@
+from core import models
+
+
+# the parent of deleted rows, so clients can fix the counts they show
+PARENT_FIELDS = {
+    'core.Like': 'feed_id',
+    'core.DiscussionLike': 'discussion_id',
+}
+
+
+def record(instance):
+    """ leave a tombstone of a row about to be deleted """
+    label = instance._meta.label
+    return models.Tombstone.objects.create(
+        model=label,
+        object_id=instance.pk,
+        parent_id=getattr(instance, PARENT_FIELDS[label]),
+        user_id=instance.user_id
+    )
@@ -0,0 +1,137 @@
+import json
+import logging
+from collections import OrderedDict
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+from core.serializers import native_types
+
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+NAMESPACES = ('kostzy', 'userauth')
+# the batch route itself, batches do not nest
+BATCH_URL_NAME = 'batch-list'
+# request headers a sub-request may set
+FORWARDED_HEADERS = ('If-None-Match', 'Accept-Language')
+# response headers reported back for every sub-request
+REPORTED_HEADERS = ('ETag', 'Location')
+# environ of the batch request every sub-request inherits
+INHERITED_ENVIRON = (
+    'SCRIPT_NAME', 'SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL',
+    'REMOTE_ADDR', 'HTTP_HOST', 'HTTP_USER_AGENT', 'HTTP_X_FORWARDED_FOR',
+    'HTTP_X_FORWARDED_PROTO', 'wsgi.version', 'wsgi.url_scheme',
+    'wsgi.errors', 'wsgi.multithread', 'wsgi.multiprocess', 'wsgi.run_once',
+)
+
+
+def build_request(batch_request, method, path, body=None, headers=None):
+    """
+    django request of a sub-request, authenticated as the batch request
+    so the token is looked up once for the whole batch; it carries no
+    credentials, anonymous batches stay anonymous
+    """
+    url = urlsplit(path)
+    content = b'' if body is None else json.dumps(body).encode()
+    # sub-responses render decimals and dates like the batch response
+    if native_types({'request': batch_request}):
+        accept = batch_request.accepted_renderer.media_type
+    else:
+        accept = 'application/json'
+    environ = {
+        key: value for key, value in batch_request.META.items()
+        if key in INHERITED_ENVIRON
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'HTTP_ACCEPT': accept,
+        'wsgi.input': BytesIO(content),
+    })
+    for name, value in (headers or {}).items():
+        if name.title() in FORWARDED_HEADERS:
+            environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+
+    request = WSGIRequest(environ)
+    if batch_request.user.is_authenticated:
+        request._force_auth_user = batch_request.user
+        request._force_auth_token = batch_request.auth
+
+    return request
+
+
+def run(batch_request, item):
+    """ run one sub-request in process, return its envelope entry """
+    if not isinstance(item, dict):
+        return entry(400, {'detail': 'Expected an object'})
+
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path')
+    if method not in METHODS or not isinstance(path, str) \
+            or not path.startswith('/'):
+        return entry(400, {'detail': 'Expected a method and absolute path'})
+
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return entry(404, {'detail': 'Not found.'})
+
+    if not set(match.namespaces) & set(NAMESPACES) \
+            or match.url_name == BATCH_URL_NAME:
+        return entry(404, {'detail': 'Not found.'})
+
+    headers = item.get('headers')
+    if headers is not None and not (
+        isinstance(headers, dict)
+        and all(isinstance(name, str) for name in headers)
+    ):
+        return entry(400, {'detail': 'Expected headers as an object'})
+
+    try:
+        request = build_request(
+            batch_request,
+            method,
+            path,
+            item.get('body') if method != 'GET' else None,
+            headers
+        )
+    except TypeError:
+        # a MessagePack batch may carry binary values JSON cannot hold
+        return entry(400, {'detail': 'Expected a JSON compatible body'})
+
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed', method, path)
+        return entry(500, {'detail': 'Server error.'})
+
+    headers = OrderedDict(
+        (name, response[name]) for name in REPORTED_HEADERS
+        if response.has_header(name)
+    )
+    if hasattr(response, 'data'):
+        body = response.data
+    else:
+        content = b''.join(response.streaming_content) \
+            if response.streaming else response.content
+        if response.get('Content-Type', '').startswith('application/json'):
+            body = json.loads(content or 'null')
+        else:
+            body = content.decode(response.charset)
+
+    return entry(response.status_code, body, headers)
+
+
+def entry(status, body, headers=None):
+    return OrderedDict([
+        ('status', status),
+        ('headers', headers or {}),
+        ('body', body),
+    ])
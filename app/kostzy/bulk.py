@@ -0,0 +1,74 @@
+from django.db import transaction
+
+from core import bulk, geo, images, models, tiles
+from core.cache import bump_response_versions
+
+
+def related_ids(items):
+    """ (tag ids, category ids) of a bulk request that exist, two queries """
+    tags, categories = [], []
+    for item in items:
+        if isinstance(item, dict):
+            if isinstance(item.get('tags'), list):
+                tags += item['tags']
+            categories.append(item.get('category'))
+
+    return (
+        set(models.Tag.objects.filter(id__in=_ids(tags))
+            .values_list('id', flat=True)),
+        set(models.Category.objects.filter(id__in=_ids(categories))
+            .values_list('id', flat=True)),
+    )
+
+
+def _ids(values):
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            pass
+
+    return ids
+
+
+def create_feeds(user, rows):
+    """
+    create validated feeds with one bulk insert each for the feeds, their
+    tags and their images inside one transaction
+
+    bulk inserts send no signals, so the grid cell, the map tiles, the
+    response cache and the image jobs are taken care of here
+    """
+    with transaction.atomic():
+        feeds = [
+            models.Feed(
+                user=user,
+                geo_cell=geo.cell_for(row['lat'], row['long']),
+                category_id=row['category'],
+                **{
+                    field: value for field, value in row.items()
+                    if field not in ('category', 'tags', 'image_feed')
+                }
+            )
+            for row in rows
+        ]
+        bulk.bulk_create(models.Feed, feeds)
+
+        Through = models.Feed.tags.through
+        Through.objects.bulk_create([
+            Through(feed_id=feed.pk, tag_id=tag_id)
+            for feed, row in zip(feeds, rows)
+            for tag_id in row['tags']
+        ])
+        feed_images = bulk.bulk_create(models.FeedImage, [
+            models.FeedImage(feed_id=feed.pk, image=image)
+            for feed, row in zip(feeds, rows)
+            for image in row.get('image_feed', [])
+        ])
+
+        tiles.record_feeds(feeds, 1)
+        images.process_many_later(feed_images)
+        bump_response_versions('feeds')
+
+    return feeds
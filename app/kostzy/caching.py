@@ -0,0 +1,183 @@
+import hashlib
+import json
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.cache import get_cache, get_version
+
+
+class AnonymousListCacheMixin:
+    """
+    serve list responses of anonymous requests from the RESPONSE_CACHE
+
+    anonymous responses are the same for every caller, entries are keyed on
+    the normalized cache_query_params plus the version of every
+    cache_namespaces, which core.signals bumps whenever a row shown in the
+    list is written
+
+    the ETag of the response is cached with it, so a hit answers
+    If-None-Match without running a query; keep this mixin before
+    ConditionalListMixin in the bases
+    """
+    cache_namespaces = ()
+    cache_query_params = ()
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_cache('RESPONSE_CACHE')
+        key = self.get_list_cache_key(request, cache)
+        cached = cache.get(key)
+        if cached is not None:
+            data, etag = cached
+            if etag_matches(etag, request.META.get('HTTP_IF_NONE_MATCH')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(data)
+            if etag is not None:
+                set_etag(response, etag)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, (response.data, response.get('ETag')))
+        response['X-Cache'] = 'MISS'
+
+        return response
+
+    def get_list_cache_key(self, request, cache):
+        """ key of the list response for the normalized request """
+        params = [
+            (name, request.query_params[name])
+            for name in sorted(self.cache_query_params)
+            if request.query_params.get(name)
+        ]
+        versions = [
+            get_version(cache, namespace)
+            for namespace in self.cache_namespaces
+        ]
+        raw = json.dumps([
+            self.basename,
+            # absolute image and page urls depend on the host
+            request.build_absolute_uri('/'),
+            request.accepted_renderer.format,
+            versions,
+            params,
+        ])
+
+        return 'response:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    answer GETs with 304 Not Modified while the client's If-None-Match
+    still matches, before any serializer runs
+
+    the ETag fingerprints the etag_fields of the rows shown (one narrow
+    query), the viewer's likes on them, the viewer and the query string;
+    rows embedded in the response (authors, tags, images) take part
+    through etag_fields such as user__updated or through annotate_etag,
+    so the ETag only depends on the database and every worker computes
+    the same one
+    """
+    etag_fields = ('id', 'date')
+
+    def annotate_etag(self, queryset):
+        """ hook adding annotations named in etag_fields """
+        return queryset
+
+    def get_etag(self, queryset):
+        """ quoted ETag of the rows in queryset as the viewer sees them """
+        fields = list(self.etag_fields)
+        if 'viewer_like_id' in queryset.query.annotations:
+            fields.append('viewer_like_id')
+
+        rows = list(
+            queryset.prefetch_related(None).values_list(*fields)
+        )
+        raw = json.dumps([
+            self.basename,
+            self.action,
+            self.request.user.pk,
+            self.request.build_absolute_uri('/'),
+            self.request.accepted_renderer.format,
+            sorted(self.request.query_params.lists()),
+            rows,
+        ], default=str)
+
+        return '"{}"'.format(hashlib.sha1(raw.encode()).hexdigest())
+
+    def conditional_response(self, queryset, handler, request, *args,
+                             **kwargs):
+        etag = self.get_etag(queryset)
+        if etag_matches(etag, request.META.get('HTTP_IF_NONE_MATCH')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            set_etag(response, etag)
+
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """ conditional list, the ETag covers the rows of the requested page """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.annotate_etag(self.filter_queryset(
+            self.get_queryset()
+        ))
+        if self.paginator is not None:
+            queryset, _ = self.paginator.get_window(queryset, request)
+
+        return self.conditional_response(
+            queryset,
+            super().list,
+            request,
+            *args,
+            **kwargs
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """ conditional retrieve, the ETag covers the requested row """
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.annotate_etag(self.filter_queryset(
+            self.get_queryset()
+        )).filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+        return self.conditional_response(
+            queryset,
+            super().retrieve,
+            request,
+            *args,
+            **kwargs
+        )
+
+
+def set_etag(response, etag):
+    """ send etag, which depends on the viewer """
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Authorization',))
+
+
+def etag_matches(etag, if_none_match):
+    """ weak comparison of etag with an If-None-Match header """
+    if etag is None or not if_none_match:
+        return False
+
+    def opaque(tag):
+        return tag[2:] if tag.startswith('W/') else tag
+
+    return any(
+        tag == '*' or opaque(tag) == opaque(etag)
+        for tag in parse_etags(if_none_match)
+    )
@@ -0,0 +1,341 @@
+import decimal
+from collections import defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core import models
+from core.serializers import epoch, native_types
+
+
+class Formats:
+    """
+    the to_representation of the DRF fields used by the serializers in
+    kostzy.serializers, resolved once per response instead of per value
+    """
+
+    def __init__(self, context):
+        self.request = context.get('request')
+        self.timezone = timezone.get_current_timezone() \
+            if settings.USE_TZ else None
+        self.datetime_format = api_settings.DATETIME_FORMAT
+        self.coerce_decimal = api_settings.COERCE_DECIMAL_TO_STRING
+        # MessagePack responses take decimals and epoch seconds as they are
+        self.native = native_types(context)
+        if self.native:
+            self.coerce_decimal = False
+        self.use_url = api_settings.UPLOADED_FILES_USE_URL
+        self.urls = {}
+
+    def decimal(self, model_field):
+        """ formatter of a DecimalField column """
+        context = decimal.getcontext().copy()
+        context.prec = model_field.max_digits
+        exponent = decimal.Decimal('.1') ** model_field.decimal_places
+
+        def render(value):
+            if value is None:
+                return None
+
+            quantized = value.quantize(exponent, context=context)
+            if not self.coerce_decimal:
+                return quantized
+
+            return '{:f}'.format(quantized)
+
+        return render
+
+    def datetime(self, value):
+        if not value:
+            return None
+        if self.datetime_format is None and not self.native:
+            return value
+
+        if self.timezone is not None:
+            if timezone.is_aware(value):
+                value = value.astimezone(self.timezone)
+            else:
+                value = timezone.make_aware(value, self.timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, timezone.utc)
+
+        if self.native:
+            return epoch(value)
+        if self.datetime_format.lower() == ISO_8601:
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+
+        return value.strftime(self.datetime_format)
+
+    def file(self, model_field):
+        """ formatter of a FileField column, absolute urls are cached """
+        storage = model_field.storage
+
+        def render(name):
+            if not name:
+                return None
+            if not self.use_url:
+                return name
+
+            if name not in self.urls:
+                url = storage.url(name)
+                if self.request is not None:
+                    url = self.request.build_absolute_uri(url)
+                self.urls[name] = url
+
+            return self.urls[name]
+
+        return render
+
+
+class ValuesSerializer:
+    """
+    read only serializer of .values() rows giving the output of the DRF
+    serializer it mirrors; fields is that serializer's Meta.fields, every
+    field renders with render_<field> or with a plain column lookup, and
+    relations are loaded for the whole page with one query each
+    """
+    model = None
+    fields = ()
+    # columns a field reads instead of the one of its own name
+    field_columns = {}
+
+    def __init__(self, instance, context=None):
+        self.instance = instance
+        self.context = context or {}
+        self.formats = Formats(self.context)
+
+    @classmethod
+    def kept_fields(cls, context):
+        fields = context.get('fields')
+        return [
+            name for name in cls.fields
+            if fields is None or name in fields
+        ]
+
+    @classmethod
+    def columns(cls, name, queryset):
+        """ columns field name reads, its own column by default """
+        return cls.field_columns.get(name, (name,))
+
+    @classmethod
+    def values(cls, queryset, context):
+        """ queryset as the .values() rows the kept fields need """
+        columns = ['id', 'date']
+        for name in cls.kept_fields(context):
+            for column in cls.columns(name, queryset):
+                if column not in columns:
+                    columns.append(column)
+
+        return queryset.prefetch_related(None).values(*columns)
+
+    def load(self, rows, fields):
+        """ hook loading the relations of the page """
+
+    def compile(self, fields):
+        """ (field, renderer) pairs of the kept fields """
+        renderers = []
+        for name in fields:
+            render = getattr(self, f'render_{name}', None)
+            if render is None:
+                render = self.column_renderer(name)
+            renderers.append((name, render))
+
+        return renderers
+
+    def column_renderer(self, name):
+        """ renderer of a field read from its own column """
+        model_field = self.model._meta.get_field(name)
+        column = model_field.attname
+        if model_field.get_internal_type() == 'DecimalField':
+            render = self.formats.decimal(model_field)
+            return lambda row: render(row[column])
+        if model_field.get_internal_type() == 'DateTimeField':
+            return lambda row: self.formats.datetime(row[column])
+
+        return itemgetter(column)
+
+    def user_renderer(self, prefix):
+        """ renderer of a UserFeedSerializer from columns under prefix """
+        image = self.formats.file(models.User._meta.get_field('image'))
+
+        def render(row):
+            return {
+                'id': row[f'{prefix}__id'],
+                'name': row[f'{prefix}__name'],
+                'image': image(row[f'{prefix}__image']),
+                'exp': row[f'{prefix}__exp'],
+            }
+
+        return render
+
+    @property
+    def data(self):
+        rows = list(self.instance)
+        fields = self.kept_fields(self.context)
+        self.load(rows, fields)
+        renderers = self.compile(fields)
+
+        return [
+            {name: render(row) for name, render in renderers}
+            for row in rows
+        ]
+
+
+USER_COLUMNS = ('user__id', 'user__name', 'user__image', 'user__exp')
+
+
+class FeedValuesSerializer(ValuesSerializer):
+    """ FeedSerializer of .values() rows """
+    model = models.Feed
+    fields = ('id', 'user', 'feed', 'lat', 'long', 'tags', 'like',
+              'category', 'image_feed', 'location_lat',
+              'location_long', 'location_name', 'like_status',
+              'like_count', 'comment_count', 'date')
+    field_columns = {
+        'user': USER_COLUMNS,
+        'category': ('category_id',),
+        'tags': (),
+        'image_feed': (),
+        'like': ('viewer_like_id', 'viewer_like_date'),
+        'like_status': ('viewer_like_id',),
+    }
+    image_fields = ('id', 'image', 'thumbnail', 'medium', 'full')
+
+    @classmethod
+    def columns(cls, name, queryset):
+        # the viewer's like is only there when feed_queryset annotated it
+        columns = super().columns(name, queryset)
+        if name in ('like', 'like_status'):
+            annotations = queryset.query.annotations
+            columns = tuple(
+                column for column in columns if column in annotations
+            )
+
+        return columns
+
+    def load(self, rows, fields):
+        ids = [row['id'] for row in rows]
+        self.tags = defaultdict(list)
+        if 'tags' in fields and ids:
+            tags = models.Tag.objects.filter(feed__in=ids) \
+                .order_by('id').values('feed', 'id', 'name', 'color')
+            for tag in tags:
+                self.tags[tag.pop('feed')].append(tag)
+
+        self.images = defaultdict(list)
+        if 'image_feed' in fields and ids:
+            images = models.FeedImage.objects.filter(feed__in=ids) \
+                .order_by('id').values('feed_id', *self.image_fields)
+            for image in images:
+                self.images[image.pop('feed_id')].append(image)
+
+        self.likes = {}
+        user = self.context['request'].user
+        wants_like = 'like' in fields or 'like_status' in fields
+        if not (wants_like and user.is_authenticated and rows):
+            return
+
+        if 'viewer_like_id' in rows[0]:
+            for row in rows:
+                if row['viewer_like_id'] is not None:
+                    self.likes[row['id']] = {
+                        'id': row['viewer_like_id'],
+                        'feed_id': row['id'],
+                        'date': row.get('viewer_like_date'),
+                    }
+        else:
+            likes = models.Like.objects.filter(user=user, feed__in=ids) \
+                .order_by('id').values('id', 'feed_id', 'date')
+            for like in likes:
+                self.likes.setdefault(like['feed_id'], like)
+
+    def compile(self, fields):
+        self.render_user = self.user_renderer('user')
+        self.image_renderers = [
+            (name, self.formats.file(
+                models.FeedImage._meta.get_field(name)
+            ) if name != 'id' else None)
+            for name in self.image_fields
+        ]
+        return super().compile(fields)
+
+    def render_category(self, row):
+        return row['category_id']
+
+    def render_tags(self, row):
+        return self.tags[row['id']]
+
+    def render_image_feed(self, row):
+        return [
+            {
+                name: image[name] if render is None else render(image[name])
+                for name, render in self.image_renderers
+            }
+            for image in self.images[row['id']]
+        ]
+
+    def render_like_status(self, row):
+        return row['id'] in self.likes
+
+    def render_like(self, row):
+        like = self.likes.get(row['id'])
+        if like is None:
+            return None
+
+        return {
+            'id': like['id'],
+            'user': self.context['request'].user.id,
+            'feed': like['feed_id'],
+            'date': self.formats.datetime(like['date']),
+        }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """ CommentSerializer of .values() rows """
+    model = models.Comment
+    fields = ('id', 'user', 'feed', 'comment', 'date')
+    field_columns = {
+        'user': USER_COLUMNS,
+        'feed': ('feed_id',),
+    }
+
+    def compile(self, fields):
+        self.render_user = self.user_renderer('user')
+        return super().compile(fields)
+
+    def render_feed(self, row):
+        return row['feed_id']
+
+
+class FastListMixin:
+    """
+    list with the view's values_serializer_class when it has one, rows
+    are read with .values() and rendered without DRF fields; setting it
+    to None switches the view back to its serializer_class
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        if serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        context = self.get_serializer_context()
+        queryset = serializer_class.values(
+            self.filter_queryset(self.get_queryset()),
+            context
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset, context=context)
+        return Response(serializer.data)
@@ -0,0 +1,58 @@
+from rest_framework.exceptions import ValidationError
+
+
+def split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(query_params, available):
+    """
+    the fields of available kept by ?fields=a,b and ?omit=c, None when the
+    request asks for every field; unknown names raise a ValidationError
+    """
+    fields = split(query_params.get('fields', ''))
+    omit = split(query_params.get('omit', ''))
+    if not fields and not omit:
+        return None
+
+    errors = {}
+    for param, names in (('fields', fields), ('omit', omit)):
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = 'Unknown fields: ' + ', '.join(unknown)
+    if errors:
+        raise ValidationError(errors)
+
+    kept = set(fields or available) - set(omit)
+    return frozenset(kept)
+
+
+def wants(fields, *names):
+    """ whether any of names is rendered, fields None means all """
+    return fields is None or any(name in fields for name in names)
+
+
+class SparseFieldsetMixin:
+    """
+    render only the fields asked for with ?fields= / ?omit= on list,
+    retrieve and export; get_queryset passes get_sparse_fields() on so
+    the joins, prefetches and annotations of omitted fields are skipped
+    """
+    sparse_actions = ('list', 'retrieve', 'export')
+
+    def get_sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = requested_fields(
+                self.request.query_params,
+                self.get_serializer_class().Meta.fields
+            )
+
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
@@ -0,0 +1,101 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import counters, models, tombstones
+from core.cache import RESPONSE_NAMESPACES, bump_response_versions
+
+
+# the CTEs see one snapshot: the like is deleted when it exists, inserted
+# otherwise, and the counter moves by the difference; a concurrent insert
+# of the same like hits ON CONFLICT and leaves everything as it is
+TOGGLE_SQL = '''
+WITH deleted AS (
+    DELETE FROM {like} WHERE user_id = %(user)s AND {field} = %(target)s
+    RETURNING id
+), inserted AS (
+    INSERT INTO {like} (user_id, {field}, date)
+    SELECT %(user)s, %(target)s, %(now)s
+    WHERE NOT EXISTS (SELECT 1 FROM deleted)
+    ON CONFLICT (user_id, {field}) DO NOTHING
+    RETURNING id
+), buried AS (
+    INSERT INTO {tombstone} (model, object_id, parent_id, user_id, date)
+    SELECT %(label)s, id, %(target)s, %(user)s, %(now)s FROM deleted
+), counted AS (
+    UPDATE {target} SET {column} = {column}
+        + (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted)
+    WHERE id = %(target)s
+    RETURNING {column}
+)
+SELECT (SELECT id FROM inserted), (SELECT id FROM deleted),
+       (SELECT {column} FROM counted)
+'''
+
+
+def toggle(model, user, target_id):
+    """
+    like target_id as user, or take the like back when it exists
+
+    return (whether user now likes it, new like count), raise the target's
+    DoesNotExist when it is missing; raw SQL sends no signals, so cached
+    responses are expired here
+    """
+    counter = counters.counters_for(model)[0]
+    if connection.vendor == 'postgresql':
+        result = _toggle_upsert(model, counter, user, target_id)
+        bump_response_versions(*RESPONSE_NAMESPACES.get(
+            model._meta.label,
+            ()
+        ))
+        return result
+
+    return _toggle_orm(model, counter, user, target_id)
+
+
+def _toggle_upsert(model, counter, user, target_id):
+    """ the whole toggle in one statement and round trip """
+    sql = TOGGLE_SQL.format(
+        like=connection.ops.quote_name(model._meta.db_table),
+        field=connection.ops.quote_name(
+            model._meta.get_field(counter.field).column
+        ),
+        tombstone=connection.ops.quote_name(models.Tombstone._meta.db_table),
+        target=connection.ops.quote_name(counter.target._meta.db_table),
+        column=connection.ops.quote_name(counter.column),
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'user': user.pk,
+            'target': target_id,
+            'now': timezone.now(),
+            'label': model._meta.label,
+        })
+        inserted, deleted, count = cursor.fetchone()
+        if count is None:
+            # rolls the insert back before its foreign key is checked
+            raise counter.target.DoesNotExist()
+
+    # neither inserted nor deleted: a concurrent toggle inserted it first
+    return inserted is not None or deleted is None, count
+
+
+def _toggle_orm(model, counter, user, target_id):
+    """ the same toggle through the ORM for other databases """
+    with transaction.atomic():
+        target = counter.target.objects.select_for_update() \
+            .get(pk=target_id)
+
+        like = model.objects.filter(
+            user=user,
+            **{counter.field: target}
+        ).first()
+        if like is None:
+            model.objects.create(user=user, **{counter.field: target})
+        else:
+            tombstones.record(like)
+            like.delete()
+
+        count = counter.target.objects.values_list(counter.column, flat=True) \
+            .get(pk=target_id)
+
+    return like is None, count
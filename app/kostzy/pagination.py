@@ -0,0 +1,142 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    cursor pagination keyed on (date, id), newest first
+
+    every page is a single index range scan on (date, id), so deep pages
+    cost the same as the first one, unlike OFFSET pagination
+    """
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-date', '-id')
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """ return one page of rows starting after the request cursor """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        window, reverse = self.get_window(queryset, request)
+        rows = list(window)
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_window(self, queryset, request):
+        """
+        the rows of the requested page plus one more, telling whether
+        another page follows, and whether they are in reverse order
+        """
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse = False
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            date, pk, reverse = self.cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(date__gt=date) | Q(date=date, id__gt=pk)
+                ).order_by('date', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(date__lt=date) | Q(date=date, id__lt=pk)
+                ).order_by('-date', '-id')
+
+        return queryset[:self.page_size + 1], reverse
+
+    def get_paginated_response(self, data):
+        """ wrap page data with next / previous links """
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_page_size(self, request):
+        """ page size from the query string, clamped to max_page_size """
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        """ link to the page after the last row """
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        """ link to the page before the first row """
+        if not self.has_previous:
+            return None
+
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        """ return (date, id, reverse) from the request, or None """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            date = parse_datetime(tokens['d'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if date is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return date, pk, reverse
+
+    def encode_cursor(self, row, reverse):
+        """ opaque cursor url pointing at row, a model or .values() row """
+        if isinstance(row, dict):
+            date, pk = row['date'], row['id']
+        else:
+            date, pk = row.date, row.id
+
+        tokens = {'d': date.isoformat(), 'i': pk}
+        if reverse:
+            tokens['r'] = '1'
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded
+        )
@@ -0,0 +1,198 @@
+from django.db.models import Max, OuterRef, Prefetch, Q, Subquery
+
+from core import counters, geo, models, tiles
+from kostzy.fieldsets import wants
+
+
+def viewer_like_subquery(model, field, user, column):
+    """ `column` of the viewer's own like on the outer row, if any """
+    likes = model.objects.filter(user=user, **{field: OuterRef('pk')}) \
+        .order_by('id') \
+        .values(column)[:1]
+
+    return Subquery(likes)
+
+
+def ready_images_count(model, field):
+    """ number of the outer row's images whose variants were created """
+    return counters.count_subquery(model, field, thumbnail__gt='')
+
+
+def latest_subquery(model, field, column):
+    """ correlated MAX(column) of `model` rows pointing to the outer row """
+    rows = model.objects.filter(**{field: OuterRef('pk')}) \
+        .order_by() \
+        .values(field) \
+        .annotate(latest=Max(column)) \
+        .values('latest')
+
+    return Subquery(rows)
+
+
+def image_markers(model, field):
+    """
+    etag annotations of the outer row's images: how many there are, the
+    newest one and how many have their variants
+    """
+    return {
+        'image_count': counters.count_subquery(model, field),
+        'latest_image': latest_subquery(model, field, 'id'),
+        'ready_images': ready_images_count(model, field),
+    }
+
+
+def feed_etag_markers():
+    """
+    etag annotations of what a feed embeds besides its author: its
+    images, the links to its tags and the last edit of those tags
+    """
+    Through = models.Feed.tags.through
+    return {
+        **image_markers(models.FeedImage, 'feed'),
+        'tag_count': counters.count_subquery(Through, 'feed'),
+        'latest_tag_link': latest_subquery(Through, 'feed', 'id'),
+        'tags_updated': latest_subquery(models.Tag, 'feed', 'updated'),
+    }
+
+
+def feed_queryset(user, queryset=None, fields=None):
+    """
+    feeds with the viewer's like annotated and every nested relation
+    preloaded, so a page of feeds renders in a fixed number of queries;
+    with a set of fields only what those fields render is loaded
+    """
+    if queryset is None:
+        queryset = models.Feed.objects.all()
+
+    if wants(fields, 'user'):
+        queryset = queryset.select_related('user')
+    # ordered so the rendered lists do not depend on the backend's row order
+    prefetches = (
+        ('tags', models.Tag.objects.order_by('id')),
+        ('image_feed', models.FeedImage.objects.order_by('id')),
+    )
+    for relation, related in prefetches:
+        if wants(fields, relation):
+            queryset = queryset.prefetch_related(
+                Prefetch(relation, queryset=related)
+            )
+
+    if user.is_authenticated and wants(fields, 'like', 'like_status'):
+        queryset = queryset.annotate(viewer_like_id=viewer_like_subquery(
+            models.Like, 'feed', user, 'id'
+        ))
+        if wants(fields, 'like'):
+            queryset = queryset.annotate(
+                viewer_like_date=viewer_like_subquery(
+                    models.Like, 'feed', user, 'date'
+                )
+            )
+
+    return queryset
+
+
+def discussion_queryset(user, queryset=None, fields=None):
+    """
+    discussions with the viewer's like annotated and every nested
+    relation preloaded, so a page renders in a fixed number of queries;
+    with a set of fields only what those fields render is loaded
+    """
+    if queryset is None:
+        queryset = models.CommunityDiscussion.objects.all()
+
+    if wants(fields, 'user'):
+        queryset = queryset.select_related('user')
+    if wants(fields, 'discussion_image'):
+        queryset = queryset.prefetch_related(Prefetch(
+            'discussion_image',
+            queryset=models.DiscussionImage.objects.order_by('id')
+        ))
+
+    if user.is_authenticated and wants(fields, 'like', 'like_status'):
+        queryset = queryset.annotate(
+            viewer_like_id=viewer_like_subquery(
+                models.DiscussionLike, 'discussion', user, 'id'
+            ),
+        )
+
+    return queryset
+
+
+def nearby_feeds(queryset, lat, long, radius_km):
+    """
+    feeds within radius_km of a point, nearest first
+
+    rows are narrowed to the bounding box through the indexed grid cell
+    column before the exact haversine distance is computed
+    """
+    south, west, north, east = geo.bounding_box(lat, long, radius_km)
+
+    in_cells = Q()
+    for first, last in geo.cell_ranges(south, west, north, east):
+        in_cells |= Q(geo_cell__range=(first, last))
+
+    in_box = Q(lat__range=(south, north))
+    if west >= -180 and east <= 180:
+        in_box &= Q(long__range=(west, east))
+
+    return queryset.filter(in_cells, in_box) \
+        .annotate(distance=geo.haversine_km(lat, long)) \
+        .filter(distance__lte=radius_km) \
+        .order_by('distance', 'id')
+
+
+def _clusters(rows):
+    """ cluster payload of tile rows, centroid is the mean coordinate """
+    return [
+        {
+            'tile_x': int(row['tile_x']),
+            'tile_y': int(row['tile_y']),
+            'count': row['count'],
+            'lat': row['lat_sum'] / row['count'],
+            'long': row['long_sum'] / row['count'],
+        }
+        for row in rows
+    ]
+
+
+def _in_box(south, west, north, east):
+    return Q(lat__range=(south, north), long__range=(west, east))
+
+
+def feed_clusters(south, west, north, east, zoom):
+    """
+    feed counts and centroids per map tile inside a bounding box, read
+    from the tile summary when the zoom level is precomputed
+    """
+    if zoom not in tiles.summary_zooms():
+        queryset = models.Feed.objects.filter(
+            _in_box(south, west, north, east)
+        )
+        ranges = geo.cell_ranges(south, west, north, east)
+        if len(ranges) <= 64:
+            in_cells = Q()
+            for first, last in ranges:
+                in_cells |= Q(geo_cell__range=(first, last))
+            queryset = queryset.filter(in_cells)
+
+        return _clusters(tiles.tile_aggregates(queryset, zoom))
+
+    first_x, first_y = geo.tile_of(south, west, zoom)
+    last_x, last_y = geo.tile_of(north, east, zoom)
+    summary = models.FeedMapTile.objects.filter(
+        zoom=zoom,
+        tile_y__range=(first_y, last_y),
+        tile_x__range=(first_x, last_x),
+        count__gt=0
+    ).values('tile_x', 'tile_y', 'count', 'lat_sum', 'long_sum')
+
+    return _clusters(summary)
+
+
+def community_clusters(south, west, north, east, zoom):
+    """ community counts and centroids per map tile inside a box """
+    queryset = models.Community.objects.filter(
+        _in_box(south, west, north, east)
+    )
+
+    return _clusters(tiles.tile_aggregates(queryset, zoom))
@@ -1,9 +1,52 @@
+import base64
+import binascii
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image
 from rest_framework import serializers
 
-from core import models
+from core import images, models
+from core.serializers import NativeTypesMixin
+
+
+class SparseFieldsMixin:
+    """ drop the fields not in context['fields'], None keeps them all """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 
+class SideloadMixin:
+    """
+    with context['sideload'] render the relations in sideload_fields as
+    ids, the related rows are sent once in the response's included map;
+    sideload_fields holds (field, included key, serializer class)
+    """
+    sideload_fields = ()
 
-class TagSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get('sideload'):
+            return
+
+        for name, _, _ in self.sideload_fields:
+            if name in self.fields:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    many=isinstance(
+                        self.fields[name],
+                        serializers.ListSerializer
+                    ),
+                    read_only=True
+                )
+
+
+class TagSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for tag objects """
 
     class Meta:
@@ -12,7 +55,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for category objects """
 
     class Meta:
@@ -21,7 +64,7 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class UserFeedSerializer(serializers.ModelSerializer):
+class UserFeedSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for user obj in feeds"""
 
     class Meta:
@@ -30,16 +73,16 @@ class UserFeedSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'name')
 
 
-class FeedImageSerializer(serializers.ModelSerializer):
+class FeedImageSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer feed image """
 
     class Meta:
         model = models.FeedImage
-        fields = ('id', 'image')
-        read_only_fields = ('id',)
+        fields = ('id', 'image', 'thumbnail', 'medium', 'full')
+        read_only_fields = ('id', 'thumbnail', 'medium', 'full')
 
 
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for like object """
 
     class Meta:
@@ -48,13 +91,12 @@ class LikeSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'user',)
 
 
-class FeedSerializer(serializers.ModelSerializer):
+class FeedSerializer(SparseFieldsMixin, SideloadMixin, NativeTypesMixin,
+                     serializers.ModelSerializer):
     """ serializer for feed object """
     tags = TagSerializer(many=True, read_only=True)
     user = UserFeedSerializer(read_only=True)
     like_status = serializers.SerializerMethodField()
-    like_count = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     image_feed = FeedImageSerializer(many=True, read_only=True)
     like = serializers.SerializerMethodField()
 
@@ -67,36 +109,45 @@ class FeedSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'like_status', 'like_count',
                             'comment_count')
 
-    def get_comment_count(self, feed):
-        """ get comment count """
-        return models.Comment.objects.filter(feed=feed).count()
-
-    def get_like_count(self, feed):
-        """ get like count """
-        return models.Like.objects.filter(feed=feed).count()
+    sideload_fields = (
+        ('user', 'users', UserFeedSerializer),
+        ('tags', 'tags', TagSerializer),
+        ('category', 'categories', CategorySerializer),
+    )
 
     def get_like_status(self, feed):
         """ get the like status for feed """
-        if self.context['request'].user.is_authenticated:
-            the_user = self.context['request'].user
-            likes = models.Like.objects.filter(user=the_user, feed=feed)
-            if likes:
-                return True
-
-        return False
-    
+        return self._viewer_like(feed) is not None
+
     def get_like(self, feed):
-        if self.context['request'].user.is_authenticated:
-            the_user = self.context['request'].user
-            likes = models.Like.objects.filter(user=the_user, feed=feed)
-            if likes.count() == 0:
+        """ get the like object of the user for feed """
+        like = self._viewer_like(feed)
+        if like is None:
+            return None
+
+        return LikeSerializer(instance=like, context=self.context).data
+
+    def _viewer_like(self, feed):
+        """ the like the request user gave to feed, if any """
+        the_user = self.context['request'].user
+        if not the_user.is_authenticated:
+            return None
+
+        if hasattr(feed, 'viewer_like_id'):
+            if feed.viewer_like_id is None:
                 return None
-            serializer = LikeSerializer(instance=likes, many=True)
-        
-            obj = serializer.data[0]
-            return obj
-        
-        return None
+
+            return models.Like(
+                id=feed.viewer_like_id,
+                user_id=the_user.id,
+                feed_id=feed.id,
+                date=getattr(feed, 'viewer_like_date', None)
+            )
+
+        return models.Like.objects.filter(
+            user=the_user,
+            feed=feed
+        ).order_by('id').first()
 
 
 class FeedCreateSerializer(FeedSerializer):
@@ -116,18 +167,78 @@ class FeedCreateSerializer(FeedSerializer):
     def create(self, validated_data):
         tags_data = validated_data.pop('tags')
         images_data = validated_data.pop('image_feed', [])
-        feed = models.Feed.objects.create(**validated_data)
-        for tag in tags_data:
-            the_tag = models.Tag.objects.get_or_create(id=tag.id)
-            feed.tags.add(tag)
+        with transaction.atomic():
+            feed = models.Feed.objects.create(**validated_data)
+            feed.tags.add(*tags_data)
 
-        for image in images_data:
-            models.FeedImage.objects.create(feed=feed, image=image)
+            for image in images_data:
+                feed_image = models.FeedImage.objects.create(
+                    feed=feed,
+                    image=image
+                )
+                images.process_later(feed_image)
 
         return feed
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class Base64ImageField(serializers.ImageField):
+    """ image field taking base64 content, plain or as a data uri """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+
+        if data.startswith('data:') and ';base64,' in data:
+            data = data.split(';base64,', 1)[1]
+        try:
+            content = base64.b64decode(data, validate=True)
+            # the extension checked by the image validation
+            extension = Image.open(BytesIO(content)).format.lower()
+        except (binascii.Error, ValueError, OSError, AttributeError):
+            self.fail('invalid_image')
+
+        return super().to_internal_value(
+            ContentFile(content, name=f'image.{extension}')
+        )
+
+
+class FeedBulkItemSerializer(NativeTypesMixin, serializers.ModelSerializer):
+    """
+    one feed of a bulk create, tags and category are checked against the
+    ids loaded once for the whole request (context tag_ids, category_ids)
+    """
+    category = serializers.IntegerField()
+    tags = serializers.ListField(child=serializers.IntegerField())
+    image_feed = serializers.ListField(
+        child=Base64ImageField(allow_empty_file=False),
+        required=False
+    )
+
+    class Meta:
+        model = models.Feed
+        fields = ('feed', 'lat', 'long', 'category', 'tags', 'image_feed',
+                  'location_lat', 'location_long', 'location_name')
+
+    def validate_category(self, value):
+        if value not in self.context['category_ids']:
+            raise serializers.ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+
+        return value
+
+    def validate_tags(self, value):
+        missing = [pk for pk in value if pk not in self.context['tag_ids']]
+        if missing:
+            raise serializers.ValidationError(
+                f'Invalid pk "{missing[0]}" - object does not exist.'
+            )
+
+        return list(dict.fromkeys(value))
+
+
+class CommentSerializer(SideloadMixin, NativeTypesMixin,
+                        serializers.ModelSerializer):
     """comment class serializer """
     user = UserFeedSerializer(read_only=True)
 
@@ -136,8 +247,10 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'feed', 'comment', 'date',)
         read_only_fields = ('id', 'user',)
 
+    sideload_fields = (('user', 'users', UserFeedSerializer),)
 
-class CommunityListSerializer(serializers.ModelSerializer):
+
+class CommunityListSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for list community """
     is_joined = serializers.SerializerMethodField()
 
@@ -149,23 +262,22 @@ class CommunityListSerializer(serializers.ModelSerializer):
 
     def get_is_joined(self, community):
         """ get is joined community status """
+        if 'joined_community_ids' in self.context:
+            return community.id in self.context['joined_community_ids']
+
         if self.context['request'].user.is_anonymous:
             return False
-            
+
         the_user = self.context['request'].user
-        joined = models.CommunityMember.objects.filter(
+        return models.CommunityMember.objects.filter(
             user=the_user,
             community=community,
             is_joined=True
-        )
+        ).exists()
 
-        if joined:
-            return True
-        
-        return False
 
-
-class CommunityRetrieveSerializer(serializers.ModelSerializer):
+class CommunityRetrieveSerializer(NativeTypesMixin,
+                                  serializers.ModelSerializer):
     """ serializer for retrieve community """
 
     class Meta:
@@ -175,7 +287,7 @@ class CommunityRetrieveSerializer(serializers.ModelSerializer):
                             'long', 'location')
 
 
-class CommunityMemberSerializer(serializers.ModelSerializer):
+class CommunityMemberSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for community member request join """
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     community = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -186,15 +298,15 @@ class CommunityMemberSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class DiscussionImageSerializer(serializers.ModelSerializer):
+class DiscussionImageSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ discussion image serializer """
     class Meta:
         model = models.DiscussionImage
-        fields = ('id', 'image')
-        read_only_fields = ('id',)
+        fields = ('id', 'image', 'thumbnail', 'medium', 'full')
+        read_only_fields = ('id', 'thumbnail', 'medium', 'full')
 
 
-class DiscussionLikeSerializer(serializers.ModelSerializer):
+class DiscussionLikeSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for discussion like """
 
     class Meta:
@@ -203,12 +315,11 @@ class DiscussionLikeSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'user')
 
 
-class DiscussionSerializer(serializers.ModelSerializer):
+class DiscussionSerializer(SparseFieldsMixin, SideloadMixin,
+                           NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for community discussion """
     user = UserFeedSerializer(read_only=True)
     like_status = serializers.SerializerMethodField()
-    like_count = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     discussion_image = DiscussionImageSerializer(many=True, read_only=True)
     like = serializers.SerializerMethodField()
 
@@ -217,37 +328,46 @@ class DiscussionSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'community', 'text', 'like', 'date',
                   'discussion_image', 'like_status', 'like_count',
                   'comment_count')
-        read_only_fields = ('id', 'user', 'like')
-
-    def get_comment_count(self, disc):
-        """ get comment count """
-        return models.DiscussionComment.objects.filter(discussion=disc).count()
+        read_only_fields = ('id', 'user', 'like', 'like_count',
+                            'comment_count')
 
-    def get_like_count(self, disc):
-        """ get like count """
-        return models.DiscussionLike.objects.filter(discussion=disc).count()
+    sideload_fields = (('user', 'users', UserFeedSerializer),)
 
     def get_like_status(self, disc):
-        """ get the like status for feed """
-        the_user = self.context['request'].user
-        likes = models.DiscussionLike.objects.filter(
-            user=the_user,
-            discussion=disc
-        )
-        if likes:
-            return True
-
-        return False
+        """ get the like status for discussion """
+        return self._viewer_like(disc) is not None
 
     def get_like(self, disc):
+        """ get the like object of the user for discussion """
+        like = self._viewer_like(disc)
+        if like is None:
+            return None
+
+        return DiscussionLikeSerializer(
+            instance=like,
+            context=self.context
+        ).data
+
+    def _viewer_like(self, disc):
+        """ the like the request user gave to disc, if any """
         the_user = self.context['request'].user
-        likes = models.DiscussionLike.objects.filter(user=the_user, discussion=disc)
-        if likes.count() == 0:
+        if not the_user.is_authenticated:
             return None
-        serializer = DiscussionLikeSerializer(instance=likes, many=True)
-        
-        obj = serializer.data[0]
-        return obj
+
+        if hasattr(disc, 'viewer_like_id'):
+            if disc.viewer_like_id is None:
+                return None
+
+            return models.DiscussionLike(
+                id=disc.viewer_like_id,
+                user_id=the_user.id,
+                discussion_id=disc.id
+            )
+
+        return models.DiscussionLike.objects.filter(
+            user=the_user,
+            discussion=disc
+        ).order_by('id').first()
 
 
 class DiscussionCreateSerializer(DiscussionSerializer):
@@ -262,17 +382,20 @@ class DiscussionCreateSerializer(DiscussionSerializer):
 
     def create(self, validated_data):
         images_data = validated_data.pop('discussion_image', [])
-        diss = models.CommunityDiscussion.objects.create(**validated_data)
-        for image in images_data:
-            models.DiscussionImage.objects.create(
-                discussion=diss,
-                image=image
-            )
+        with transaction.atomic():
+            diss = models.CommunityDiscussion.objects.create(**validated_data)
+            for image in images_data:
+                discussion_image = models.DiscussionImage.objects.create(
+                    discussion=diss,
+                    image=image
+                )
+                images.process_later(discussion_image)
 
         return diss
 
 
-class DiscussionCommentSerializer(serializers.ModelSerializer):
+class DiscussionCommentSerializer(SideloadMixin, NativeTypesMixin,
+                                  serializers.ModelSerializer):
     """ serializer for discussion  comment """
     user = UserFeedSerializer(read_only=True)
 
@@ -280,3 +403,5 @@ class DiscussionCommentSerializer(serializers.ModelSerializer):
         model = models.DiscussionComment
         fields = ('id', 'user', 'discussion', 'comment', 'date')
         read_only_fields = ('id', 'user')
+
+    sideload_fields = (('user', 'users', UserFeedSerializer),)
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+from rest_framework.response import Response
+
+
+def related_rows(rows, field):
+    """
+    distinct rows related to rows through field, reading what
+    select_related / prefetch_related loaded and fetching the rest of a
+    foreign key in one query
+    """
+    if field.many_to_many:
+        found = {}
+        for row in rows:
+            for related in getattr(row, field.name).all():
+                found[related.pk] = related
+        return found
+
+    found, missing = {}, set()
+    for row in rows:
+        pk = getattr(row, field.attname)
+        if pk is None:
+            continue
+        if field.is_cached(row):
+            found[pk] = field.get_cached_value(row)
+        else:
+            missing.add(pk)
+
+    missing -= set(found)
+    if missing:
+        found.update(
+            field.related_model.objects.in_bulk(missing)
+        )
+
+    return found
+
+
+def included(rows, serializer, context):
+    """
+    included map of a sideloaded page: every related row once, keyed by
+    its kind and id, for the relations serializer renders as ids
+    """
+    data = OrderedDict()
+    model = serializer.Meta.model
+    for name, key, serializer_class in serializer.sideload_fields:
+        if name not in serializer.fields:
+            continue
+
+        found = related_rows(rows, model._meta.get_field(name))
+        entries = data.setdefault(key, OrderedDict())
+        for pk in sorted(found):
+            entries[str(pk)] = serializer_class(
+                found[pk],
+                context=context
+            ).data
+
+    return data
+
+
+class SideloadListMixin:
+    """
+    opt-in normalized list with ?sideload=true: rows refer to users, tags
+    and categories by id and each of them is sent once under included
+    """
+    sideload_query_param = 'sideload'
+
+    def wants_sideload(self):
+        value = self.request.query_params.get(self.sideload_query_param, '')
+        return self.action == 'list' and value.lower() in ('1', 'true')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sideload'] = self.wants_sideload()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        if not self.wants_sideload():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        serializer = self.get_serializer(rows, many=True)
+        extra = included(rows, serializer.child, serializer.context)
+
+        if page is None:
+            return Response(OrderedDict([
+                ('results', serializer.data),
+                ('included', extra),
+            ]))
+
+        response = self.get_paginated_response(serializer.data)
+        response.data['included'] = extra
+        return response
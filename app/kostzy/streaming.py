@@ -0,0 +1,119 @@
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.renderers import JSONRenderer
+
+
+def batched(rows, size):
+    """ lists of at most size rows """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def json_array(batches, renderer=None):
+    """
+    the JSON array of the rows of every batch as one chunk per batch,
+    rendered by JSONRenderer so the bytes match a rendered list
+    """
+    renderer = renderer or JSONRenderer()
+    yield b'['
+    first = True
+    for rows in batches:
+        if not rows:
+            continue
+
+        chunk = renderer.render(rows)[1:-1]
+        yield chunk if first else b',' + chunk
+        first = False
+
+    yield b']'
+
+
+class StreamingListMixin:
+    """
+    stream the rows of the filtered queryset as a JSON array through a
+    server side cursor: every row for the admin export action, and the
+    list without its pages when asked with ?stream=true, paged lists are
+    then cut at stream_max_rows in their paginator's ordering
+
+    prefetch_related does not apply to .iterator(), so rows are rendered
+    a batch at a time: with the view's values_serializer_class, which
+    loads the relations of each batch, or else with its serializer
+
+    only JSON is streamed, a MessagePack array needs its length up
+    front; ?stream= falls back to the rendered list for other formats and
+    export answers them 406
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+    stream_max_rows = 10000
+    # the browsable API gets the raw JSON stream
+    stream_formats = ('json', 'api')
+
+    def wants_stream(self):
+        value = self.request.query_params.get(self.stream_query_param, '')
+        return value.lower() in ('1', 'true')
+
+    def can_stream(self):
+        renderer = self.request.accepted_renderer
+        return renderer.format in self.stream_formats
+
+    def list(self, request, *args, **kwargs):
+        if not (self.wants_stream() and self.can_stream()):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            ordering = getattr(self.paginator, 'ordering', None)
+            if ordering:
+                queryset = queryset.order_by(*ordering)
+            queryset = queryset[:self.stream_max_rows]
+
+        return self.streaming_response(queryset)
+
+    @action(
+        methods=['GET'],
+        detail=False,
+        permission_classes=(permissions.IsAdminUser,)
+    )
+    def export(self, request):
+        """ every row of the list, unpaged """
+        if not self.can_stream():
+            raise NotAcceptable('Exports are only available as JSON.')
+
+        return self.streaming_response(
+            self.filter_queryset(self.get_queryset())
+        )
+
+    def streaming_response(self, queryset):
+        return StreamingHttpResponse(
+            json_array(self.stream_batches(queryset)),
+            content_type='application/json'
+        )
+
+    def stream_batches(self, queryset):
+        """ serialized rows of queryset, stream_chunk_size at a time """
+        context = self.get_serializer_context()
+        serializer_class = getattr(self, 'values_serializer_class', None)
+        if serializer_class is not None:
+            rows = serializer_class.values(queryset, context) \
+                .iterator(chunk_size=self.stream_chunk_size)
+            for batch in batched(rows, self.stream_chunk_size):
+                yield serializer_class(batch, context=context).data
+            return
+
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        for batch in batched(rows, self.stream_chunk_size):
+            yield self.get_serializer_class()(
+                batch,
+                many=True,
+                context=context
+            ).data
@@ -0,0 +1,154 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict, namedtuple
+from datetime import timedelta
+from urllib import parse
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core import models
+from core.serializers import epoch, native_types
+from kostzy import queries, serializers
+
+
+# rows saved in the last seconds are left for the next sync, a transaction
+# still open may commit rows dated before the newest row seen now
+SETTLE_SECONDS = 2
+
+Kind = namedtuple('Kind', ['name', 'queryset', 'serialize'])
+
+
+def serialize_tombstones(rows, context):
+    native = native_types(context)
+    return [
+        OrderedDict([
+            ('model', TOMBSTONE_KINDS[row.model]),
+            ('id', row.object_id),
+            ('parent', row.parent_id),
+            ('user', row.user_id),
+            ('date', epoch(row.date) if native else row.date.isoformat()),
+        ])
+        for row in rows
+    ]
+
+
+def serializing(serializer_class):
+    def serialize(rows, context):
+        return serializer_class(rows, many=True, context=context).data
+
+    return serialize
+
+
+KINDS = (
+    Kind(
+        'feeds',
+        lambda user: queries.feed_queryset(user),
+        serializing(serializers.FeedSerializer)
+    ),
+    Kind(
+        'comments',
+        lambda user: models.Comment.objects.select_related('user'),
+        serializing(serializers.CommentSerializer)
+    ),
+    Kind(
+        'likes',
+        lambda user: models.Like.objects.all(),
+        serializing(serializers.LikeSerializer)
+    ),
+    Kind(
+        'discussions',
+        lambda user: queries.discussion_queryset(user),
+        serializing(serializers.DiscussionSerializer)
+    ),
+    Kind(
+        'discussion_likes',
+        lambda user: models.DiscussionLike.objects.all(),
+        serializing(serializers.DiscussionLikeSerializer)
+    ),
+    Kind(
+        'deleted',
+        lambda user: models.Tombstone.objects.all(),
+        serialize_tombstones
+    ),
+)
+
+# kind name of the deleted rows of each tombstone model
+TOMBSTONE_KINDS = {
+    'core.Like': 'likes',
+    'core.DiscussionLike': 'discussion_likes',
+}
+
+
+def encode_token(cursors):
+    """ opaque token of the last (date, id) seen of every kind """
+    querystring = parse.urlencode([
+        (name, f'{date.isoformat()} {pk}')
+        for name, (date, pk) in cursors.items()
+    ])
+    return urlsafe_b64encode(querystring.encode('ascii')).decode('ascii')
+
+
+def decode_token(token):
+    """ cursors of a sync token, raise ValueError when it is invalid """
+    try:
+        querystring = urlsafe_b64decode(token.encode('ascii')) \
+            .decode('ascii')
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid sync token')
+
+    tokens = dict(parse.parse_qsl(querystring))
+    cursors = {}
+    for kind in KINDS:
+        try:
+            date, pk = tokens[kind.name].split(' ')
+            cursors[kind.name] = (parse_datetime(date), int(pk))
+        except (KeyError, ValueError):
+            raise ValueError('Invalid sync token')
+
+        if cursors[kind.name][0] is None:
+            raise ValueError('Invalid sync token')
+
+    return cursors
+
+
+def changes(token, limit, context):
+    """
+    rows of every kind saved or deleted after the token, oldest first and
+    at most limit per kind, with the token to send on the next sync
+
+    without a token nothing is returned besides a token of the current
+    state, clients fetch the lists once and sync from there
+    """
+    cutoff = timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+    if token is None:
+        return OrderedDict([
+            ('sync_token', encode_token(
+                OrderedDict((kind.name, (cutoff, 0)) for kind in KINDS)
+            )),
+            ('has_more', False),
+        ] + [(kind.name, []) for kind in KINDS])
+
+    cursors = decode_token(token)
+    user = context['request'].user
+    data = OrderedDict()
+    has_more = False
+    for kind in KINDS:
+        date, pk = cursors[kind.name]
+        rows = list(
+            kind.queryset(user)
+            .filter(Q(date__gt=date) | Q(date=date, id__gt=pk))
+            .filter(date__lte=cutoff)
+            .order_by('date', 'id')[:limit]
+        )
+        if rows:
+            cursors[kind.name] = (rows[-1].date, rows[-1].id)
+        has_more = has_more or len(rows) == limit
+        data[kind.name] = kind.serialize(rows, context)
+
+    return OrderedDict([
+        ('sync_token', encode_token(
+            OrderedDict((kind.name, cursors[kind.name]) for kind in KINDS)
+        )),
+        ('has_more', has_more),
+    ] + list(data.items()))
@@ -0,0 +1,151 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.models import Category, Feed, Like, Tag
+
+
+URL_BATCH = reverse('kostzy:batch-list')
+URL_TAGS = reverse('kostzy:tag-list')
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_LIKES = reverse('kostzy:like-list')
+URL_COMMUNITY = reverse('kostzy:community-list')
+URL_PROFILE = reverse('userauth:profile')
+
+
+@override_settings(TOKEN_CACHE={
+    'BACKEND': 'core.cache.LRUCache',
+    'OPTIONS': {'max_entries': 10, 'timeout': 60},
+})
+class BatchApiTest(TestCase):
+    """ test the multiplexed batch endpoint """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        Tag.objects.create(name='Happy')
+        self.feed = Feed.objects.create(
+            user=self.user,
+            category=Category.objects.create(name='Food'),
+            feed='Sample Feed',
+            lat=5,
+            long=3
+        )
+
+    def batch(self, *requests):
+        res = self.client.post(
+            URL_BATCH,
+            {'requests': list(requests)},
+            format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data['responses']
+
+    def test_home_screen_batch(self):
+        """ test several reads come back in one envelope, in order """
+        with CaptureQueriesContext(connection) as captured:
+            tags, feeds, communities, profile = self.batch(
+                {'method': 'GET', 'path': URL_TAGS},
+                {'method': 'GET', 'path': f'{URL_FEEDS}?page_size=5'},
+                {'method': 'GET', 'path': URL_COMMUNITY},
+                {'method': 'GET', 'path': URL_PROFILE},
+            )
+
+        self.assertEqual(
+            [tags['status'], feeds['status'], communities['status'],
+             profile['status']],
+            [200, 200, 200, 200]
+        )
+        self.assertEqual(tags['body'][0]['name'], 'Happy')
+        self.assertEqual(feeds['body']['results'][0]['id'], self.feed.id)
+        self.assertEqual(profile['body']['email'], self.user.email)
+        token_lookups = [
+            query for query in captured
+            if 'authtoken_token' in query['sql']
+        ]
+        self.assertEqual(len(token_lookups), 1)
+
+    def test_writes_run_as_batch_user(self):
+        """ test sub-requests with bodies run as the authenticated user """
+        like, = self.batch({
+            'method': 'POST',
+            'path': URL_LIKES,
+            'body': {'feed': self.feed.id}
+        })
+
+        self.assertEqual(like['status'], 201)
+        self.assertEqual(Like.objects.get().user, self.user)
+
+    def test_sub_request_permissions_apply(self):
+        """ test anonymous batches keep each route's permissions """
+        self.client.credentials()
+
+        feeds, profile = self.batch(
+            {'method': 'GET', 'path': URL_FEEDS},
+            {'method': 'GET', 'path': URL_PROFILE},
+        )
+
+        self.assertEqual(feeds['status'], 200)
+        self.assertEqual(profile['status'], 401)
+
+    def test_conditional_headers_forwarded(self):
+        """ test sub-requests may poll with If-None-Match """
+        first, = self.batch({'method': 'GET', 'path': URL_FEEDS})
+
+        again, = self.batch({
+            'method': 'GET',
+            'path': URL_FEEDS,
+            'headers': {'If-None-Match': first['headers']['ETag']}
+        })
+
+        self.assertEqual(again['status'], 304)
+
+    def test_invalid_sub_requests(self):
+        """ test unknown, foreign, nested and malformed sub-requests """
+        unknown, admin, nested, method, path = self.batch(
+            {'method': 'GET', 'path': '/api/v1/nope/'},
+            {'method': 'GET', 'path': '/admin/'},
+            {'method': 'POST', 'path': URL_BATCH, 'body': {'requests': []}},
+            {'method': 'TRACE', 'path': URL_TAGS},
+            {'method': 'GET', 'path': 'api/v1/tags/'},
+        )
+
+        self.assertEqual(unknown['status'], 404)
+        self.assertEqual(admin['status'], 404)
+        self.assertEqual(nested['status'], 404)
+        self.assertEqual(method['status'], 400)
+        self.assertEqual(path['status'], 400)
+
+    def test_malformed_headers(self):
+        """ test sub-requests with non-object headers are rejected """
+        text, items, tags = self.batch(
+            {'method': 'GET', 'path': URL_TAGS, 'headers': 'x'},
+            {'method': 'GET', 'path': URL_TAGS, 'headers': ['x']},
+            {'method': 'GET', 'path': URL_TAGS},
+        )
+
+        self.assertEqual(text['status'], 400)
+        self.assertEqual(items['status'], 400)
+        self.assertEqual(tags['status'], 200)
+
+    def test_batch_size_limited(self):
+        """ test empty and oversized batches are rejected """
+        for requests in ([], [{'path': URL_TAGS}] * 21):
+            res = self.client.post(
+                URL_BATCH,
+                {'requests': requests},
+                format='json'
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,148 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from PIL import Image
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core import geo
+from core.models import Category, Feed, FeedImage, FeedMapTile, Job, Tag
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_BULK = reverse('kostzy:feed-bulk-create')
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def sample_image():
+    """ base64 encoded png """
+    output = BytesIO()
+    Image.new('RGB', (20, 10), 'red').save(output, 'PNG')
+    return base64.b64encode(output.getvalue()).decode('ascii')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BulkFeedCreateTest(TestCase):
+    """ test creating many feeds in one request """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food')
+        self.tags = [Tag.objects.create(name='Happy'),
+                     Tag.objects.create(name='Gloom')]
+
+    def item(self, **params):
+        defaults = {
+            'feed': 'Partner feed',
+            'lat': '-6.20',
+            'long': '106.82',
+            'category': self.category.id,
+            'tags': [tag.id for tag in self.tags],
+        }
+        defaults.update(params)
+        return defaults
+
+    def post(self, items):
+        return self.client.post(URL_BULK, items, format='json')
+
+    def test_bulk_create_feeds(self):
+        """ test feeds, tags and images are created together """
+        res = self.post([
+            self.item(image_feed=[sample_image()]),
+            self.item(feed='Second', tags=[self.tags[0].id]),
+        ])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        ids = [result['id'] for result in res.data['results']]
+        first, second = (Feed.objects.get(id=pk) for pk in ids)
+        self.assertEqual(first.user, self.user)
+        self.assertEqual(first.tags.count(), 2)
+        self.assertEqual(second.tags.count(), 1)
+        self.assertEqual(first.geo_cell, geo.cell_for(-6.20, 106.82))
+
+        image = FeedImage.objects.get()
+        self.assertEqual(image.feed, first)
+        self.assertTrue(image.image.name.endswith('.png'))
+        self.assertEqual(Job.objects.get().task, 'images.process')
+
+    def test_queries_do_not_grow_with_feeds(self):
+        """ test the insert count does not depend on the number of feeds """
+        with CaptureQueriesContext(connection) as few:
+            self.post([self.item() for _ in range(2)])
+
+        with CaptureQueriesContext(connection) as many:
+            res = self.post([self.item() for _ in range(8)])
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(len(res.data['results']), 8)
+        self.assertEqual(Feed.objects.count(), 10)
+
+    def test_item_errors_reported(self):
+        """ test invalid items are reported and valid ones created """
+        res = self.post([
+            self.item(category=12345),
+            self.item(),
+            self.item(feed=''),
+            self.item(tags=[self.tags[0].id, 999]),
+            self.item(image_feed=['not an image']),
+        ])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        results = res.data['results']
+        self.assertIn('category', results[0]['errors'])
+        self.assertEqual(Feed.objects.get().id, results[1]['id'])
+        self.assertIn('feed', results[2]['errors'])
+        self.assertIn('tags', results[3]['errors'])
+        self.assertIn('image_feed', results[4]['errors'])
+
+    def test_all_items_invalid(self):
+        """ test a request without any valid feed fails """
+        res = self.post([self.item(category=12345)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Feed.objects.exists())
+
+    def test_request_must_be_list(self):
+        """ test the body must be a non empty list """
+        for body in ({'feed': 'x'}, []):
+            res = self.post(body)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_required(self):
+        """ test anonymous users cannot bulk create """
+        self.client.force_authenticate(user=None)
+
+        res = self.post([self.item()])
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(MAP_TILE_ZOOMS=[4])
+    def test_map_tiles_and_cached_lists_updated(self):
+        """ test tiles and cached anonymous lists see the new feeds """
+        anonymous = APIClient()
+        anonymous.get(URL_FEEDS)
+
+        self.post([self.item() for _ in range(3)])
+
+        self.assertEqual(FeedMapTile.objects.get(zoom=4).count, 3)
+        res = anonymous.get(URL_FEEDS)
+        self.assertEqual(len(res.data['results']), 3)
@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Community, CommunityMember
+
+
+URL_COMMUNITY = reverse('kostzy:community-list')
+
+
+def member_request_url(community_id):
+    """ return member request url of a community """
+    return reverse('kostzy:community-member-request', args=[community_id])
+
+
+def create_communities(count):
+    """ helper to create communities """
+    return [
+        Community.objects.create(
+            name=f'Kost {i}',
+            lat=10,
+            long=5,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+        for i in range(count)
+    ]
+
+
+class CommunityMemberTest(TestCase):
+    """ test community membership lookups """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_is_joined_single_query(self):
+        """ test joined status is loaded with one query per list """
+        joined, pending, other = create_communities(3)
+        CommunityMember.objects.create(
+            user=self.user,
+            community=joined,
+            is_joined=True
+        )
+        CommunityMember.objects.create(user=self.user, community=pending)
+        create_communities(5)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(URL_COMMUNITY)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        joined_ids = [row['id'] for row in res.data if row['is_joined']]
+        self.assertEqual(joined_ids, [joined.id])
+
+    def test_is_joined_anonymous(self):
+        """ test anonymous users have not joined any community """
+        create_communities(2)
+        self.client.force_authenticate(user=None)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(URL_COMMUNITY)
+
+        self.assertFalse(any(row['is_joined'] for row in res.data))
+
+    def test_member_request_updates_existing_membership(self):
+        """ test repeated member requests keep one membership row """
+        community = create_communities(1)[0]
+        url = member_request_url(community.id)
+
+        res = self.client.post(url, {'is_joined': False})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(url, {'is_joined': True})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        members = CommunityMember.objects.filter(user=self.user)
+        self.assertEqual(members.count(), 1)
+        self.assertTrue(members[0].is_joined)
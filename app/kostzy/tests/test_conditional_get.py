@@ -0,0 +1,218 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Comment, Community, CommunityDiscussion, \
+                        Feed, FeedImage, Like, Tag
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMENT = reverse('kostzy:comment-list')
+URL_DISCUSSION = reverse('kostzy:communitydiscussion-list')
+
+
+def detail_url(feed_id):
+    return reverse('kostzy:feed-detail', args=[feed_id])
+
+
+class ConditionalGetTest(TestCase):
+    """ test etags and 304 responses of polled endpoints """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.other = get_user_model().objects.create_user(
+            email='other@gmail.com',
+            password='testing123',
+            name='Other'
+        )
+        self.feed = Feed.objects.create(
+            user=self.user,
+            category=Category.objects.create(name='Food'),
+            feed='Sample Feed',
+            lat=5,
+            long=3
+        )
+
+    def assertNotModified(self, url, params=None, etag=None, queries=1):
+        """ poll url with etag, assert the 304 skips serialization """
+        with self.assertNumQueries(queries):
+            res = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertTrue(etag.endswith(res['ETag']))
+        self.assertEqual(res.content, b'')
+
+    def test_feed_list_not_modified(self):
+        """ test an unchanged feed list answers 304 """
+        res = self.client.get(URL_FEEDS)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # anonymous polls are answered from the cached response
+        self.assertNotModified(URL_FEEDS, etag=res['ETag'], queries=0)
+        self.assertNotModified(
+            URL_FEEDS,
+            etag=f'W/{res["ETag"]}',
+            queries=0
+        )
+
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(URL_FEEDS)
+        self.assertNotModified(URL_FEEDS, etag=res['ETag'])
+
+    @override_settings(RESPONSE_CACHE={
+        'BACKEND': 'core.cache.LRUCache',
+        'OPTIONS': {'max_entries': 100, 'timeout': 0},
+    })
+    def test_etag_outlives_response_cache(self):
+        """ test the etag of unchanged rows survives expired cache entries """
+        anonymous = self.client.get(URL_FEEDS)['ETag']
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(URL_FEEDS)['ETag']
+        url = detail_url(self.feed.id)
+        detail = self.client.get(url)['ETag']
+
+        self.assertNotModified(URL_FEEDS, etag=etag)
+        self.assertNotModified(url, etag=detail)
+        self.client.force_authenticate(user=None)
+        self.assertNotModified(URL_FEEDS, etag=anonymous)
+
+    def test_tag_links_change_etag(self):
+        """ test adding a tag to a feed changes the etag """
+        etag = self.client.get(URL_FEEDS)['ETag']
+
+        self.feed.tags.add(Tag.objects.create(name='Happy'))
+
+        res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results'][0]['tags']), 1)
+
+    def test_embedded_rows_change_etag(self):
+        """ test edits to the author and tags of a feed change the etag """
+        tag = Tag.objects.create(name='Happy')
+        self.feed.tags.add(tag)
+        self.client.force_authenticate(user=self.other)
+        etag = self.client.get(URL_FEEDS)['ETag']
+        changes = (
+            lambda: setattr(self.user, 'name', 'Renamed'),
+            lambda: setattr(self.user, 'exp', 10),
+        )
+        for change in changes:
+            change()
+            self.user.save()
+            res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            etag = res['ETag']
+
+        self.assertEqual(res.data['results'][0]['user']['exp'], 10)
+        tag.name = 'Gloom'
+        tag.save()
+        res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Gloom')
+
+    def test_feed_list_changes(self):
+        """ test likes, comments and image variants change the etag """
+        etag = self.client.get(URL_FEEDS)['ETag']
+        changes = (
+            lambda: Like.objects.create(user=self.other, feed=self.feed),
+            lambda: Comment.objects.create(
+                user=self.other,
+                feed=self.feed,
+                comment='Hi'
+            ),
+            lambda: FeedImage.objects.create(
+                feed=self.feed,
+                image='uploads/images/a.jpg',
+                thumbnail='uploads/images/thumbnail.jpg'
+            ),
+        )
+        for change in changes:
+            change()
+            res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(res['ETag'], etag)
+            etag = res['ETag']
+
+    def test_etag_per_viewer(self):
+        """ test viewers get their own etag, changed by their likes """
+        anonymous = self.client.get(URL_FEEDS)['ETag']
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        etag = res['ETag']
+        Like.objects.create(user=self.user, feed=self.feed)
+        res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['results'][0]['like_status'])
+        self.assertIn('Authorization', res['Vary'])
+
+    def test_feed_detail_not_modified(self):
+        """ test an unchanged feed answers 304 """
+        url = detail_url(self.feed.id)
+        etag = self.client.get(url)['ETag']
+
+        self.assertNotModified(url, etag=etag)
+
+        Like.objects.create(user=self.other, feed=self.feed)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_comment_list_not_modified(self):
+        """ test comment polls answer 304 until a comment is added """
+        params = {'feed': self.feed.id}
+        etag = self.client.get(URL_COMMENT, params)['ETag']
+
+        self.assertNotModified(URL_COMMENT, params, etag)
+
+        Comment.objects.create(user=self.other, feed=self.feed, comment='Hi')
+        res = self.client.get(URL_COMMENT, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_discussion_list_not_modified(self):
+        """ test discussion polls answer 304 until a discussion changes """
+        community = Community.objects.create(
+            name='Sample Kost',
+            lat=10,
+            long=5,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+        discussion = CommunityDiscussion.objects.create(
+            user=self.user,
+            community=community,
+            text='Hello'
+        )
+        params = {'community': community.id}
+        etag = self.client.get(URL_DISCUSSION, params)['ETag']
+
+        self.assertNotModified(URL_DISCUSSION, params, etag)
+
+        discussion.comment_count = 1
+        discussion.save()
+        res = self.client.get(
+            URL_DISCUSSION,
+            params,
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.user.name = 'Renamed'
+        self.user.save()
+        again = self.client.get(
+            URL_DISCUSSION,
+            params,
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data['results'][0]['user']['name'], 'Renamed')
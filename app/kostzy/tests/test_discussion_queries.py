@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Community, CommunityDiscussion, DiscussionLike, \
+                        DiscussionComment, DiscussionImage
+from kostzy.serializers import DiscussionCreateSerializer
+
+
+URL_DISCUSSION = reverse('kostzy:communitydiscussion-list')
+
+
+class DiscussionQueryTest(TestCase):
+    """ test the discussion list query engine """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123'
+        )
+        self.community = Community.objects.create(
+            name='Sample Kost',
+            lat=10,
+            long=5,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+
+    def create_discussions(self, count):
+        return [
+            CommunityDiscussion.objects.create(
+                user=self.user,
+                community=self.community,
+                text=f'Discussion {i}'
+            )
+            for i in range(count)
+        ]
+
+    def test_discussion_list_anonymous(self):
+        """ test anonymous users can list discussions """
+        discussion = self.create_discussions(1)[0]
+        DiscussionLike.objects.create(user=self.user, discussion=discussion)
+
+        res = self.client.get(URL_DISCUSSION, {
+            'community': self.community.id
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = res.data['results'][0]
+        self.assertEqual(row['like_count'], 1)
+        self.assertFalse(row['like_status'])
+        self.assertIsNone(row['like'])
+
+    def test_discussion_list_viewer_like(self):
+        """ test the viewer's like is returned with the discussion """
+        liked, other = self.create_discussions(2)
+        like = DiscussionLike.objects.create(user=self.user, discussion=liked)
+        DiscussionComment.objects.create(
+            user=self.user,
+            discussion=liked,
+            comment='Hi'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(URL_DISCUSSION, {
+            'community': self.community.id
+        })
+
+        rows = {row['id']: row for row in res.data['results']}
+        self.assertEqual(rows[liked.id]['like']['id'], like.id)
+        self.assertTrue(rows[liked.id]['like_status'])
+        self.assertEqual(rows[liked.id]['comment_count'], 1)
+        self.assertIsNone(rows[other.id]['like'])
+
+    def test_discussion_list_constant_queries(self):
+        """ test the discussion list does not grow with its size """
+        self.client.force_authenticate(user=self.user)
+        params = {'community': self.community.id}
+        self.create_discussions(2)
+        with self.assertNumQueries(3):
+            self.client.get(URL_DISCUSSION, params)
+
+        for discussion in self.create_discussions(5):
+            DiscussionLike.objects.create(
+                user=self.user,
+                discussion=discussion
+            )
+        with self.assertNumQueries(3):
+            res = self.client.get(URL_DISCUSSION, params)
+
+        self.assertEqual(len(res.data['results']), 7)
+
+    def test_create_rolled_back_on_image_error(self):
+        """ test a failed image insert leaves no discussion behind """
+        serializer = DiscussionCreateSerializer()
+        with patch.object(
+            DiscussionImage.objects,
+            'create',
+            side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            serializer.create({
+                'user': self.user,
+                'community': self.community,
+                'text': 'Hello',
+                'discussion_image': ['uploads/discussion/a.jpg'],
+            })
+
+        self.assertFalse(CommunityDiscussion.objects.exists())
@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Tag, Category, Feed, Like, Comment
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+
+
+def create_feeds(user, category, count, **params):
+    """ helper to create a batch of feeds with tags """
+    tag1 = Tag.objects.create(name='Happy')
+    tag2 = Tag.objects.create(name='Gloom')
+    defaults = {
+        'feed': 'Sample Feed',
+        'lat': 5.00,
+        'long': 3.00,
+    }
+    defaults.update(params)
+    feeds = []
+    for _ in range(count):
+        feed = Feed.objects.create(user=user, category=category, **defaults)
+        feed.tags.add(tag1, tag2)
+        feeds.append(feed)
+
+    return feeds
+
+
+class FeedQueryTest(TestCase):
+    """ test the feed list query engine """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.other = get_user_model().objects.create_user(
+            email='other@gmail.com',
+            password='testing123',
+            name='Other'
+        )
+        self.category = Category.objects.create(name='Food')
+
+    def test_feed_list_counts_and_like(self):
+        """ test counts and the viewer's like come from annotations """
+        feed, other_feed = create_feeds(self.user, self.category, 2)
+        like = Like.objects.create(user=self.user, feed=feed)
+        Like.objects.create(user=self.other, feed=feed)
+        Like.objects.create(user=self.other, feed=other_feed)
+        Comment.objects.create(user=self.other, feed=feed, comment='Hi')
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(URL_FEEDS)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = {row['id']: row for row in res.data['results']}
+        self.assertEqual(rows[feed.id]['like_count'], 2)
+        self.assertEqual(rows[feed.id]['comment_count'], 1)
+        self.assertTrue(rows[feed.id]['like_status'])
+        self.assertEqual(rows[feed.id]['like']['id'], like.id)
+        self.assertEqual(rows[feed.id]['like']['user'], self.user.id)
+        self.assertEqual(rows[other_feed.id]['like_count'], 1)
+        self.assertFalse(rows[other_feed.id]['like_status'])
+        self.assertIsNone(rows[other_feed.id]['like'])
+        self.assertEqual(len(rows[feed.id]['tags']), 2)
+
+    def test_feed_list_constant_queries_anonymous(self):
+        """ test anonymous feed list does not grow with the feed count """
+        create_feeds(self.user, self.category, 3)
+        with self.assertNumQueries(4):
+            self.client.get(URL_FEEDS)
+
+        create_feeds(self.other, self.category, 6)
+        with self.assertNumQueries(4):
+            res = self.client.get(URL_FEEDS)
+
+        self.assertEqual(len(res.data['results']), 9)
+
+    def test_feed_list_constant_queries_authenticated(self):
+        """ test authenticated feed list does not grow with the feed count """
+        self.client.force_authenticate(user=self.user)
+        for feed in create_feeds(self.user, self.category, 3):
+            Like.objects.create(user=self.user, feed=feed)
+        with self.assertNumQueries(4):
+            self.client.get(URL_FEEDS)
+
+        create_feeds(self.other, self.category, 6)
+        with self.assertNumQueries(4):
+            res = self.client.get(URL_FEEDS)
+
+        self.assertEqual(len(res.data['results']), 9)
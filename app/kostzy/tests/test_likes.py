@@ -0,0 +1,113 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Community, CommunityDiscussion, Feed, \
+                        Like, DiscussionLike, Tombstone
+
+
+URL_LIKES = reverse('kostzy:like-list')
+URL_TOGGLE = reverse('kostzy:like-toggle')
+URL_DISCUSSION_TOGGLE = reverse('kostzy:discussionlike-toggle')
+
+
+class LikeToggleTest(TestCase):
+    """ test idempotent likes and the like toggle """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.feed = Feed.objects.create(
+            user=self.user,
+            category=Category.objects.create(name='Food'),
+            feed='Sample Feed',
+            lat=5,
+            long=3
+        )
+
+    def test_duplicate_like_rejected(self):
+        """ test the database refuses a second like of the same feed """
+        Like.objects.create(user=self.user, feed=self.feed)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Like.objects.create(user=self.user, feed=self.feed)
+
+    def test_like_create_idempotent(self):
+        """ test retried like requests return the same like """
+        first = self.client.post(URL_LIKES, {'feed': self.feed.id})
+        second = self.client.post(URL_LIKES, {'feed': self.feed.id})
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.like_count, 1)
+
+    def test_toggle_like(self):
+        """ test toggling likes and unlikes with the new count """
+        res = self.client.post(URL_TOGGLE, {'feed': self.feed.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['liked'])
+        self.assertEqual(res.data['like_count'], 1)
+        self.assertTrue(Like.objects.filter(user=self.user).exists())
+
+        res = self.client.post(URL_TOGGLE, {'feed': self.feed.id})
+
+        self.assertFalse(res.data['liked'])
+        self.assertEqual(res.data['like_count'], 0)
+        self.assertFalse(Like.objects.filter(user=self.user).exists())
+        self.assertEqual(
+            Tombstone.objects.get().parent_id,
+            self.feed.id
+        )
+
+    def test_toggle_missing_feed(self):
+        """ test toggling a like on a missing feed fails """
+        res = self.client.post(URL_TOGGLE, {'feed': self.feed.id + 1})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.post(URL_TOGGLE, {'feed': 'abc'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Like.objects.exists())
+
+    def test_toggle_requires_login(self):
+        """ test anonymous users cannot toggle likes """
+        self.client.force_authenticate(user=None)
+
+        res = self.client.post(URL_TOGGLE, {'feed': self.feed.id})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_toggle_discussion_like(self):
+        """ test toggling a discussion like """
+        community = Community.objects.create(
+            name='Kost',
+            subtitle='Kost',
+            description='Kost',
+            lat=5,
+            long=3,
+            location='Jakarta'
+        )
+        discussion = CommunityDiscussion.objects.create(
+            user=self.user,
+            community=community,
+            text='Hello'
+        )
+
+        res = self.client.post(
+            URL_DISCUSSION_TOGGLE,
+            {'discussion': discussion.id}
+        )
+
+        self.assertTrue(res.data['liked'])
+        self.assertEqual(res.data['like_count'], 1)
+        self.assertEqual(DiscussionLike.objects.count(), 1)
@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Community, Feed, FeedMapTile
+
+
+URL_CLUSTERS = reverse('kostzy:map-cluster-list')
+JAKARTA = {'bbox': '-6.5,106.5,-6.0,107.0', 'zoom': 6}
+
+
+class MapClusterTest(TestCase):
+    """ test the map cluster endpoint """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123'
+        )
+        self.category = Category.objects.create(name='Food')
+
+    def create_feed(self, lat, long):
+        return Feed.objects.create(
+            user=self.user,
+            category=self.category,
+            feed='Hello',
+            lat=lat,
+            long=long
+        )
+
+    def create_feeds(self):
+        self.create_feed(-6.18, 106.83)
+        self.create_feed(-6.20, 106.79)
+        self.create_feed(-6.91, 107.61)
+        Community.objects.create(
+            name='Sample Kost',
+            lat=-6.20,
+            long=106.78,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+
+    def test_live_clusters(self):
+        """ test clusters are aggregated from feeds and communities """
+        self.create_feeds()
+
+        res = self.client.get(URL_CLUSTERS, JAKARTA)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['feeds']), 1)
+        cluster = res.data['feeds'][0]
+        self.assertEqual(cluster['count'], 2)
+        self.assertAlmostEqual(cluster['lat'], -6.19)
+        self.assertAlmostEqual(cluster['long'], 106.81)
+        self.assertEqual(res.data['communities'][0]['count'], 1)
+
+    @override_settings(MAP_TILE_ZOOMS=[6])
+    def test_precomputed_clusters(self):
+        """ test the tile summary is kept up to date on create / delete """
+        self.create_feeds()
+        extra = self.create_feed(-6.19, 106.81)
+        self.assertEqual(FeedMapTile.objects.filter(zoom=6).count(), 2)
+
+        res = self.client.get(URL_CLUSTERS, JAKARTA)
+        self.assertEqual(res.data['feeds'][0]['count'], 3)
+
+        extra.delete()
+        res = self.client.get(URL_CLUSTERS, JAKARTA)
+        self.assertEqual(res.data['feeds'][0]['count'], 2)
+        self.assertAlmostEqual(res.data['feeds'][0]['lat'], -6.19)
+
+    @override_settings(MAP_TILE_ZOOMS=[6])
+    def test_rebuild_map_tiles(self):
+        """ test rebuild command recomputes the tile summary """
+        self.create_feeds()
+        FeedMapTile.objects.all().delete()
+
+        call_command('rebuild_map_tiles', stdout=StringIO())
+
+        res = self.client.get(URL_CLUSTERS, JAKARTA)
+        self.assertEqual(res.data['feeds'][0]['count'], 2)
+
+    def test_invalid_viewport(self):
+        """ test malformed viewport is rejected """
+        res = self.client.get(URL_CLUSTERS, {'bbox': '1,2,3', 'zoom': 4})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
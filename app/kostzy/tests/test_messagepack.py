@@ -0,0 +1,173 @@
+from unittest.mock import patch
+
+import msgpack
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Comment, Community, Like
+from kostzy import views
+from kostzy.tests.test_feed_queries import create_feeds
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMENTS = reverse('kostzy:comment-list')
+URL_BATCH = reverse('kostzy:batch-list')
+URL_FEED_EXPORT = reverse('kostzy:feed-export')
+URL_COMMUNITIES = reverse('kostzy:community-list')
+URL_PROFILE = reverse('userauth:profile')
+URL_LOGIN = reverse('userauth:login')
+
+MSGPACK = 'application/msgpack'
+
+
+def unpack(response):
+    return msgpack.unpackb(response.content, raw=False)
+
+
+class MessagePackTest(TestCase):
+    """ test application/msgpack requests and responses """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.category = Category.objects.create(name='Food')
+        self.feed = create_feeds(
+            self.user,
+            self.category,
+            1,
+            lat='5.25',
+            long='-3.10'
+        )[0]
+        self.like = Like.objects.create(user=self.user, feed=self.feed)
+        self.client.force_authenticate(user=self.user)
+
+    def test_feed_list_native_types(self):
+        """ test decimals are numbers and datetimes epoch seconds """
+        res = self.client.get(URL_FEEDS, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], MSGPACK)
+        row = unpack(res)['results'][0]
+        self.assertEqual(row['lat'], 5.25)
+        self.assertEqual(row['long'], -3.1)
+        self.assertIsNone(row['location_lat'])
+        self.assertEqual(row['date'], int(self.feed.date.timestamp()))
+        self.assertEqual(row['like']['date'], int(self.like.date.timestamp()))
+
+    def test_json_unchanged(self):
+        """ test JSON responses keep decimal and date strings """
+        res = self.client.get(URL_FEEDS)
+
+        row = res.json()['results'][0]
+        self.assertEqual(row['lat'], '5.25')
+        self.assertTrue(row['date'].endswith('Z'))
+
+    def test_values_serializer_parity(self):
+        """ test the fast path packs the same values as the DRF one """
+        fast = unpack(self.client.get(URL_FEEDS, HTTP_ACCEPT=MSGPACK))
+        with patch.object(views.FeedsViewSet, 'values_serializer_class', None):
+            drf = unpack(self.client.get(URL_FEEDS, HTTP_ACCEPT=MSGPACK))
+
+        self.assertEqual(fast, drf)
+
+    def test_create_from_msgpack_body(self):
+        """ test request bodies may be MessagePack """
+        res = self.client.post(
+            URL_COMMENTS,
+            msgpack.packb({'feed': self.feed.id, 'comment': 'Halo'}),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(unpack(res)['comment'], 'Halo')
+        self.assertTrue(Comment.objects.filter(comment='Halo').exists())
+
+    def test_invalid_body_rejected(self):
+        """ test a malformed MessagePack body is a bad request """
+        res = self.client.post(
+            URL_COMMENTS,
+            b'\xc1',
+            content_type=MSGPACK
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_profile_msgpack(self):
+        """ test userauth endpoints negotiate MessagePack too """
+        res = self.client.get(URL_PROFILE, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(unpack(res)['name'], 'Rais')
+
+    def test_login_msgpack(self):
+        """ test the login body may be MessagePack """
+        self.client.force_authenticate(user=None)
+
+        res = self.client.post(
+            URL_LOGIN,
+            msgpack.packb({
+                'email': 'raisazka@gmail.com',
+                'password': 'testing123',
+            }),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(unpack(res)['token'])
+
+    def test_batch_msgpack(self):
+        """ test batch sub-responses use the batch's native types """
+        res = self.client.post(
+            URL_BATCH,
+            msgpack.packb({'requests': [{'path': URL_FEEDS}]}),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = unpack(res)['responses'][0]['body']
+        self.assertEqual(body['results'][0]['lat'], 5.25)
+
+    def test_export_not_acceptable(self):
+        """ test exports refuse MessagePack instead of mislabelled JSON """
+        admin = get_user_model().objects.create_superuser(
+            email='admin@gmail.com',
+            password='testing123'
+        )
+        self.client.force_authenticate(user=admin)
+
+        res = self.client.get(URL_FEED_EXPORT, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertFalse(res.streaming)
+
+    def test_stream_falls_back_to_rendered_list(self):
+        """ test ?stream= renders MessagePack lists without streaming """
+        Community.objects.create(
+            name='Kost',
+            lat=10,
+            long='5.50',
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+
+        res = self.client.get(
+            URL_COMMUNITIES,
+            {'stream': 'true'},
+            HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertFalse(res.streaming)
+        self.assertEqual(res['Content-Type'], MSGPACK)
+        self.assertEqual(unpack(res)[0]['long'], 5.5)
@@ -0,0 +1,81 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core import geo
+from core.models import Category, Feed
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+
+
+class NearbyFeedsTest(TestCase):
+    """ test the nearby feeds query """
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123'
+        )
+        category = Category.objects.create(name='Food')
+
+        def create_feed(name, lat, long):
+            return Feed.objects.create(
+                user=user,
+                category=category,
+                feed=name,
+                lat=lat,
+                long=long
+            )
+
+        self.monas = create_feed('Monas', -6.18, 106.83)
+        self.binus = create_feed('Binus', -6.20, 106.78)
+        self.bandung = create_feed('Bandung', -6.91, 107.61)
+
+    def test_feed_stores_grid_cell(self):
+        """ test grid cell is computed on save """
+        self.assertEqual(self.monas.geo_cell, geo.cell_for(-6.18, 106.83))
+        self.assertNotEqual(self.monas.geo_cell, self.bandung.geo_cell)
+
+    def test_nearby_feeds_sorted_by_distance(self):
+        """ test feeds in radius are returned nearest first """
+        res = self.client.get(URL_FEEDS, {
+            'near': '-6.19,106.82',
+            'radius_km': 10
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [row['id'] for row in res.data]
+        self.assertEqual(ids, [self.monas.id, self.binus.id])
+
+    def test_nearby_feeds_small_radius(self):
+        """ test feeds outside the radius are excluded """
+        res = self.client.get(URL_FEEDS, {
+            'near': '-6.20,106.78',
+            'radius_km': 1
+        })
+
+        self.assertEqual([row['id'] for row in res.data], [self.binus.id])
+
+    def test_nearby_feeds_invalid_params(self):
+        """ test malformed coordinates and radius are rejected """
+        res = self.client.get(URL_FEEDS, {'near': 'jakarta'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(URL_FEEDS, {
+            'near': '-6.20,106.78',
+            'radius_km': 5000
+        })
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cell_ranges_cover_antimeridian(self):
+        """ test boxes crossing the antimeridian cover both edges """
+        south, west, north, east = geo.bounding_box(0.05, 179.99, 5)
+        ranges = geo.cell_ranges(south, west, north, east)
+        cell = geo.cell_for(0.05, -179.99)
+
+        self.assertTrue(any(first <= cell <= last for first, last in ranges))
@@ -0,0 +1,102 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Feed, Comment
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMENT = reverse('kostzy:comment-list')
+
+
+def create_feeds(user, count):
+    """ helper to create feeds """
+    category = Category.objects.create(name='Food')
+    return [
+        Feed.objects.create(
+            user=user,
+            category=category,
+            feed=f'Feed {i}',
+            lat=5,
+            long=3
+        )
+        for i in range(count)
+    ]
+
+
+class KeysetPaginationTest(TestCase):
+    """ test cursor pagination on list endpoints """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123'
+        )
+
+    def collect_pages(self, url, params):
+        """ follow next links and return the pages """
+        pages = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append(res.data)
+            if res.data['next'] is None:
+                return pages
+            res = self.client.get(res.data['next'])
+
+    def test_feeds_paginated_newest_first(self):
+        """ test pages walk all feeds once, newest first """
+        feeds = create_feeds(self.user, 7)
+
+        pages = self.collect_pages(URL_FEEDS, {'page_size': 3})
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(ids, [feed.id for feed in reversed(feeds)])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_feeds_paginated_with_equal_dates(self):
+        """ test rows sharing a date are split by id without duplicates """
+        feeds = create_feeds(self.user, 5)
+        Feed.objects.update(date=timezone.now())
+
+        pages = self.collect_pages(URL_FEEDS, {'page_size': 2})
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        expected = sorted((feed.id for feed in feeds), reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_earlier_page(self):
+        """ test previous cursor returns the page before """
+        create_feeds(self.user, 5)
+        first = self.client.get(URL_FEEDS, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+
+        res = self.client.get(second.data['previous'])
+
+        self.assertEqual(res.data['results'], first.data['results'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_invalid_cursor(self):
+        """ test a malformed cursor is rejected """
+        res = self.client.get(URL_FEEDS, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_comments_paginated(self):
+        """ test comments of a feed are paginated """
+        feed = create_feeds(self.user, 1)[0]
+        for i in range(3):
+            Comment.objects.create(user=self.user, feed=feed, comment=f'{i}')
+
+        pages = self.collect_pages(URL_COMMENT, {
+            'feed': feed.id,
+            'page_size': 2
+        })
+
+        self.assertEqual([len(page['results']) for page in pages], [2, 1])
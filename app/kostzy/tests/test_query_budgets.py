@@ -0,0 +1,40 @@
+from django.test import TestCase, override_settings
+
+from core import benchmark
+from core.seed import Seeder
+
+
+@override_settings(TOKEN_CACHE={'BACKEND': 'core.cache.LRUCache'})
+class QueryBudgetTest(TestCase):
+    """ test every read endpoint stays within its query budget """
+
+    @classmethod
+    def setUpTestData(cls):
+        Seeder(
+            users=25,
+            feeds=60,
+            communities=3,
+            discussions=40,
+            batch_size=30
+        ).run()
+
+    def test_every_route_has_a_budget(self):
+        """ test new GET routes come with a query budget """
+        missing = [
+            name for name in benchmark.get_routes()
+            if name not in benchmark.QUERY_BUDGETS
+        ]
+
+        self.assertEqual(missing, [])
+
+    def test_routes_within_query_budget(self):
+        """ test no endpoint runs more queries than its budget """
+        report = benchmark.run(iterations=1, warmup=1)
+
+        self.assertEqual(report['skipped'], [])
+        for key, result in report['results'].items():
+            self.assertEqual(result['status'], 200, key)
+            self.assertGreater(result['queries'], 0, key)
+        self.assertIn('kostzy:feed-export authenticated', report['results'])
+        self.assertIn('kostzy:feed-list anonymous', report['results'])
+        self.assertEqual(benchmark.over_budget(report), [])
@@ -0,0 +1,122 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Community, Feed, Like
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMUNITIES = reverse('kostzy:community-list')
+
+
+@override_settings(RESPONSE_CACHE={
+    'BACKEND': 'core.cache.LRUCache',
+    'OPTIONS': {'max_entries': 100, 'timeout': 60},
+})
+class ResponseCacheTest(TestCase):
+    """ test cached anonymous list responses """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.category = Category.objects.create(name='Food')
+        self.feed = self.create_feed()
+
+    def create_feed(self):
+        return Feed.objects.create(
+            user=self.user,
+            category=self.category,
+            feed='Sample Feed',
+            lat=5,
+            long=3
+        )
+
+    def test_anonymous_list_cached(self):
+        """ test a repeated anonymous list is served without queries """
+        first = self.client.get(URL_FEEDS)
+        with CaptureQueriesContext(connection) as captured:
+            second = self.client.get(URL_FEEDS)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(len(captured), 0)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_cached_list_not_modified(self):
+        """ test a cache hit answers If-None-Match without queries """
+        etag = self.client.get(URL_FEEDS)['ETag']
+        with CaptureQueriesContext(connection) as captured:
+            res = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res['X-Cache'], 'HIT')
+        self.assertEqual(res['ETag'], etag)
+        self.assertIn('Authorization', res['Vary'])
+        self.assertEqual(len(captured), 0)
+
+    def test_query_string_normalized(self):
+        """ test unrelated params share and list params split entries """
+        self.client.get(URL_FEEDS, {'category': self.category.id})
+
+        same = self.client.get(URL_FEEDS, {
+            'utm_source': 'promo',
+            'category': self.category.id
+        })
+        other = self.client.get(URL_FEEDS, {'category': 0})
+
+        self.assertEqual(same['X-Cache'], 'HIT')
+        self.assertEqual(other['X-Cache'], 'MISS')
+        self.assertEqual(other.data['results'], [])
+
+    def test_writes_expire_entries(self):
+        """ test new feeds and likes are visible on the next request """
+        self.client.get(URL_FEEDS)
+        new_feed = self.create_feed()
+
+        res = self.client.get(URL_FEEDS)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['id'], new_feed.id)
+
+        Like.objects.create(user=self.user, feed=new_feed)
+        res = self.client.get(URL_FEEDS)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['like_count'], 1)
+
+    def test_authenticated_not_cached(self):
+        """ test responses of logged in users bypass the cache """
+        self.client.force_authenticate(user=self.user)
+        self.client.get(URL_FEEDS)
+        res = self.client.get(URL_FEEDS)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Cache', res)
+
+    def test_community_list_cached(self):
+        """ test community lists are cached until a community changes """
+        community = Community.objects.create(
+            name='Kost',
+            subtitle='Kost',
+            description='Kost',
+            lat=5,
+            long=3,
+            location='Jakarta'
+        )
+        self.client.get(URL_COMMUNITIES)
+        self.assertEqual(self.client.get(URL_COMMUNITIES)['X-Cache'], 'HIT')
+
+        community.name = 'Kost Jakarta'
+        community.save()
+
+        res = self.client.get(URL_COMMUNITIES)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data[0]['name'], 'Kost Jakarta')
@@ -0,0 +1,138 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Comment, Community, CommunityDiscussion, \
+                        DiscussionComment
+from kostzy.tests.test_feed_queries import create_feeds
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMENTS = reverse('kostzy:comment-list')
+URL_DISCUSSION = reverse('kostzy:communitydiscussion-list')
+URL_DISCUSSION_COMMENTS = reverse('kostzy:discussioncomment-list')
+
+
+class SideloadTest(TestCase):
+    """ test the normalized ?sideload=true list envelope """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.other = get_user_model().objects.create_user(
+            email='other@gmail.com',
+            password='testing123',
+            name='Other'
+        )
+        self.category = Category.objects.create(name='Food')
+        self.community = Community.objects.create(
+            name='Sample Kost',
+            lat=10,
+            long=5,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+
+    def test_feed_list_sideloaded(self):
+        """ test feeds refer to users, tags and categories by id """
+        feeds = create_feeds(self.user, self.category, 3)
+        tag_ids = sorted(tag.id for tag in feeds[0].tags.all())
+
+        res = self.client.get(URL_FEEDS, {'sideload': 'true'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = res.data['results'][0]
+        self.assertEqual(row['user'], self.user.id)
+        self.assertEqual(sorted(row['tags']), tag_ids)
+        self.assertEqual(row['category'], self.category.id)
+        included = res.data['included']
+        self.assertEqual(list(included['users']), [str(self.user.id)])
+        self.assertEqual(included['users'][str(self.user.id)]['name'], 'Rais')
+        self.assertEqual(len(included['tags']), 2)
+        self.assertEqual(
+            included['categories'][str(self.category.id)]['name'],
+            'Food'
+        )
+        self.assertIn('next', res.data)
+
+    def test_feed_list_default_is_nested(self):
+        """ test the nested format stays the default """
+        create_feeds(self.user, self.category, 1)
+
+        res = self.client.get(URL_FEEDS)
+
+        self.assertNotIn('included', res.data)
+        self.assertEqual(res.data['results'][0]['user']['name'], 'Rais')
+
+    def test_feed_list_sideload_respects_fields(self):
+        """ test omitted relations are not sideloaded """
+        create_feeds(self.user, self.category, 1)
+
+        res = self.client.get(URL_FEEDS, {
+            'sideload': '1',
+            'fields': 'id,user',
+        })
+
+        self.assertEqual(list(res.data['included']), ['users'])
+
+    def test_comment_list_sideloaded(self):
+        """ test each commenter is sent once for a busy thread """
+        feed = create_feeds(self.user, self.category, 1)[0]
+        for i in range(6):
+            Comment.objects.create(
+                user=self.user if i % 2 else self.other,
+                feed=feed,
+                comment=f'Comment {i}'
+            )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(URL_COMMENTS, {
+                'feed': feed.id,
+                'sideload': 'true',
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 6)
+        self.assertEqual(
+            {row['user'] for row in res.data['results']},
+            {self.user.id, self.other.id}
+        )
+        self.assertEqual(
+            sorted(res.data['included']['users']),
+            sorted([str(self.user.id), str(self.other.id)])
+        )
+
+    def test_discussion_lists_sideloaded(self):
+        """ test discussions and their comments refer to users by id """
+        discussion = CommunityDiscussion.objects.create(
+            user=self.user,
+            community=self.community,
+            text='Discussion'
+        )
+        DiscussionComment.objects.create(
+            user=self.other,
+            discussion=discussion,
+            comment='Reply'
+        )
+
+        discussions = self.client.get(URL_DISCUSSION, {
+            'community': self.community.id,
+            'sideload': 'true',
+        })
+        comments = self.client.get(URL_DISCUSSION_COMMENTS, {
+            'discussion': discussion.id,
+            'sideload': 'true',
+        })
+
+        self.assertEqual(discussions.data['results'][0]['user'], self.user.id)
+        self.assertIn(str(self.user.id), discussions.data['included']['users'])
+        self.assertEqual(comments.data['results'][0]['user'], self.other.id)
+        self.assertIn(str(self.other.id), comments.data['included']['users'])
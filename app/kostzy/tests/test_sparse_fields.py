@@ -0,0 +1,123 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Community, CommunityDiscussion, Like
+from kostzy.tests.test_feed_queries import create_feeds
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_DISCUSSION = reverse('kostzy:communitydiscussion-list')
+
+
+def detail_url(feed_id):
+    return reverse('kostzy:feed-detail', args=[feed_id])
+
+
+class SparseFieldsTest(TestCase):
+    """ test ?fields= and ?omit= on feeds and discussions """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.category = Category.objects.create(name='Food')
+        self.community = Community.objects.create(
+            name='Sample Kost',
+            lat=10,
+            long=5,
+            description='Kost area binus',
+            subtitle='Subtitle',
+            location='Binus'
+        )
+
+    def test_feed_list_fields(self):
+        """ test only the requested fields are rendered """
+        feed = create_feeds(self.user, self.category, 1)[0]
+        Like.objects.create(user=self.user, feed=feed)
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(URL_FEEDS, {'fields': 'id,feed,like_status'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = res.data['results'][0]
+        self.assertEqual(list(row), ['id', 'feed', 'like_status'])
+        self.assertTrue(row['like_status'])
+
+    def test_feed_list_omit(self):
+        """ test omitted fields are dropped, the rest keep their order """
+        create_feeds(self.user, self.category, 1)
+
+        res = self.client.get(URL_FEEDS, {'omit': 'image_feed,like,user'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = res.data['results'][0]
+        self.assertNotIn('image_feed', row)
+        self.assertNotIn('like', row)
+        self.assertNotIn('user', row)
+        self.assertEqual(list(row)[:3], ['id', 'feed', 'lat'])
+
+    def test_feed_list_skips_unused_queries(self):
+        """ test omitted relations are neither joined nor prefetched """
+        create_feeds(self.user, self.category, 3)
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(URL_FEEDS, {'fields': 'id,feed,like_count'})
+
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_feed_detail_fields(self):
+        """ test the feed detail takes a field set as well """
+        feed = create_feeds(self.user, self.category, 1)[0]
+
+        res = self.client.get(detail_url(feed.id), {'fields': 'id,tags'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data), ['id', 'tags'])
+        self.assertEqual(len(res.data['tags']), 2)
+
+    def test_unknown_field_rejected(self):
+        """ test unknown field names are a bad request """
+        res = self.client.get(URL_FEEDS, {'fields': 'id,password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_cached_list_keeps_field_sets_apart(self):
+        """ test anonymous cached lists are keyed on the field set """
+        create_feeds(self.user, self.category, 1)
+
+        first = self.client.get(URL_FEEDS, {'fields': 'id'})
+        second = self.client.get(URL_FEEDS, {'fields': 'id,feed'})
+
+        self.assertEqual(list(first.data['results'][0]), ['id'])
+        self.assertEqual(list(second.data['results'][0]), ['id', 'feed'])
+
+    def test_discussion_list_fields(self):
+        """ test discussions render and load only the requested fields """
+        for i in range(3):
+            CommunityDiscussion.objects.create(
+                user=self.user,
+                community=self.community,
+                text=f'Discussion {i}'
+            )
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(URL_DISCUSSION, {
+                'community': self.community.id,
+                'omit': 'user,discussion_image,like,like_status',
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(res.data['results'][0]),
+            ['id', 'community', 'text', 'date', 'like_count', 'comment_count']
+        )
@@ -0,0 +1,165 @@
+import json
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Comment, Community, CommunityMember
+from kostzy import views
+from kostzy.tests.test_feed_queries import create_feeds
+
+
+URL_FEED_EXPORT = reverse('kostzy:feed-export')
+URL_COMMENT_EXPORT = reverse('kostzy:comment-export')
+URL_COMMUNITIES = reverse('kostzy:community-list')
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMENTS = reverse('kostzy:comment-list')
+URL_COMMUNITY_EXPORT = reverse('kostzy:community-export')
+
+
+def streamed(response):
+    return b''.join(response.streaming_content)
+
+
+class StreamingTest(TestCase):
+    """ test streamed exports and lists """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@gmail.com',
+            password='testing123'
+        )
+        self.category = Category.objects.create(name='Food')
+
+    def create_communities(self, count):
+        return [
+            Community.objects.create(
+                name=f'Kost {i}',
+                lat=10,
+                long=5,
+                description='Kost area binus',
+                subtitle='Subtitle',
+                location='Binus'
+            )
+            for i in range(count)
+        ]
+
+    def test_export_requires_admin(self):
+        """ test only staff users can export """
+        anonymous = self.client.get(URL_FEED_EXPORT)
+        self.client.force_authenticate(user=self.user)
+        regular = self.client.get(URL_FEED_EXPORT)
+
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(regular.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_feed_export_streams_every_feed(self):
+        """ test the export holds every feed across several batches """
+        feeds = create_feeds(self.user, self.category, 5)
+        self.client.force_authenticate(user=self.admin)
+
+        with patch.object(views.FeedsViewSet, 'stream_chunk_size', 2):
+            res = self.client.get(URL_FEED_EXPORT)
+            rows = json.loads(streamed(res))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(
+            sorted(row['id'] for row in rows),
+            sorted(feed.id for feed in feeds)
+        )
+        self.assertEqual(len(rows[0]['tags']), 2)
+
+    def test_feed_export_fields(self):
+        """ test exports take a sparse fieldset """
+        create_feeds(self.user, self.category, 2)
+        self.client.force_authenticate(user=self.admin)
+
+        res = self.client.get(URL_FEED_EXPORT, {'fields': 'id,feed'})
+
+        rows = json.loads(streamed(res))
+        self.assertEqual(list(rows[0]), ['id', 'feed'])
+
+    def test_comment_export_filtered(self):
+        """ test the comment export keeps the list filters """
+        feed, other = create_feeds(self.user, self.category, 2)
+        for i in range(3):
+            Comment.objects.create(user=self.user, feed=feed, comment='Hi')
+        Comment.objects.create(user=self.user, feed=other, comment='No')
+        self.client.force_authenticate(user=self.admin)
+
+        with patch.object(views.CommentViewSet, 'stream_chunk_size', 2):
+            res = self.client.get(URL_COMMENT_EXPORT, {'feed': feed.id})
+            rows = json.loads(streamed(res))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['feed'] for row in rows}, {feed.id})
+
+    def test_empty_export(self):
+        """ test an export without rows is an empty array """
+        self.client.force_authenticate(user=self.admin)
+
+        res = self.client.get(URL_COMMUNITY_EXPORT)
+
+        self.assertEqual(streamed(res), b'[]')
+
+    def test_community_list_streamed(self):
+        """ test a streamed community list matches the rendered one """
+        community = self.create_communities(5)[2]
+        CommunityMember.objects.create(
+            user=self.user,
+            community=community,
+            is_joined=True
+        )
+        self.client.force_authenticate(user=self.user)
+
+        rendered = self.client.get(URL_COMMUNITIES)
+        with patch.object(views.CommunityViewSet, 'stream_chunk_size', 2):
+            res = self.client.get(URL_COMMUNITIES, {'stream': 'true'})
+            content = streamed(res)
+
+        self.assertEqual(content, rendered.content)
+        self.assertEqual(
+            [row['is_joined'] for row in json.loads(content)],
+            [False, False, True, False, False]
+        )
+
+    def test_paged_list_streamed(self):
+        """ test ?stream= sends a paged list unpaged, newest first """
+        feeds = create_feeds(self.user, self.category, 5)
+
+        with patch.object(views.FeedsViewSet, 'stream_chunk_size', 2):
+            res = self.client.get(URL_FEEDS, {'stream': '1'})
+            rows = json.loads(streamed(res))
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [feed.id for feed in reversed(feeds)]
+        )
+
+    def test_paged_list_stream_capped(self):
+        """ test streamed paged lists stop at stream_max_rows """
+        feed = create_feeds(self.user, self.category, 1)[0]
+        for i in range(4):
+            Comment.objects.create(user=self.user, feed=feed, comment='Hi')
+
+        with patch.object(views.CommentViewSet, 'stream_max_rows', 3):
+            res = self.client.get(URL_COMMENTS, {
+                'feed': feed.id,
+                'stream': 'true',
+            })
+            rows = json.loads(streamed(res))
+
+        self.assertEqual(len(rows), 3)
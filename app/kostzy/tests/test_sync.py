@@ -0,0 +1,154 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, Comment, Community, CommunityDiscussion, \
+                        DiscussionLike, Feed, Like, Tombstone
+from kostzy import sync
+
+
+URL_SYNC = reverse('kostzy:sync-list')
+
+
+def like_url(like_id):
+    return reverse('kostzy:like-detail', args=[like_id])
+
+
+@mock.patch.object(sync, 'SETTLE_SECONDS', 0)
+class DeltaSyncTest(TestCase):
+    """ test the changes since endpoint """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food')
+        self.feed = self.create_feed()
+
+    def create_feed(self):
+        return Feed.objects.create(
+            user=self.user,
+            category=self.category,
+            feed='Sample Feed',
+            lat=5,
+            long=3
+        )
+
+    def sync(self, token=None, **params):
+        if token is not None:
+            params['since'] = token
+        res = self.client.get(URL_SYNC, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_first_sync_returns_token_only(self):
+        """ test syncing without a token only hands out a token """
+        data = self.sync()
+
+        self.assertTrue(data['sync_token'])
+        self.assertEqual(data['feeds'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_changes_since_token(self):
+        """ test only rows saved after the token are returned """
+        token = self.sync()['sync_token']
+        feed = self.create_feed()
+        comment = Comment.objects.create(
+            user=self.user,
+            feed=self.feed,
+            comment='Hi'
+        )
+        like = Like.objects.create(user=self.user, feed=self.feed)
+        community = Community.objects.create(
+            name='Kost',
+            subtitle='Kost',
+            description='Kost',
+            lat=5,
+            long=3,
+            location='Jakarta'
+        )
+        discussion = CommunityDiscussion.objects.create(
+            user=self.user,
+            community=community,
+            text='Hello'
+        )
+        DiscussionLike.objects.create(user=self.user, discussion=discussion)
+
+        data = self.sync(token)
+
+        self.assertEqual([row['id'] for row in data['feeds']], [feed.id])
+        self.assertEqual(
+            [row['id'] for row in data['comments']],
+            [comment.id]
+        )
+        self.assertEqual([row['id'] for row in data['likes']], [like.id])
+        self.assertEqual(len(data['discussions']), 1)
+        self.assertEqual(len(data['discussion_likes']), 1)
+
+        data = self.sync(data['sync_token'])
+        self.assertEqual(data['feeds'], [])
+        self.assertEqual(data['likes'], [])
+
+    def test_deleted_like_reported(self):
+        """ test destroying a like leaves a tombstone in the next sync """
+        like = Like.objects.create(user=self.user, feed=self.feed)
+        token = self.sync()['sync_token']
+
+        res = self.client.delete(like_url(like.id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        data = self.sync(token)
+        self.assertEqual(Tombstone.objects.count(), 1)
+        self.assertEqual(len(data['deleted']), 1)
+        self.assertEqual(data['deleted'][0]['model'], 'likes')
+        self.assertEqual(data['deleted'][0]['id'], like.id)
+        self.assertEqual(data['deleted'][0]['parent'], self.feed.id)
+
+    def test_changes_paged_by_limit(self):
+        """ test a sync capped by limit continues where it stopped """
+        token = self.sync()['sync_token']
+        feeds = [self.create_feed() for _ in range(3)]
+
+        first = self.sync(token, limit=2)
+        second = self.sync(first['sync_token'], limit=2)
+
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(
+            [row['id'] for row in first['feeds'] + second['feeds']],
+            [feed.id for feed in feeds]
+        )
+
+    def test_recent_rows_left_for_next_sync(self):
+        """ test rows inside the settle window are not returned yet """
+        token = self.sync()['sync_token']
+        self.create_feed()
+
+        with mock.patch.object(sync, 'SETTLE_SECONDS', 60):
+            data = self.sync(token)
+
+        self.assertEqual(data['feeds'], [])
+        self.assertEqual(len(self.sync(data['sync_token'])['feeds']), 1)
+
+    def test_invalid_token(self):
+        """ test a malformed token is rejected """
+        res = self.client.get(URL_SYNC, {'since': 'nope'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_requires_login(self):
+        """ test anonymous clients cannot pull likes and tombstones """
+        self.client.force_authenticate(user=None)
+
+        res = self.client.get(URL_SYNC)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,177 @@
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.cache import get_cache
+from core.models import Category, Comment, Feed, FeedImage, Like, Tag
+from kostzy import fast, serializers, views
+
+
+URL_FEEDS = reverse('kostzy:feed-list')
+URL_COMMENTS = reverse('kostzy:comment-list')
+
+
+class ValuesSerializerParityTest(TestCase):
+    """ test the values serializers render exactly like the DRF ones """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            password='testing123',
+            name='Rais'
+        )
+        self.user.image = 'uploads/user/avatar.jpg'
+        self.user.exp = 12
+        self.user.save()
+        self.other = get_user_model().objects.create_user(
+            email='other@gmail.com',
+            password='testing123',
+            name='Other'
+        )
+        category = Category.objects.create(name='Food')
+        tags = [
+            Tag.objects.create(name='Happy', color='#fff'),
+            Tag.objects.create(name='Gloom'),
+        ]
+        self.feeds = []
+        for i in range(5):
+            feed = Feed.objects.create(
+                user=self.user if i % 2 else self.other,
+                category=category,
+                feed=f'Feed {i}',
+                lat='5.1',
+                long='-3.25',
+                location_lat='10.5' if i % 2 else None,
+                location_long='1' if i % 2 else None,
+                location_name='Binus' if i % 2 else ''
+            )
+            feed.tags.add(*tags[:i % 3])
+            self.feeds.append(feed)
+
+        FeedImage.objects.create(
+            feed=self.feeds[0],
+            image='uploads/feed/a.jpg',
+            thumbnail='uploads/feed/a_thumb.jpg',
+            medium='uploads/feed/a_medium.jpg',
+            full='uploads/feed/a_full.jpg'
+        )
+        FeedImage.objects.create(feed=self.feeds[0], image='uploads/b.jpg')
+        Like.objects.create(user=self.user, feed=self.feeds[1])
+        Like.objects.create(user=self.other, feed=self.feeds[2])
+        for i in range(3):
+            Comment.objects.create(
+                user=self.user if i % 2 else self.other,
+                feed=self.feeds[0],
+                comment=f'Comment {i}'
+            )
+
+    def get_both(self, view, url, params=None):
+        """ response content of view with and without its fast path """
+        get_cache('RESPONSE_CACHE').clear()
+        fast_res = self.client.get(url, params)
+        get_cache('RESPONSE_CACHE').clear()
+        with patch.object(view, 'values_serializer_class', None):
+            drf_res = self.client.get(url, params)
+
+        self.assertEqual(fast_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(drf_res.status_code, status.HTTP_200_OK)
+        return fast_res.content, drf_res.content
+
+    def assertParity(self, view, url, params=None):
+        fast_content, drf_content = self.get_both(view, url, params)
+        self.assertEqual(fast_content, drf_content)
+
+    def test_fields_mirror_serializers(self):
+        """ test the values serializers list the same fields """
+        self.assertEqual(
+            fast.FeedValuesSerializer.fields,
+            serializers.FeedSerializer.Meta.fields
+        )
+        self.assertEqual(
+            fast.CommentValuesSerializer.fields,
+            serializers.CommentSerializer.Meta.fields
+        )
+
+    def test_feed_list_anonymous(self):
+        """ test anonymous feed pages match byte for byte """
+        self.assertParity(views.FeedsViewSet, URL_FEEDS)
+
+    def test_feed_list_authenticated(self):
+        """ test the viewer's likes render the same """
+        self.client.force_authenticate(user=self.user)
+        self.assertParity(views.FeedsViewSet, URL_FEEDS)
+
+    def test_feed_list_pages(self):
+        """ test cursors built from values rows match """
+        self.client.force_authenticate(user=self.user)
+        self.assertParity(views.FeedsViewSet, URL_FEEDS, {'page_size': 2})
+
+        res = self.client.get(URL_FEEDS, {'page_size': 2})
+        cursor = parse_qs(urlsplit(res.data['next']).query)['cursor'][0]
+        self.assertParity(views.FeedsViewSet, URL_FEEDS, {
+            'page_size': 2,
+            'cursor': cursor,
+        })
+
+    def test_feed_list_sparse_fields(self):
+        """ test sparse fieldsets render the same """
+        self.client.force_authenticate(user=self.user)
+        self.assertParity(views.FeedsViewSet, URL_FEEDS, {
+            'fields': 'id,like_status,tags,date',
+        })
+        self.assertParity(views.FeedsViewSet, URL_FEEDS, {
+            'omit': 'like,image_feed',
+        })
+
+    def test_feed_list_nearby(self):
+        """ test unpaginated nearby feeds render the same """
+        self.assertParity(views.FeedsViewSet, URL_FEEDS, {
+            'near': '5.1,-3.25',
+        })
+
+    def test_comment_list(self):
+        """ test comment pages match byte for byte """
+        self.assertParity(
+            views.CommentViewSet,
+            URL_COMMENTS,
+            {'feed': self.feeds[0].id}
+        )
+
+    def test_related_rows_ordered(self):
+        """ test tags and images render in id order on both paths """
+        feed = self.feeds[1]
+        feed.tags.clear()
+        for tag in Tag.objects.order_by('-id'):
+            feed.tags.add(tag)
+
+        self.assertParity(views.FeedsViewSet, URL_FEEDS)
+        res = self.client.get(URL_FEEDS, {'fields': 'id,tags,image_feed'})
+        rows = {row['id']: row for row in res.data['results']}
+        self.assertEqual(
+            [tag['id'] for tag in rows[feed.id]['tags']],
+            sorted(Tag.objects.values_list('id', flat=True))
+        )
+        self.assertEqual(
+            [image['id'] for image in rows[self.feeds[0].id]['image_feed']],
+            sorted(FeedImage.objects.values_list('id', flat=True))
+        )
+
+    def test_feed_list_queries(self):
+        """ test the fast path runs no more queries than the DRF one """
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(4):
+            self.client.get(URL_FEEDS)
+
+    def test_conditional_get_still_applies(self):
+        """ test the ETag of a fast list still answers 304 """
+        res = self.client.get(URL_FEEDS)
+        again = self.client.get(URL_FEEDS, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
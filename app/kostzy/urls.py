@@ -13,6 +13,13 @@ router.register('community', views.CommunityViewSet)
 router.register('discussion', views.DiscussionViewSet)
 router.register('discussion-comment', views.DiscussionCommentViewSet)
 router.register('discussion-like', views.DiscussionLikeViewSet)
+router.register(
+    'map-clusters',
+    views.MapClusterViewSet,
+    basename='map-cluster'
+)
+router.register('sync', views.SyncViewSet, basename='sync')
+router.register('batch', views.BatchViewSet, basename='batch')
 
 app_name = 'kostzy'
 
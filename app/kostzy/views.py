@@ -1,12 +1,23 @@
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework import permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework import parsers
-
-from kostzy import serializers
-from core import models
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from kostzy import batch, bulk, fast, likes, serializers, queries, sync
+from kostzy.fast import FastListMixin
+from kostzy.fieldsets import SparseFieldsetMixin
+from kostzy.caching import AnonymousListCacheMixin, ConditionalListMixin, \
+    ConditionalRetrieveMixin
+from kostzy.pagination import KeysetPagination
+from kostzy.sideload import SideloadListMixin
+from kostzy.streaming import StreamingListMixin
+from core import models, tombstones
+from core.parsers import MessagePackParser
+from userauth.authentication import CachedTokenAuthentication
 from django.shortcuts import get_object_or_404
 
 class TagViewSet(viewsets.GenericViewSet,
@@ -16,20 +27,42 @@ class TagViewSet(viewsets.GenericViewSet,
     queryset = models.Tag.objects.all().order_by('id')
 
 
-class FeedsViewSet(viewsets.GenericViewSet,
+class FeedsViewSet(StreamingListMixin,
+                   SparseFieldsetMixin,
+                   AnonymousListCacheMixin,
+                   ConditionalListMixin,
+                   ConditionalRetrieveMixin,
+                   SideloadListMixin,
+                   FastListMixin,
+                   viewsets.GenericViewSet,
                    mixins.ListModelMixin,
                    mixins.CreateModelMixin,
                    mixins.RetrieveModelMixin):
 
     serializer_class = serializers.FeedSerializer
-    authentication_classes = (TokenAuthentication,)
+    values_serializer_class = fast.FeedValuesSerializer
+    authentication_classes = (CachedTokenAuthentication,)
     parser_classes = (
         parsers.MultiPartParser,
         parsers.FormParser,
         parsers.JSONParser,
+        MessagePackParser,
     )
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     queryset = models.Feed.objects.all().order_by('-date')
+    pagination_class = KeysetPagination
+    cache_namespaces = ('feeds',)
+    cache_query_params = ('tags', 'category', 'cursor', 'page_size', 'near',
+                          'radius_km', 'fields', 'omit', 'sideload')
+    etag_fields = ('id', 'date', 'like_count', 'comment_count',
+                   'user__updated', 'image_count', 'latest_image',
+                   'ready_images', 'tag_count', 'latest_tag_link',
+                   'tags_updated')
+
+    nearby_max_radius_km = 50
+    nearby_default_radius_km = 5
+    nearby_max_results = 100
+    bulk_max_feeds = 500
 
     def get_queryset(self):
         """ retrieve & filter the feed """
@@ -44,7 +77,58 @@ class FeedsViewSet(viewsets.GenericViewSet,
             cat_id = category
             queryset = queryset.filter(category=cat_id)
 
-        return queryset.all()
+        queryset = queries.feed_queryset(
+            self.request.user,
+            queryset,
+            self.get_sparse_fields()
+        )
+
+        nearby = self.get_nearby_params()
+        if nearby is not None:
+            queryset = queries.nearby_feeds(queryset, *nearby)
+            if self.action == 'list':
+                queryset = queryset[:self.nearby_max_results]
+
+        return queryset
+
+    def get_nearby_params(self):
+        """ parse ?near=lat,long&radius_km= into (lat, long, radius) """
+        near = self.request.query_params.get('near')
+        if near is None:
+            return None
+
+        try:
+            lat, long = (float(value) for value in near.split(','))
+            radius_km = float(self.request.query_params.get(
+                'radius_km',
+                self.nearby_default_radius_km
+            ))
+        except ValueError:
+            raise ValidationError(
+                {'near': 'Expected near=lat,long and a numeric radius_km'}
+            )
+
+        if not (-90 <= lat <= 90 and -180 <= long <= 180):
+            raise ValidationError({'near': 'Coordinate out of range'})
+        if not 0 < radius_km <= self.nearby_max_radius_km:
+            raise ValidationError({
+                'radius_km': 'Must be greater than 0 and at most '
+                             f'{self.nearby_max_radius_km}'
+            })
+
+        return lat, long, radius_km
+
+    @property
+    def paginator(self):
+        """ nearby feeds are ordered by distance, not paged by date """
+        if self.request.query_params.get('near') is not None:
+            return None
+
+        return super().paginator
+
+    def annotate_etag(self, queryset):
+        """ mark the images and tags so edits to them change the etag """
+        return queryset.annotate(**queries.feed_etag_markers())
 
     def perform_create(self, serializer):
         """ save the feed with user id """
@@ -54,9 +138,56 @@ class FeedsViewSet(viewsets.GenericViewSet,
         """ return appropriate serializer class """
         if self.action == 'create':
             return serializers.FeedCreateSerializer
+        elif self.action == 'bulk_create':
+            return serializers.FeedBulkItemSerializer
         else:
             return serializers.FeedSerializer
 
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='bulk',
+        parser_classes=(parsers.JSONParser, MessagePackParser)
+    )
+    def bulk_create(self, request):
+        """
+        create a list of feeds at once, images given as base64; valid feeds
+        are created and every item reports its id or its errors
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'detail': 'Expected a list of feeds'})
+        if len(items) > self.bulk_max_feeds:
+            raise ValidationError({
+                'detail': f'At most {self.bulk_max_feeds} feeds per request'
+            })
+
+        tag_ids, category_ids = bulk.related_ids(items)
+        context = self.get_serializer_context()
+        context.update(tag_ids=tag_ids, category_ids=category_ids)
+        results = []
+        valid = []
+        for item in items:
+            serializer = self.get_serializer_class()(
+                data=item,
+                context=context
+            )
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+                results.append({})
+            else:
+                results.append({'errors': serializer.errors})
+
+        feeds = iter(bulk.create_feeds(request.user, valid) if valid else [])
+        for result in results:
+            if 'errors' not in result:
+                result['id'] = next(feeds).id
+
+        return Response(
+            {'results': results},
+            status.HTTP_201_CREATED if valid else status.HTTP_400_BAD_REQUEST
+        )
+
 
 class LikeViewSet(viewsets.GenericViewSet,
                   mixins.ListModelMixin,
@@ -64,23 +195,60 @@ class LikeViewSet(viewsets.GenericViewSet,
                   mixins.DestroyModelMixin):
 
     serializer_class = serializers.LikeSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
     queryset = models.Like.objects.all()
 
     def perform_create(self, serializer):
-        """ save the like with user id """
-        serializer.save(user=self.request.user)
+        """ like the feed once, repeated requests return the same like """
+        serializer.instance, _ = models.Like.objects.get_or_create(
+            user=self.request.user,
+            feed=serializer.validated_data['feed']
+        )
+
+    @action(methods=['POST'], detail=False)
+    def toggle(self, request):
+        """ like the feed, or take the like back, return the new count """
+        return toggle_like(models.Like, 'feed', request)
+
+    def perform_destroy(self, instance):
+        """ delete the like, leaving a tombstone for delta sync """
+        with transaction.atomic():
+            tombstones.record(instance)
+            instance.delete()
+
+
+def toggle_like(model, field, request):
+    """ toggle the like of request.user on the target named in the body """
+    try:
+        target_id = int(request.data[field])
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError({field: 'Expected the id to like'})
 
+    try:
+        liked, count = likes.toggle(model, request.user, target_id)
+    except ObjectDoesNotExist:
+        raise NotFound(f'No {field} {target_id}')
 
-class CommentViewSet(viewsets.GenericViewSet,
+    return Response({field: target_id, 'liked': liked, 'like_count': count})
+
+
+class CommentViewSet(StreamingListMixin,
+                     ConditionalListMixin,
+                     SideloadListMixin,
+                     FastListMixin,
+                     viewsets.GenericViewSet,
                      mixins.ListModelMixin,
                      mixins.CreateModelMixin):
 
     serializer_class = serializers.CommentSerializer
-    authentication_classes = (TokenAuthentication,)
+    values_serializer_class = fast.CommentValuesSerializer
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
-    queryset = models.Comment.objects.all().order_by('-date')
+    queryset = models.Comment.objects.select_related('user') \
+        .order_by('-date')
+    pagination_class = KeysetPagination
+    etag_fields = ('id', 'date', 'user__updated')
 
     def get_queryset(self):
         """ get comment based on feeds """
@@ -92,24 +260,45 @@ class CommentViewSet(viewsets.GenericViewSet,
         serializer.save(user=self.request.user)
 
 
-class CommunityViewSet(viewsets.GenericViewSet,
+class CommunityViewSet(StreamingListMixin,
+                       AnonymousListCacheMixin,
+                       viewsets.GenericViewSet,
                        mixins.ListModelMixin,
                        mixins.RetrieveModelMixin):
 
     serializer_class = serializers.CommunityListSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     queryset = models.Community.objects.all().order_by('id')
+    cache_namespaces = ('communities',)
 
     def get_serializer_class(self):
         """ return appropriate serializer class """
-        if self.action == 'list':
+        if self.action in ('list', 'export'):
             return serializers.CommunityListSerializer
         elif self.action == 'retrieve':
             return serializers.CommunityRetrieveSerializer
         elif self.action == 'member_request':
             return serializers.CommunityMemberSerializer
 
+    def get_serializer_context(self):
+        """ load the joined communities of the user once per list """
+        context = super().get_serializer_context()
+        if self.action in ('list', 'export'):
+            context['joined_community_ids'] = self.get_joined_community_ids()
+
+        return context
+
+    def get_joined_community_ids(self):
+        """ ids of the communities the request user has joined """
+        if self.request.user.is_anonymous:
+            return set()
+
+        return set(models.CommunityMember.objects.filter(
+            user=self.request.user,
+            is_joined=True
+        ).values_list('community_id', flat=True))
+
     def perform_create(self, serializer):
         """ save with user id """
         serializer.save(user=self.request.user)
@@ -118,7 +307,12 @@ class CommunityViewSet(viewsets.GenericViewSet,
     def member_request(self, request, pk=None):
         """ member request join action """
         community = self.get_object()
+        member = models.CommunityMember.objects.filter(
+            user=self.request.user,
+            community=community
+        ).first()
         serializer = self.get_serializer(
+            member,
             data=request.data
         )
 
@@ -126,7 +320,7 @@ class CommunityViewSet(viewsets.GenericViewSet,
             serializer.save(user=self.request.user, community=community)
             return Response(
                 serializer.data,
-                status.HTTP_201_CREATED
+                status.HTTP_200_OK if member else status.HTTP_201_CREATED
             )
 
         return Response(
@@ -135,19 +329,27 @@ class CommunityViewSet(viewsets.GenericViewSet,
             )
 
 
-class DiscussionViewSet(viewsets.GenericViewSet,
+class DiscussionViewSet(SparseFieldsetMixin,
+                        ConditionalListMixin,
+                        SideloadListMixin,
+                        viewsets.GenericViewSet,
                         mixins.ListModelMixin,
                         mixins.CreateModelMixin):
 
     serializer_class = serializers.DiscussionSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     parser_classes = (
         parsers.MultiPartParser,
         parsers.FormParser,
         parsers.JSONParser,
+        MessagePackParser,
     )
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     queryset = models.CommunityDiscussion.objects.all().order_by('-date')
+    pagination_class = KeysetPagination
+    etag_fields = ('id', 'date', 'like_count', 'comment_count',
+                   'user__updated', 'image_count', 'latest_image',
+                   'ready_images')
 
     def get_serializer_class(self):
         """ return appropriate serializer class """
@@ -159,21 +361,35 @@ class DiscussionViewSet(viewsets.GenericViewSet,
     def get_queryset(self):
         """ return data based on community only """
         community_id = self.request.query_params.get('community')
-        return self.queryset.filter(community__id=community_id)
+        return queries.discussion_queryset(
+            self.request.user,
+            self.queryset.filter(community__id=community_id),
+            self.get_sparse_fields()
+        )
+
+    def annotate_etag(self, queryset):
+        """ mark the images so new ones and their variants change the etag """
+        return queryset.annotate(**queries.image_markers(
+            models.DiscussionImage,
+            'discussion'
+        ))
 
     def perform_create(self, serializer):
         """ save with user id """
         return serializer.save(user=self.request.user)
 
 
-class DiscussionCommentViewSet(viewsets.GenericViewSet,
+class DiscussionCommentViewSet(SideloadListMixin,
+                               viewsets.GenericViewSet,
                                mixins.ListModelMixin,
                                mixins.CreateModelMixin):
 
     serializer_class = serializers.DiscussionCommentSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
-    queryset = models.DiscussionComment.objects.all().order_by('-date')
+    queryset = models.DiscussionComment.objects.select_related('user') \
+        .order_by('-date')
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """ return only by discussion id """
@@ -191,10 +407,110 @@ class DiscussionLikeViewSet(viewsets.GenericViewSet,
                             mixins.DestroyModelMixin):
 
     serializer_class = serializers.DiscussionLikeSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
     queryset = models.DiscussionLike.objects.all()
 
     def perform_create(self, serializer):
-        """ create new discussion with user id """
-        serializer.save(user=self.request.user)
+        """ like the discussion once, repeats return the same like """
+        serializer.instance, _ = models.DiscussionLike.objects.get_or_create(
+            user=self.request.user,
+            discussion=serializer.validated_data['discussion']
+        )
+
+    @action(methods=['POST'], detail=False)
+    def toggle(self, request):
+        """ like the discussion, or take the like back, return the count """
+        return toggle_like(models.DiscussionLike, 'discussion', request)
+
+    def perform_destroy(self, instance):
+        """ delete the like, leaving a tombstone for delta sync """
+        with transaction.atomic():
+            tombstones.record(instance)
+            instance.delete()
+
+
+class MapClusterViewSet(viewsets.ViewSet):
+    """ feed and community clusters per map tile of a viewport """
+    max_zoom = 20
+
+    def list(self, request):
+        """ return ?bbox=south,west,north,east&zoom= clusters """
+        try:
+            south, west, north, east = (
+                float(value)
+                for value in request.query_params['bbox'].split(',')
+            )
+            zoom = int(request.query_params['zoom'])
+        except (KeyError, ValueError):
+            raise ValidationError({
+                'bbox': 'Expected bbox=south,west,north,east and zoom'
+            })
+
+        if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+            raise ValidationError({'bbox': 'Bounding box out of range'})
+        if not 0 <= zoom <= self.max_zoom:
+            raise ValidationError(
+                {'zoom': f'Must be between 0 and {self.max_zoom}'}
+            )
+
+        return Response({
+            'zoom': zoom,
+            'feeds': queries.feed_clusters(south, west, north, east, zoom),
+            'communities': queries.community_clusters(
+                south, west, north, east, zoom
+            ),
+        })
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """ feeds, comments, likes and discussions changed since a token """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+    default_limit = 100
+    max_limit = 500
+
+    def list(self, request):
+        """ return the changes after ?since=<sync_token> """
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Expected a number'})
+        limit = min(max(limit, 1), self.max_limit)
+
+        try:
+            data = sync.changes(
+                request.query_params.get('since'),
+                limit,
+                {'request': request, 'view': self}
+            )
+        except ValueError:
+            raise ValidationError({'since': 'Invalid sync token'})
+
+        return Response(data)
+
+
+class BatchViewSet(viewsets.ViewSet):
+    """ several kostzy / userauth requests in one round trip """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.AllowAny,)
+    parser_classes = (parsers.JSONParser, MessagePackParser)
+    max_requests = 20
+
+    def create(self, request):
+        """
+        run {"requests": [{"method", "path", "body", "headers"}, ...]} in
+        order, each sub-request keeps its own permissions and status
+        """
+        items = request.data.get('requests') \
+            if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'requests': 'Expected a list of requests'})
+        if len(items) > self.max_requests:
+            raise ValidationError({
+                'requests': f'At most {self.max_requests} requests per batch'
+            })
+
+        return Response({
+            'responses': [batch.run(request, item) for item in items]
+        })
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UserauthConfig(AppConfig):
     name = 'userauth'
+
+    def ready(self):
+        """ connect signal receivers """
+        from userauth import signals  # noqa: F401
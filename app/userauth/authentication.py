@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core.cache import get_cache
+
+
+def token_cache_key(key):
+    """ cache key of a token """
+    return f'token:{key}'
+
+
+def forget_token(key):
+    """ drop a token from the cache """
+    get_cache('TOKEN_CACHE').delete(token_cache_key(key))
+
+
+def forget_user(user):
+    """ drop every cached token of a user """
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        forget_token(key)
+
+
+def user_values(user):
+    """ column values of user kept in the cache, without the password """
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    }
+
+
+def user_from_values(values):
+    """
+    a fresh User of cached column values; the password is deferred and
+    loaded from the database only when something reads it
+    """
+    model = get_user_model()
+    return model.from_db(
+        router.db_for_read(model),
+        list(values),
+        list(values.values())
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    token authentication that keeps token -> user lookups in the
+    TOKEN_CACHE, entries are dropped on logout and whenever the user is
+    saved (password change, deactivation, profile update)
+
+    the cache holds the user's column values rather than the instance, an
+    in-process LRUCache would otherwise hand the same User to concurrent
+    requests, so every request builds its own
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_cache('TOKEN_CACHE')
+        values = cache.get(token_cache_key(key))
+        if values is not None:
+            user = user_from_values(values)
+            return (user, Token(key=key, user=user))
+
+        user, token = super().authenticate_credentials(key)
+        cache.set(token_cache_key(key), user_values(user))
+
+        return (user, token)
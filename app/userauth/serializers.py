@@ -2,8 +2,9 @@ from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
 
 from core.models import CommunityMember, Community
+from core.serializers import NativeTypesMixin
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ serializer for register class """
 
     class Meta:
@@ -49,7 +50,8 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
-class CommunityProfileSerializer(serializers.ModelSerializer):
+class CommunityProfileSerializer(NativeTypesMixin,
+                                 serializers.ModelSerializer):
     """ community profile serializer """
 
     class Meta:
@@ -58,7 +60,7 @@ class CommunityProfileSerializer(serializers.ModelSerializer):
         read_only_field = ('id', 'name', 'image',)
 
 
-class CommunityMemberSerializer(serializers.ModelSerializer):
+class CommunityMemberSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ community profile serializer """
     community = CommunityProfileSerializer(read_only=True)
 
@@ -68,7 +70,7 @@ class CommunityMemberSerializer(serializers.ModelSerializer):
         read_only_field = ('community',)
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(NativeTypesMixin, serializers.ModelSerializer):
     """ User Profile Serializer """
     community = serializers.SerializerMethodField()
 
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from rest_framework.authtoken.models import Token
+
+from userauth.authentication import forget_token, forget_user
+
+
+def user_saved(sender, instance, **kwargs):
+    """ drop the cached tokens of a changed user """
+    forget_user(instance)
+
+
+def token_deleted(sender, instance, **kwargs):
+    """ drop a deleted token from the cache """
+    forget_token(instance.key)
+
+
+post_save.connect(
+    user_saved,
+    sender=get_user_model(),
+    dispatch_uid='forget_cached_user_tokens'
+)
+post_delete.connect(
+    token_deleted,
+    sender=Token,
+    dispatch_uid='forget_cached_token'
+)
@@ -0,0 +1,95 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from userauth.authentication import CachedTokenAuthentication
+
+
+URL_PROFILE = reverse('userauth:profile')
+URL_LOGOUT = reverse('userauth:logout')
+URL_TAGS = reverse('kostzy:tag-list')
+URL_FEEDS = reverse('kostzy:feed-list')
+
+
+@override_settings(TOKEN_CACHE={
+    'BACKEND': 'core.cache.LRUCache',
+    'OPTIONS': {'max_entries': 10, 'timeout': 60},
+})
+class CachedTokenAuthTest(TestCase):
+    """ test cached token authentication """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='raisazka@gmail.com',
+            name='Rais',
+            password='testing123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """ test the token is only looked up on the first request """
+        with self.assertNumQueries(3):
+            self.client.get(URL_FEEDS)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(URL_FEEDS)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_logout_invalidates_token(self):
+        """ test logout revokes the cached token """
+        self.client.get(URL_PROFILE)
+
+        res = self.client.post(URL_LOGOUT)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.get(URL_PROFILE)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_invalidates_token(self):
+        """ test a deactivated user is not served from the cache """
+        self.client.get(URL_PROFILE)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(URL_PROFILE)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_refreshes_cached_user(self):
+        """ test password change drops the cached user """
+        self.client.patch(URL_PROFILE, {'password': 'New Pass'})
+
+        with self.assertNumQueries(2):
+            res = self.client.get(URL_PROFILE)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_not_cached(self):
+        """ test unknown tokens are rejected """
+        self.client.credentials(HTTP_AUTHORIZATION='Token nope')
+
+        res = self.client.get(URL_PROFILE)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_not_shared(self):
+        """ test every request gets its own copy of the cached user """
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            first, _ = auth.authenticate_credentials(self.token.key)
+            first.exp = 50
+            second, _ = auth.authenticate_credentials(self.token.key)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.exp, 0)
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertTrue(second.check_password('testing123'))
@@ -9,5 +9,6 @@ urlpatterns = [
     path('register/', views.RegisterApiViewSet.as_view(
         {'post': 'create'}), name='register'),
     path('login/', views.LoginApiViewSet.as_view(), name='login'),
-    path('profile/', views.ProfileApiViewSet.as_view(), name='profile')
+    path('profile/', views.ProfileApiViewSet.as_view(), name='profile'),
+    path('logout/', views.LogoutApiViewSet.as_view(), name='logout'),
 ]
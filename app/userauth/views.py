@@ -1,11 +1,11 @@
-from rest_framework import viewsets, generics, \
-                           authentication, permissions
+from rest_framework import viewsets, generics, permissions
 from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 
+from userauth.authentication import CachedTokenAuthentication
 from userauth.serializers import RegisterSerializer, \
                                 LoginSerializer, ProfileSerializer
 
@@ -31,14 +31,26 @@ class LoginApiViewSet(ObtainAuthToken):
     """ login api """
     serializer_class = LoginSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
 
 
 class ProfileApiViewSet(generics.RetrieveUpdateAPIView):
     """ get and update user profile """
     serializer_class = ProfileSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         """ get the authenticated user data """
         return self.request.user
+
+
+class LogoutApiViewSet(generics.GenericAPIView):
+    """ logout api, revokes the token of the user """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        Token.objects.filter(user=request.user).delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)